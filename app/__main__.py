@@ -0,0 +1,22 @@
+# app/__main__.py
+"""
+Entry point for `python -m app`. With a CLI command (e.g. `run`, `list`) the
+headless CLI is used and Qt is never imported; otherwise the GUI starts.
+"""
+
+import sys
+
+CLI_COMMANDS = {"run", "list", "history", "audit", "remote", "bundle"}
+
+
+def main():
+    if CLI_COMMANDS.intersection(sys.argv[1:]) or sys.argv[1:2] in (["-h"], ["--help"]):
+        from app.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    from app.main import main as gui_main
+    gui_main()
+
+
+if __name__ == "__main__":
+    main()
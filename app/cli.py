@@ -0,0 +1,350 @@
+# app/cli.py
+"""
+Headless command line interface for running scripts and workflows without the
+Qt GUI, e.g. from MDM hooks or over SSH:
+
+    python -m app list
+    python -m app run --script common_fixes
+    python -m app run --workflow new_setup --continue-on-error
+    python -m app history --stats --json
+    python -m app audit
+    python -m app remote --hosts mac01,mac02 --workflow new_setup
+    python -m app bundle build --encrypt
+
+Script output is streamed to stdout and to a per-run log under LOG_DIR/runs;
+log messages go to the usual log file and (warnings and above) to stderr.
+This module must never import PyQt6.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+# Machine-readable exit codes
+EXIT_SUCCESS = 0
+EXIT_SCRIPT_FAILED = 1
+EXIT_USAGE = 2  # Also used by argparse for invalid arguments
+EXIT_NOT_FOUND = 3
+EXIT_INVALID_WORKFLOW = 4
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app", description="Run Script Weaver scripts and workflows without the GUI.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Also print info and debug log messages to stderr.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List the configured scripts and workflows.")
+
+    run_parser = subparsers.add_parser("run", help="Run a script or a workflow.")
+    target = run_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--script", metavar="ID", help="ID of the script to run.")
+    target.add_argument("--workflow", metavar="ID", help="ID of the workflow to run.")
+    run_parser.add_argument("--sudo-password-stdin", action="store_true",
+                            help="Read the sudo password from the first line of stdin. Without it, "
+                                 "sudo scripts use 'sudo -n' unless already running as root.")
+    run_parser.add_argument("--continue-on-error", action="store_true",
+                            help="Keep running the remaining workflow steps after a step fails.")
+    run_parser.add_argument("--force", action="store_true",
+                            help="Run every workflow step, even ones the workflow's result cache would skip.")
+
+    history_parser = subparsers.add_parser("history", help="Show past runs or per-script timing statistics.")
+    history_parser.add_argument("--script", metavar="ID", help="Only show runs of this script.")
+    history_parser.add_argument("--stats", action="store_true", help="Show p50/p95 durations per script instead of individual runs.")
+    history_parser.add_argument("--limit", type=int, default=50, help="Number of runs to show (default: 50).")
+    history_parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
+
+    remote_parser = subparsers.add_parser("remote", help="Run a script or a workflow on other Macs over SSH.")
+    remote_target = remote_parser.add_mutually_exclusive_group(required=True)
+    remote_target.add_argument("--script", metavar="ID", help="ID of the script to run.")
+    remote_target.add_argument("--workflow", metavar="ID", help="ID of the workflow to run.")
+    hosts = remote_parser.add_mutually_exclusive_group(required=True)
+    hosts.add_argument("--hosts", metavar="HOST[,HOST...]", help="Comma-separated hosts ([user@]host or an ssh config alias).")
+    hosts.add_argument("--hosts-file", metavar="FILE", help="File with one host per line.")
+    remote_parser.add_argument("--max-hosts", type=int, default=8, help="Number of hosts to work on at the same time (default: 8).")
+    remote_parser.add_argument("--ssh", default="ssh", metavar="COMMAND", help="ssh executable to use (default: ssh).")
+    remote_parser.add_argument("--ssh-option", action="append", default=[], metavar="OPTION",
+                               help="Extra ssh -o option, e.g. User=admin. May be repeated.")
+    remote_parser.add_argument("--sudo-password-stdin", action="store_true",
+                               help="Read the remote sudo password from the first line of stdin. Without it, "
+                                    "sudo scripts use 'sudo -n'.")
+    remote_parser.add_argument("--continue-on-error", action="store_true",
+                               help="Keep running the remaining workflow steps on a host after a step fails.")
+    remote_parser.add_argument("--json", action="store_true", help="Print the summary as machine-readable JSON.")
+
+    audit_parser = subparsers.add_parser("audit", help="Report untracked, missing and modified scripts.")
+    audit_parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
+
+    bundle_parser = subparsers.add_parser("bundle", help="Pack the configured scripts into one file, or list or unpack one.")
+    bundle_parser.add_argument("action", choices=("build", "list", "extract"))
+    bundle_parser.add_argument("--file", metavar="PATH", help="Bundle file (default: SCRIPT_BUNDLE from the settings).")
+    bundle_parser.add_argument("--encrypt", action="store_true", help="build: Encrypt the scripts with ENCRYPTION_KEY.")
+    bundle_parser.add_argument("--no-compress", action="store_true", help="build: Store the scripts uncompressed.")
+    bundle_parser.add_argument("--output-dir", metavar="DIR",
+                               help="extract: Directory to write the scripts to (default: SCRIPT_DIR).")
+    return parser
+
+
+def configure_logging(verbose: bool):
+    """Keeps stdout for script output: console log output goes to stderr, and only warnings unless verbose."""
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setStream(sys.stderr)
+            handler.setLevel(logging.DEBUG if verbose else logging.WARNING)
+
+
+def list_targets(settings):
+    print("Scripts:")
+    for script in sorted(settings.SCRIPTS, key=lambda s: s['id']):
+        print(f"  {script['id']:<30} {script['name']}{' (sudo)' if script.get('needs_sudo') else ''}")
+    print("Workflows:")
+    for wf_id, workflow in sorted(settings.WORKFLOWS.items()):
+        print(f"  {wf_id:<30} {workflow['name']} ({len(workflow.get('scripts', []))} steps)")
+    return EXIT_SUCCESS
+
+
+def run_target(settings, args):
+    from app.utils.execution_engine import script_timeouts
+    from app.utils.headless_runner import HeadlessWorkflowRunner, run_script
+    from app.utils.resource_limits import script_limits
+    from app.utils.result_cache import ResultCache, workflow_cache_ttl
+    from app.utils.run_history import OutputCounter, RunHistory
+    from app.utils.script_registry import ScriptRegistry
+    from app.utils.workflow_graph import WorkflowGraphError, build_steps, get_max_parallel
+
+    password = sys.stdin.readline().rstrip("\n") if args.sudo_password_stdin else None
+    registry = ScriptRegistry(settings.SCRIPTS)
+    history = RunHistory()
+
+    if args.script:
+        script_info = registry.get(args.script)
+        if not script_info:
+            return report(EXIT_NOT_FOUND, f"script '{args.script}' is not configured")
+        script_path = settings.SCRIPT_DIR / script_info['path']
+        if not script_path.exists():
+            return report(EXIT_NOT_FOUND, f"script file not found: {script_path}")
+        logging.info(f"Running script headless: {script_info['name']} (ID: {script_info['id']})")
+        with captured_output(script_info['id']) as output:
+            counter = OutputCounter(output)
+            started_at = time.time()
+            result = run_script(script_path, script_info.get('needs_sudo', False), password, counter,
+                                *script_timeouts(script_info), script_limits(script_info),
+                                script_info.get('ephemeral', False))
+        exit_code = result.status
+        history.record_run(script_info['id'], started_at, time.time(), exit_code,
+                           script_info.get('needs_sudo', False), counter.bytes, usage=result.usage)
+        if exit_code != 0:
+            return report(EXIT_SCRIPT_FAILED, f"script '{args.script}' failed with exit code {exit_code}")
+        return report(EXIT_SUCCESS, f"script '{args.script}' succeeded")
+
+    workflow = settings.WORKFLOWS.get(args.workflow)
+    if not workflow:
+        return report(EXIT_NOT_FOUND, f"workflow '{args.workflow}' is not configured")
+    try:
+        steps = build_steps(workflow)
+    except WorkflowGraphError as e:
+        return report(EXIT_INVALID_WORKFLOW, f"workflow '{args.workflow}' cannot be run: {e}")
+
+    ttl = workflow_cache_ttl(workflow)
+    cache = ResultCache(history, settings.SCRIPT_DIR, ttl, args.force) if ttl and history.available else None
+    logging.info(f"Starting workflow headless: {workflow['name']}")
+    with captured_output(f"workflow_{args.workflow}") as output:
+        runner = HeadlessWorkflowRunner(steps, registry.get, settings.SCRIPT_DIR, password,
+                                        get_max_parallel(workflow), args.continue_on_error, output,
+                                        history, args.workflow, cache=cache)
+        succeeded = runner.run()
+    if not succeeded:
+        failed = [step_id for step_id, code in runner.results.items() if code != 0]
+        return report(EXIT_SCRIPT_FAILED, f"workflow '{args.workflow}' failed; failed steps: {', '.join(failed) or 'none'}")
+    return report(EXIT_SUCCESS, f"workflow '{args.workflow}' succeeded")
+
+
+def show_history(args):
+    from app.utils.run_history import RunHistory
+
+    history = RunHistory()
+    if not history.available:
+        return report(EXIT_NOT_FOUND, f"run history is not available at {history.db_path}")
+
+    if args.stats:
+        stats = history.duration_stats(args.script)
+        if args.json:
+            print(json.dumps(stats, indent=2, sort_keys=True))
+            return EXIT_SUCCESS
+        print(f"{'Script':<30} {'Runs':>5} {'Failed':>6} {'p50':>9} {'p95':>9} {'CPU p50':>9} {'Max RSS':>10}  Last run")
+        for script_id, entry in sorted(stats.items()):
+            cpu = f"{entry['cpu_p50']:>8.2f}s" if entry['cpu_p50'] is not None else f"{'-':>9}"
+            rss = f"{entry['max_rss_kb'] / 1024:>7.1f} MB" if entry['max_rss_kb'] is not None else f"{'-':>10}"
+            print(f"{script_id:<30} {entry['runs']:>5} {entry['failures']:>6} {entry['p50']:>8.1f}s {entry['p95']:>8.1f}s "
+                  f"{cpu} {rss}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_run']))}")
+        return EXIT_SUCCESS
+
+    runs = history.recent_runs(args.limit, args.script)
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return EXIT_SUCCESS
+    for run in runs:
+        started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started_at']))
+        workflow = f" (workflow {run['workflow_id']})" if run['workflow_id'] else ""
+        usage = ""
+        if run['cpu_seconds'] is not None:
+            usage = f" cpu={run['cpu_seconds']:.2f}s rss={run['max_rss_kb'] / 1024:.1f}MB"
+        print(f"{started}  {run['script_id']:<30} exit={run['exit_code']} {run['duration']:.1f}s "
+              f"{run['output_bytes']}B{usage}{' sudo' if run['needs_sudo'] else ''}{workflow}")
+    return EXIT_SUCCESS
+
+
+def run_remote(settings, args):
+    from app.utils.remote_runner import RemoteRunner, format_summary, read_hosts_file, results_as_dicts
+    from app.utils.script_registry import ScriptRegistry
+    from app.utils.workflow_graph import WorkflowGraphError, build_steps, get_max_parallel
+
+    try:
+        hosts = read_hosts_file(args.hosts_file) if args.hosts_file else [h.strip() for h in args.hosts.split(",") if h.strip()]
+    except OSError as e:
+        return report(EXIT_NOT_FOUND, f"cannot read hosts file: {e}")
+    if not hosts:
+        return report(EXIT_USAGE, "no hosts given")
+
+    registry = ScriptRegistry(settings.SCRIPTS)
+    if args.script:
+        if not registry.get(args.script):
+            return report(EXIT_NOT_FOUND, f"script '{args.script}' is not configured")
+        name, steps, max_parallel = args.script, [{'index': 0, 'id': args.script, 'after': set()}], 1
+    else:
+        workflow = settings.WORKFLOWS.get(args.workflow)
+        if not workflow:
+            return report(EXIT_NOT_FOUND, f"workflow '{args.workflow}' is not configured")
+        try:
+            steps = build_steps(workflow)
+        except WorkflowGraphError as e:
+            return report(EXIT_INVALID_WORKFLOW, f"workflow '{args.workflow}' cannot be run: {e}")
+        name, max_parallel = f"workflow_{args.workflow}", get_max_parallel(workflow)
+
+    password = sys.stdin.readline().rstrip("\n") if args.sudo_password_stdin else None
+    ssh_options = [arg for option in args.ssh_option for arg in ("-o", option)]
+    logging.info(f"Running {name} on {len(hosts)} host(s)")
+    # With --json, stdout is kept for the summary and script output only goes to the per-host logs
+    output = (lambda text: None) if args.json else write_stdout
+    runner = RemoteRunner(hosts, settings.SCRIPT_DIR, args.max_hosts, args.ssh, ssh_options, output)
+    results = runner.run(name, steps, registry.get, password, max_parallel, args.continue_on_error)
+
+    if args.json:
+        print(json.dumps(results_as_dicts(results), indent=2))
+    else:
+        write_stdout("\n" + format_summary(results))
+    failed = [result.host for result in results if not result.success]
+    if failed:
+        return report(EXIT_SCRIPT_FAILED, f"{name} failed on {len(failed)}/{len(results)} hosts: {', '.join(failed)}")
+    return report(EXIT_SUCCESS, f"{name} succeeded on {len(results)} hosts")
+
+
+def audit_scripts(settings, args):
+    from app.utils.script_manifest import ScriptManifest
+    from app.utils.script_registry import ScriptRegistry
+
+    manifest = ScriptManifest(settings.SCRIPT_DIR)
+    audit = manifest.audit(ScriptRegistry(settings.SCRIPTS).script_files())
+    if args.json:
+        print(json.dumps(audit._asdict(), indent=2))
+    else:
+        for label, names in (("UNTRACKED", audit.untracked), ("MISSING", audit.missing), ("MODIFIED", audit.modified)):
+            for name in names:
+                print(f"{label:<10} {name}")
+    if audit.untracked or audit.missing or audit.modified:
+        return report(EXIT_SCRIPT_FAILED, f"{len(audit.untracked)} untracked, {len(audit.missing)} missing, "
+                                          f"{len(audit.modified)} modified")
+    return report(EXIT_SUCCESS, "scripts match the configuration")
+
+
+def manage_bundle(settings, args):
+    from pathlib import Path
+    from app.utils.script_bundle import BundleError, ScriptBundle, build_bundle
+
+    path = Path(args.file) if args.file else settings.SCRIPT_BUNDLE
+    fernet = None
+    if args.encrypt or args.action == "extract":
+        key = getattr(settings, 'ENCRYPTION_KEY', None)
+        if key:
+            from cryptography.fernet import Fernet
+            fernet = Fernet(key.encode())
+        elif args.encrypt:
+            return report(EXIT_USAGE, "--encrypt needs ENCRYPTION_KEY in the settings")
+
+    if args.action == "build":
+        missing = build_bundle(path, settings.SCRIPT_DIR, settings.SCRIPTS, not args.no_compress, fernet)
+        if missing:
+            return report(EXIT_NOT_FOUND, f"bundled {path} without {len(missing)} missing scripts: {', '.join(missing)}")
+        return report(EXIT_SUCCESS, f"bundled {len(settings.SCRIPTS)} scripts into {path}")
+
+    try:
+        bundle = ScriptBundle(path)
+    except (OSError, BundleError) as e:
+        return report(EXIT_NOT_FOUND, f"cannot open bundle: {e}")
+    with bundle:
+        if args.action == "list":
+            for entry in bundle.entries():
+                flags = "".join(flag for flag, on in (("z", entry.compressed), ("e", entry.encrypted)) if on)
+                print(f"{entry.script_id:<30} {entry.size:>10,}B {entry.length:>10,}B stored {flags:<2} {entry.sha256[:12]}")
+            return report(EXIT_SUCCESS, f"{len(bundle)} scripts in {path}")
+
+        output_dir = Path(args.output_dir) if args.output_dir else settings.SCRIPT_DIR
+        output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for script in bundle.scripts():
+                (output_dir / Path(script['path']).name).write_bytes(bundle.read(script['id'], fernet))
+        except BundleError as e:
+            return report(EXIT_SCRIPT_FAILED, str(e))
+        return report(EXIT_SUCCESS, f"extracted {len(bundle)} scripts to {output_dir}")
+
+
+def write_stdout(text: str):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+@contextmanager
+def captured_output(name: str):
+    """Yields an output callback that writes to stdout and to a new run log."""
+    from app.utils.output_log import RunLog
+
+    # Nothing here shows the in-memory tail, so keep it small
+    run_log = RunLog(name, tail_lines=100)
+
+    def output(text: str):
+        write_stdout(text)
+        run_log.write(text)
+
+    try:
+        yield output
+    finally:
+        run_log.close()
+        logging.info(f"Full output saved to {run_log.path}")
+
+
+def report(exit_code: int, message: str) -> int:
+    """Prints a one-line, parseable result to stderr and returns the exit code."""
+    print(f"script-weaver: exit={exit_code} {message}", file=sys.stderr)
+    return exit_code
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from app.config import settings
+    configure_logging(args.verbose)
+
+    if args.command == "list":
+        return list_targets(settings)
+    if args.command == "history":
+        return show_history(args)
+    if args.command == "remote":
+        return run_remote(settings, args)
+    if args.command == "audit":
+        return audit_scripts(settings, args)
+    if args.command == "bundle":
+        return manage_bundle(settings, args)
+    return run_target(settings, args)
@@ -14,6 +14,7 @@ APP_VERSION = "4.0.0"
 COMPANY_NAME = "Pixel Space Technologies LLC"
 LOGO_PATH = "assets/logo.png"
 MAX_LOGIN_ATTEMPTS = 3
+OUTPUT_MAX_LINES = 10000
 
 # ------------------------------------------------------------------
 # Paths
@@ -24,6 +25,7 @@ else:
     APP_DIR = Path(__file__).parent.parent
 
 SCRIPT_DIR = APP_DIR / "scripts"
+SCRIPT_BUNDLE = APP_DIR / "scripts.swbundle"  # Optional; built with `python -m app bundle build`
 ASSETS_DIR = APP_DIR / "assets"
 LOG_DIR = Path.home() / 'Library' / 'Logs' / 'ScriptWeaver'
 DATA_DIR = Path.home() / 'Library' / 'Application Support' / 'ScriptWeaver'
@@ -208,9 +210,18 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
+            logging.StreamHandler(sys.stderr)
         ]
     )
 
 if 'pytest' not in sys.modules:
-    setup_logging()
\ No newline at end of file
+    setup_logging()
+
+# ------------------------------------------------------------------
+# Saved configuration
+# ------------------------------------------------------------------
+# The values above are the defaults. Changes made in the app are kept in the
+# config store (DATA_DIR/config/*.json), which is applied on top of them here;
+# on first run it is created from the values above.
+from app.utils.config_store import apply_saved_config
+apply_saved_config(sys.modules[__name__])
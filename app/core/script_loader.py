@@ -1,44 +1,141 @@
 # app/core/script_loader.py
+"""
+Loads the Fernet-encrypted scripts embedded in settings.EMBEDDED_SCRIPTS
+(script ID -> base64 token), or from the script bundle at settings.SCRIPT_BUNDLE
+(see app/utils/script_bundle.py), and runs them without writing the plaintext
+to disk.
+
+Decrypted bodies are kept in a bounded LRU cache, so a script that runs in
+several steps is decrypted once; evict() and clear_cache() drop them, e.g.
+when the embedded scripts change. A script is handed to bash as /dev/fd/N,
+backed by an anonymous memfd where the OS has them (Linux), or by a pipe
+otherwise (macOS). A script too large for the pipe's buffer is read from the
+pipe whole and run with eval instead. Unlike `bash -s`, every way leaves the
+script's stdin free.
+"""
 
 import base64
-import zlib
 import os
-from cryptography.fernet import Fernet
-from app.config.settings import ENCRYPTION_KEY
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+from app.config import settings
+from app.utils.script_bundle import ScriptBundle
+
+# Decrypted script bodies kept in memory
+DEFAULT_CACHE_SIZE = 32
+# The smallest pipe buffer of the supported systems (macOS's default). A script that fits
+# is written to the pipe before bash starts, and bash runs it as a file.
+PIPE_BUFFER_SIZE = 16384
+# Larger scripts are fed by a thread while bash reads them, and bash would read one a byte
+# at a time from the pipe, so they are read whole and run with eval instead. $0 is the
+# script's ID, and the pipe is closed before it runs.
+PIPE_RUNNER = '__sw_script=$(< /dev/fd/{fd}); exec {fd}<&-; eval "unset __sw_script; $__sw_script"'
+
+
+def _script_fd(script: bytes) -> Tuple[int, Optional[threading.Thread]]:
+    """
+    Returns a file descriptor bash can read the script from, and the thread
+    feeding it when the script is larger than the pipe buffer, which must be
+    joined once the fd is closed.
+    """
+    if hasattr(os, 'memfd_create'):
+        fd = os.memfd_create("script", os.MFD_CLOEXEC)
+        with open(fd, 'wb', closefd=False) as memfd:
+            memfd.write(script)
+        os.lseek(fd, 0, os.SEEK_SET)
+        return fd, None
+
+    read_fd, write_fd = os.pipe()
+    if len(script) <= PIPE_BUFFER_SIZE:
+        with open(write_fd, 'wb') as pipe:
+            pipe.write(script)
+        return read_fd, None
+
+    def feed():
+        try:
+            with open(write_fd, 'wb') as pipe:
+                pipe.write(script)
+        except BrokenPipeError:
+            pass  # The script exited before bash read all of it
+
+    # A thread, since the write would block until bash has read the start of the script
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    return read_fd, feeder
+
 
 class ScriptLoader:
-    def __init__(self):
-        self.key = ENCRYPTION_KEY.encode()
-        self.fernet = Fernet(self.key)
+    def __init__(self, scripts: Optional[dict] = None, key: Optional[str] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE, bundle: Optional[ScriptBundle] = None):
+        self.scripts = getattr(settings, 'EMBEDDED_SCRIPTS', {}) if scripts is None else scripts
+        self.bundle = bundle
+        bundle_path = getattr(settings, 'SCRIPT_BUNDLE', None)
+        if bundle is None and scripts is None and bundle_path and bundle_path.exists():
+            self.bundle = ScriptBundle(bundle_path)
+        self.key = (key or getattr(settings, 'ENCRYPTION_KEY', '')).encode()
+        # Only needed for encrypted scripts, so a bundle of plain scripts works without a key
+        self.fernet = Fernet(self.key) if self.key else None
+        self.cache_size = max(0, cache_size)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
 
     def load_encrypted_script(self, script_id: str) -> str:
-        """Load and decrypt embedded script"""
-        try:
-            # Get encrypted script from embedded_scripts
-            encrypted_data = EMBEDDED_SCRIPTS.get(script_id)
-            if notf"Script {script_id} not found")
+        """Load and decrypt embedded script, or return it from the cache"""
+        with self._lock:
+            if script_id in self._cache:
+                self._cache.move_to_end(script_id)
+                return self._cache[script_id]
+
+        encrypted_data = self.scripts.get(script_id)
+        if encrypted_data:
+            if self.fernet is None:
+                raise ValueError(f"Script {script_id} is encrypted and no ENCRYPTION_KEY is set")
+            try:
+                decrypted = self.fernet.decrypt(base64.b64decode(encrypted_data))
+            except (ValueError, InvalidToken) as e:
+                raise ValueError(f"Script {script_id} could not be decrypted") from e
+        elif self.bundle is not None and script_id in self.bundle:
+            decrypted = self.bundle.read(script_id, self.fernet)  # BundleError is a ValueError
+        else:
+            raise ValueError(f"Script {script_id} not found")
+        script = decrypted.decode()
 
-            # Decode and decrypt
-            decoded = base64.b64decode(encrypted_data)
-            decrypted = self.fernet.decrypt(decoded)
-            return decrypted.decode()
+        if self.cache_size:
+            with self._lock:
+                self._cache[script_id] = script
+                self._cache.move_to_end(script_id)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return script
 
-    def execute_secure_script(self, script_id: str):
-        """Execute script securely"""
+    def evict(self, script_id: str):
+        """Drops a script's decrypted body from the cache"""
+        with self._lock:
+            self._cache.pop(script_id, None)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def execute_secure_script(self, script_id: str) -> subprocess.CompletedProcess:
+        """Execute script securely, without writing it to disk"""
         script_content = self.load_encrypted_script(script_id)
-        
-        # Create temporary script file
-        temp_path = os.path.join(os.getenv('TMPDIR', '/tmp'), f'{os.urandom(16).hex()}.sh')
+
+        fd, feeder = _script_fd(script_content.encode())
         try:
-            with open(temp_path, 'w') as f:
-                f.write(script_content)
-            os.chmod(temp_path, 0o700)  # Executable only by owner
-            
-            # Execute and return result
-            result = subprocess.run(['bash', temp_path], 
-                                 capture_output=True, 
-                                 text=True)
+            if feeder is None:
+                command = ['bash', f'/dev/fd/{fd}']
+            else:
+                command = ['bash', '-c', PIPE_RUNNER.format(fd=fd), script_id]
+            return subprocess.run(command,
+                                  pass_fds=(fd,),
+                                  capture_output=True,
+                                  text=True)
         finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
\ No newline at end of file
+            os.close(fd)
+            if feeder is not None:
+                feeder.join()
@@ -4,24 +4,29 @@ import sys
 import logging
 from pathlib import Path
 from hashlib import sha256
-import importlib
-import webbrowser
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QMessageBox, QDialog, QTabWidget, QGridLayout, QToolBar, QLineEdit,
-    QApplication
+    QMessageBox, QDialog, QTabWidget, QToolBar, QLineEdit, QCheckBox
 )
 from PyQt6.QtGui import QIcon, QAction, QPixmap
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 
 from app.config import settings
 from app.gui.dialogs import PasswordDialog, SystemPasswordDialog, AboutDialog
-from app.gui.script_output_dialog import ScriptOutputDialog
-from app.gui.settings_window import SettingsWindow
+from app.gui.script_list_model import ScriptButtonDelegate, ScriptFilterProxyModel, ScriptGridView, ScriptListModel
 from app.utils.sudo_utils import check_sudo_password, keep_sudo_active
-from app.utils.script_runner import ScriptRunner
-from app.utils.file_utils import audit_script_files
+from app.utils.config_store import get_store
+from app.utils.output_log import DEFAULT_TAIL_LINES, RunLog
+from app.utils.resource_limits import format_usage, script_limits
+from app.utils.script_registry import ScriptRegistry
+from app.utils.search_index import ScriptSearchIndex
+from app.utils.workflow_graph import WorkflowGraphError, build_steps, get_max_parallel, has_dependency_data
+from app.utils.workflow_progress import DurationEstimator
+from app.utils import startup_profiler
+
+# The settings, editor and output dialogs and the script runners are imported on
+# first use so that only what the login prompt needs is loaded at startup.
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -30,6 +35,11 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(settings.APP_NAME)
         self.setWindowIcon(QIcon.fromTheme("system-run"))
         self._auth_success = False
+        self.script_registry = ScriptRegistry(settings.SCRIPTS)
+        self.search_index = ScriptSearchIndex(self.script_registry)
+        # Opened on first use, so its disk I/O isn't in front of the login prompt
+        self._run_history = None
+        self._duration_estimator = None
 
         if not self.authenticate():
             logging.warning("Application-level authentication failed. Exiting.")
@@ -40,17 +50,35 @@ class MainWindow(QMainWindow):
             return
 
         self._auth_success = True
-        self.start_sudo_keep_alive()
+        self.start_privileged_helper()
+        self.prewarm_shell_pool()
         self.setup_ui()
         self.resize(1000, 800)
+        if get_store() is not None:
+            get_store().subscribe(self.on_config_changed)
         
         self.perform_script_audit()
+        self.start_file_watcher()
         
         logging.info("Main window initialized successfully.")
 
     def is_auth_successful(self):
         return self._auth_success
 
+    @property
+    def run_history(self):
+        if self._run_history is None:
+            from app.utils.run_history import RunHistory
+            self._run_history = RunHistory()
+        return self._run_history
+
+    @property
+    def duration_estimator(self):
+        if self._duration_estimator is None:
+            # Reads the run history only when the first workflow starts
+            self._duration_estimator = DurationEstimator(self.run_history)
+        return self._duration_estimator
+
     def setup_ui(self):
         logging.debug("Setting up UI")
         central_widget = QWidget()
@@ -83,12 +111,22 @@ class MainWindow(QMainWindow):
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("Search:"))
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Filter scripts by name or description...")
-        self.search_bar.textChanged.connect(self.filter_scripts)
+        self.search_bar.setPlaceholderText("Filter scripts by name, description, category or tag...")
+        # Debounce typing so the filter runs once per pause rather than per keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_scripts)
+        self.search_bar.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_bar)
         advanced_layout.addLayout(search_layout)
 
         self.script_tabs = QTabWidget()
+        self.script_model = ScriptListModel(self)
+        self.script_delegate = ScriptButtonDelegate(self)
+        self.script_delegate.script_clicked.connect(self.confirm_and_run_script)
+        self.script_delegate.uninstall_clicked.connect(self.confirm_and_run_script)
+        self.tab_proxies = {}
         self.populate_script_tabs()
         advanced_layout.addWidget(self.script_tabs)
 
@@ -122,6 +160,10 @@ class MainWindow(QMainWindow):
         
         toolbar.addSeparator()
         
+        history_action = QAction(QIcon.fromTheme("document-open-recent"), "Run History...", self)
+        history_action.triggered.connect(self.open_run_history)
+        toolbar.addAction(history_action)
+
         settings_action = QAction(QIcon.fromTheme("document-properties"), "Settings...", self)
         settings_action.triggered.connect(self.open_settings_window)
         toolbar.addAction(settings_action)
@@ -130,110 +172,120 @@ class MainWindow(QMainWindow):
         dialog = AboutDialog(self)
         dialog.exec()
 
+    def open_run_history(self):
+        from app.gui.run_history_dialog import RunHistoryDialog
+        dialog = RunHistoryDialog(self.run_history, self.script_registry, self)
+        dialog.exec()
+
     def open_settings_window(self):
+        from app.gui.settings_window import SettingsWindow
         dialog = SettingsWindow(self)
-        result = dialog.exec()
-        
-        if result == QDialog.DialogCode.Accepted:
-            logging.info("Settings were changed. Reloading configuration and UI.")
-            importlib.reload(settings)
+        dialog.exec()
+
+    def on_config_changed(self, sections):
+        """Refreshes the parts of the UI whose config sections were saved; settings already holds the new values."""
+        logging.info(f"Settings were changed ({', '.join(sorted(sections))}). Refreshing UI.")
+        if 'general' in sections:
             self.setWindowTitle(settings.APP_NAME)
             self.load_logo()
+        if 'scripts' in sections:
+            old_script_files = self.script_registry.script_files()
+            # Only the scripts that changed are re-indexed
+            for script_id in self.script_registry.sync(settings.SCRIPTS):
+                script = self.script_registry.get(script_id)
+                if script is None:
+                    self.search_index.remove(script_id)
+                else:
+                    self.search_index.update(script)
             self.populate_script_tabs()
+            self.update_script_audit(old_script_files ^ self.script_registry.script_files())
+        if 'scripts' in sections or 'workflows' in sections:
             self.setup_workflow_buttons()
 
     def populate_script_tabs(self):
-        self.script_tabs.clear()
-        all_categories = sorted(list(set(s['category'] for s in settings.SCRIPTS)))
-        self.tab_widgets = {}
-
-        for category in all_categories:
+        """
+        Refreshes the script tabs from the registry. The rows live in one shared
+        model that is updated row by row; tabs are only rebuilt when the set of
+        categories changes.
+        """
+        categories = []
+        for category in self.script_registry.categories():
             is_uninstaller_category = category.lower() == 'uninstall'
-            if is_uninstaller_category and all(self.is_linked_uninstaller(s['id']) for s in settings.SCRIPTS if s['category'] == category):
-                continue
-
-            tab_content = QWidget()
-            layout = QGridLayout(tab_content)
-            layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-            self.tab_widgets[category] = {'widget': tab_content, 'layout': layout, 'cell_widgets': []}
-            self.script_tabs.addTab(tab_content, category.capitalize())
-
-        for script in sorted(settings.SCRIPTS, key=lambda s: s['name'].lower()):
-            category = script['category']
-            
-            if category.lower() == 'uninstall' and self.is_linked_uninstaller(script['id']):
+            if is_uninstaller_category and all(self.is_linked_uninstaller(s['id']) for s in self.script_registry.by_category(category)):
                 continue
+            categories.append(category)
 
-            if category not in self.tab_widgets:
+        entries = []
+        for script in self.script_registry:
+            if script['category'].lower() == 'uninstall' and self.is_linked_uninstaller(script['id']):
                 continue
-
-            cell_widget = QWidget()
-            cell_layout = QHBoxLayout(cell_widget)
-            cell_layout.setContentsMargins(2, 2, 2, 2)
-            cell_layout.setSpacing(5)
-            cell_widget.setProperty("script_id", script['id'])
-
-            button = QPushButton(script['name'])
-            button.setToolTip(script['description'])
-            button.clicked.connect(lambda _, s=script: self.confirm_and_run_script(s))
-            cell_layout.addWidget(button)
-
-            if script.get('category', '').lower() == 'software' and script.get('uninstall_id'):
-                uninstall_script = self.get_script_by_id(script['uninstall_id'])
-                if uninstall_script:
-                    uninstall_button = QPushButton()
-                    uninstall_button.setIcon(QIcon.fromTheme("edit-delete"))
-                    uninstall_button.setToolTip(f"Uninstall: {uninstall_script['name']}\n{uninstall_script['description']}")
-                    uninstall_button.setFixedWidth(35)
-                    uninstall_button.clicked.connect(lambda _, s=uninstall_script: self.confirm_and_run_script(s))
-                    cell_layout.addWidget(uninstall_button)
-
-            cell_list = self.tab_widgets[category]['cell_widgets']
-            row, col = divmod(len(cell_list), 3)
-            self.tab_widgets[category]['layout'].addWidget(cell_widget, row, col)
-            cell_list.append(cell_widget)
+            uninstall_script = None
+            if script['category'].lower() == 'software':
+                uninstall_script = self.script_registry.uninstaller_for(script['id'])
+            entries.append((script, uninstall_script))
+        self.script_model.set_scripts(entries)
+
+        if categories != list(self.tab_proxies):
+            self.script_tabs.clear()
+            self.tab_proxies = {}
+            for category in categories:
+                proxy = ScriptFilterProxyModel(category, self.script_tabs)
+                proxy.setSourceModel(self.script_model)
+                view = ScriptGridView()
+                view.setModel(proxy)
+                view.setItemDelegate(self.script_delegate)
+                self.tab_proxies[category] = proxy
+                self.script_tabs.addTab(view, category.capitalize())
+
+        self.filter_scripts()
 
     def is_linked_uninstaller(self, script_id):
-        return any(script_id == s.get('uninstall_id') for s in settings.SCRIPTS if 'uninstall_id' in s)
+        return self.script_registry.is_linked_uninstaller(script_id)
 
     def filter_scripts(self):
-        filter_text = self.search_bar.text().lower()
-        for category, data in self.tab_widgets.items():
-            for cell_widget in data['cell_widgets']:
-                script_id = cell_widget.property("script_id")
-                script = self.get_script_by_id(script_id)
-                if not script: continue
-                matches_name = filter_text in script['name'].lower()
-                matches_desc = filter_text in script['description'].lower()
-                cell_widget.setVisible(matches_name or matches_desc)
+        """Shows only the scripts matching the search text, best matches first."""
+        query = self.search_bar.text().strip()
+        ranking = None
+        if query:
+            ranking = {script_id: i for i, script_id in enumerate(self.search_index.search(query))}
+        for proxy in self.tab_proxies.values():
+            proxy.set_ranking(ranking)
 
     def setup_workflow_buttons(self):
-        if self.workflow_buttons_container.layout() is not None:
-            old_layout = self.workflow_buttons_container.layout()
-            while old_layout.count():
-                item = old_layout.takeAt(0)
-                widget = item.widget()
-                if widget is not None:
-                    widget.deleteLater()
-            import sip
-            sip.delete(old_layout)
-
-        workflow_layout = QHBoxLayout(self.workflow_buttons_container)
-        
-        if not settings.WORKFLOWS:
-            self.workflow_buttons_container.setVisible(False)
-            return
-
-        self.workflow_buttons_container.setVisible(True)
-        for wf_id, wf_details in settings.WORKFLOWS.items():
-            button = QPushButton(wf_details['name'])
+        """
+        Syncs the workflow buttons with settings.WORKFLOWS: buttons of removed
+        workflows are deleted, existing ones are updated in place and new ones
+        are created, keeping the configured order.
+        """
+        if self.workflow_buttons_container.layout() is None:
+            QHBoxLayout(self.workflow_buttons_container)
+            self.workflow_buttons = {}
+        workflow_layout = self.workflow_buttons_container.layout()
+
+        for wf_id in list(self.workflow_buttons):
+            if wf_id not in settings.WORKFLOWS:
+                button = self.workflow_buttons.pop(wf_id)
+                workflow_layout.removeWidget(button)
+                button.deleteLater()
+
+        for position, (wf_id, wf_details) in enumerate(settings.WORKFLOWS.items()):
+            button = self.workflow_buttons.get(wf_id)
+            if button is None:
+                button = QPushButton()
+                button.setIcon(QIcon.fromTheme("media-playlist-repeat"))
+                button.setIconSize(QSize(24, 24))
+                button.clicked.connect(lambda _, wid=wf_id: self.confirm_and_run_workflow(wid, settings.WORKFLOWS[wid]))
+                self.workflow_buttons[wf_id] = button
+            button.setText(wf_details['name'])
             button.setToolTip(wf_details['description'])
-            button.setIcon(QIcon.fromTheme("media-playlist-repeat"))
-            button.setIconSize(QSize(24, 24))
-            button.clicked.connect(lambda _, wid=wf_id, dets=wf_details: self.confirm_and_run_workflow(wid, dets))
-            workflow_layout.addWidget(button)
+            if workflow_layout.indexOf(button) != position:
+                workflow_layout.removeWidget(button)
+                workflow_layout.insertWidget(position, button)
+
+        self.workflow_buttons_container.setVisible(bool(settings.WORKFLOWS))
 
     def open_info_link(self):
+        import webbrowser
         webbrowser.open("https://github.com/TimKenobi?tab=overview")
 
     def toggle_advanced_features(self):
@@ -249,85 +301,126 @@ class MainWindow(QMainWindow):
             self.run_script(script_info)
 
     def confirm_and_run_workflow(self, workflow_id, workflow_details):
-        script_names = "\n".join([f"- {self.get_script_by_id(sid)['name']}" for sid in workflow_details['scripts'] if self.get_script_by_id(sid)])
-        reply = QMessageBox.question(self, 'Confirmation',
-            f"Are you sure you want to run the '{workflow_details['name']}' workflow?\n\nIt will run the following scripts in order:\n{script_names}",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
-        if reply == QMessageBox.StandardButton.Yes:
-            self.run_multiple_scripts(workflow_details['scripts'], workflow_details['name'])
+        from app.utils.result_cache import workflow_cache_ttl
+
+        try:
+            steps = build_steps(workflow_details)
+        except WorkflowGraphError as e:
+            logging.error(f"Workflow '{workflow_id}' has invalid dependencies: {e}")
+            QMessageBox.critical(self, "Workflow Error", f"The '{workflow_details['name']}' workflow cannot be run:\n\n{e}")
+            return
+
+        script_names = "\n".join([f"- {self.get_script_by_id(step['id'])['name']}" for step in steps if self.get_script_by_id(step['id'])])
+        if has_dependency_data(workflow_details):
+            order_text = f"It will run the following scripts, up to {get_max_parallel(workflow_details)} at a time as their dependencies finish:"
+        else:
+            order_text = "It will run the following scripts in order:"
+        box = QMessageBox(QMessageBox.Icon.Question, 'Confirmation',
+            f"Are you sure you want to run the '{workflow_details['name']}' workflow?\n\n{order_text}\n{script_names}",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, self)
+        box.setDefaultButton(QMessageBox.StandardButton.No)
+        if workflow_cache_ttl(workflow_details):
+            box.setCheckBox(QCheckBox("Rerun steps that already succeeded recently"))
+        if box.exec() == QMessageBox.StandardButton.Yes:
+            force = box.checkBox() is not None and box.checkBox().isChecked()
+            self.run_multiple_scripts(workflow_details, steps, workflow_id, force)
 
     def run_script(self, script_info, is_workflow_part=False):
+        from app.gui.script_output_dialog import ScriptOutputDialog
+        from app.utils.execution_engine import script_timeouts
+        from app.utils.script_runner import ScriptRunner
+
         logging.info(f"Running script: {script_info['name']} (ID: {script_info['id']})")
-        dialog = ScriptOutputDialog(f"Running: {script_info['name']}", self)
+        run_log = RunLog(script_info['id'], tail_lines=getattr(settings, 'OUTPUT_MAX_LINES', DEFAULT_TAIL_LINES))
+        dialog = ScriptOutputDialog(f"Running: {script_info['name']}", self, run_log)
         
         # CORRECTED PATH: Use SCRIPT_DIR, not APP_DIR
         script_path = settings.SCRIPT_DIR / script_info['path']
         if not script_path.exists():
             error_msg = f"Script file not found: {script_path}"
             logging.error(error_msg)
+            run_log.write(f"ERROR: {error_msg}\n")
+            run_log.close()
             dialog.append_output(f"ERROR: {error_msg}\n")
             dialog.mark_as_failed()
             dialog.exec()
             return False
 
-        runner = ScriptRunner(str(script_path), self.system_password, script_info.get('needs_sudo', False))
+        timeout, grace_period = script_timeouts(script_info)
+        runner = ScriptRunner(str(script_path), self.system_password, script_info.get('needs_sudo', False),
+                              timeout, grace_period, script_limits(script_info), script_info.get('ephemeral', False))
+        dialog.cancel_requested.connect(runner.cancel)
+        # The run log is written first, so the dialog can always reload anything it has shown
+        runner.output_ready.connect(run_log.write)
         runner.output_ready.connect(dialog.append_output)
+        runner.finished.connect(lambda _: self.report_script_usage(runner, run_log, dialog))
+        runner.finished.connect(lambda _: run_log.close())
+        runner.finished.connect(lambda _: self.record_script_run(runner, script_info))
         runner.finished.connect(dialog.mark_as_finished)
         
         runner.start()
         dialog.exec()
         return runner.get_success_status()
 
-    def run_multiple_scripts(self, script_ids, workflow_name):
+    def report_script_usage(self, runner, run_log, dialog):
+        """Adds a finished ScriptRunner's resource usage to the end of its output."""
+        if runner.usage:
+            text = f"\n--- Resources: {format_usage(runner.usage)} ---\n"
+            run_log.write(text)
+            dialog.append_output(text)
+
+    def record_script_run(self, runner, script_info):
+        """Stores a finished ScriptRunner's run in the history and the duration estimates."""
+        self.run_history.record_run(script_info['id'], runner.started_at, runner.finished_at, runner.exit_code,
+                                    runner.needs_sudo, runner.output_bytes, usage=runner.usage)
+        if runner.exit_code == 0:
+            self.duration_estimator.add_sample(script_info['id'], runner.finished_at - runner.started_at)
+
+    def run_multiple_scripts(self, workflow_details, steps, workflow_id=None, force=False):
+        from app.gui.script_output_dialog import ScriptOutputDialog
+        from app.utils.result_cache import ResultCache, workflow_cache_ttl
+        from app.utils.workflow_runner import WorkflowRunner
+
+        workflow_name = workflow_details['name']
         logging.info(f"Starting workflow: {workflow_name}")
-        dialog = ScriptOutputDialog(f"Workflow: {workflow_name}", self)
-        dialog.show()
-        
-        total_success = True
-        for i, script_id in enumerate(script_ids):
-            script_info = self.get_script_by_id(script_id)
-            if not script_info:
-                error_msg = f"Workflow aborted: Script with ID '{script_id}' not found."
-                logging.error(error_msg)
-                dialog.append_output(f"\n--- ERROR ---\n{error_msg}\n")
-                total_success = False
-                break
-
-            dialog.append_output(f"\n--- Starting Step {i+1}/{len(script_ids)}: {script_info['name']} ---\n")
-            QApplication.processEvents()
-
-            # CORRECTED PATH: Use SCRIPT_DIR, not APP_DIR
-            script_path = settings.SCRIPT_DIR / script_info['path']
-            if not script_path.exists():
-                dialog.append_output(f"ERROR: Script file not found: {script_path}\n")
-                success = False
-            else:
-                runner = ScriptRunner(str(script_path), self.system_password, script_info.get('needs_sudo', False))
-                runner.output_ready.connect(dialog.append_output)
-                
-                runner.start()
-                while not runner.isFinished():
-                    QApplication.processEvents()
-                success = runner.get_success_status()
-
-            dialog.append_output(f"--- Step {i+1} {'Succeeded' if success else 'Failed'} ---\n")
-            QApplication.processEvents()
-
-            if not success:
-                total_success = False
-                reply = QMessageBox.warning(self, "Workflow Error",
-                    f"The script '{script_info['name']}' failed. Do you want to continue with the rest of the workflow?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
-                if reply == QMessageBox.StandardButton.No:
-                    break
-        
-        dialog.mark_as_finished(total_success)
+        run_log = RunLog(f"workflow_{workflow_name}", tail_lines=getattr(settings, 'OUTPUT_MAX_LINES', DEFAULT_TAIL_LINES))
+        dialog = ScriptOutputDialog(f"Workflow: {workflow_name}", self, run_log)
+
+        ttl = workflow_cache_ttl(workflow_details)
+        cache = ResultCache(self.run_history, settings.SCRIPT_DIR, ttl, force) if ttl and self.run_history.available else None
+        runner = WorkflowRunner(steps, self.get_script_by_id, settings.SCRIPT_DIR, self.system_password,
+                                get_max_parallel(workflow_details), self.run_history, workflow_id,
+                                self.duration_estimator, cache, self)
+        runner.output_ready.connect(run_log.write)
+        runner.output_ready.connect(dialog.append_output)
+        runner.step_failed.connect(lambda _, name: runner.resume(self.confirm_continue_workflow(name)))
+        runner.progress_changed.connect(dialog.set_progress)
+        dialog.cancel_requested.connect(runner.cancel)
+        runner.finished.connect(lambda _: run_log.close())
+        runner.finished.connect(dialog.mark_as_finished)
+        runner.finished.connect(runner.deleteLater)
+
+        runner.start()
+        dialog.exec()
+
+    def confirm_continue_workflow(self, script_name):
+        reply = QMessageBox.warning(self, "Workflow Error",
+            f"The script '{script_name}' failed. Do you want to continue with the rest of the workflow?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+        return reply == QMessageBox.StandardButton.Yes
 
     def get_script_by_id(self, script_id):
-        return next((s for s in settings.SCRIPTS if s['id'] == script_id), None)
+        return self.script_registry.get(script_id)
 
     def perform_script_audit(self):
-        untracked, missing = audit_script_files(settings.SCRIPTS, settings.SCRIPT_DIR)
+        from app.utils.script_manifest import ScriptManifest
+        self.script_manifest = ScriptManifest(settings.SCRIPT_DIR)
+        report = self.script_manifest.audit(self.script_registry.script_files())
+        self.untracked_scripts = set(report.untracked)
+        self.missing_scripts = set(report.missing)
+        self.log_audit_results(report.untracked, report.missing, report.modified)
+
+    def log_audit_results(self, untracked, missing, modified=()):
         if untracked:
             logging.warning("AUDIT: The following scripts exist in the scripts directory but are not configured in settings.py:")
             for script_file in untracked:
@@ -336,6 +429,36 @@ class MainWindow(QMainWindow):
             logging.warning("AUDIT: The following scripts are defined in settings.py but are MISSING from the scripts directory:")
             for script_file in missing:
                 logging.warning(f"  - MISSING: {script_file}")
+        if modified:
+            logging.warning("AUDIT: The following scripts have changed since the last audit:")
+            for script_file in modified:
+                logging.warning(f"  - MODIFIED: {script_file}")
+
+    def update_script_audit(self, script_files):
+        """Re-audits only the given script filenames and logs what changed."""
+        if not script_files:
+            return
+        report = self.script_manifest.audit(self.script_registry.script_files(), script_files)
+        untracked, missing = report.untracked, report.missing
+        resolved = (self.untracked_scripts | self.missing_scripts) & (set(script_files) - set(untracked) - set(missing))
+        for script_file in sorted(resolved):
+            logging.info(f"AUDIT: {script_file} is no longer untracked or missing.")
+        self.log_audit_results([f for f in untracked if f not in self.untracked_scripts],
+                               [f for f in missing if f not in self.missing_scripts],
+                               report.modified)
+        self.untracked_scripts = (self.untracked_scripts - set(script_files)) | set(untracked)
+        self.missing_scripts = (self.missing_scripts - set(script_files)) | set(missing)
+
+    def start_file_watcher(self):
+        """Picks up script files and config files changed outside the app while it runs."""
+        from app.utils.file_watcher import ConfigWatcher
+        store = get_store()
+        if store is None:
+            return
+        self.file_watcher = ConfigWatcher(settings.SCRIPT_DIR, store.config_dir, parent=self)
+        self.file_watcher.scripts_changed.connect(
+            lambda added, removed, modified: self.update_script_audit(added | removed | modified))
+        self.file_watcher.config_changed.connect(lambda _: store.reload_from_disk())
 
     def closeEvent(self, event):
         logging.info("Close event triggered.")
@@ -352,6 +475,10 @@ class MainWindow(QMainWindow):
                 logging.warning("Could not find 'enable_gatekeeper' script to run on exit.")
             
             logging.info("Exiting application.")
+            from app.utils.privileged_helper import stop_helper
+            from app.utils.shell_pool import stop_shell_pool
+            stop_helper()
+            stop_shell_pool()
             event.accept()
         else:
             event.ignore()
@@ -360,6 +487,8 @@ class MainWindow(QMainWindow):
         attempts = 0
         while attempts < settings.MAX_LOGIN_ATTEMPTS:
             dialog = PasswordDialog(self)
+            startup_profiler.mark("login prompt shown")
+            startup_profiler.report()
             if dialog.exec() != QDialog.DialogCode.Accepted: return False
             entered_hash = sha256(dialog.get_password().encode()).hexdigest()
             if entered_hash == settings.PASSWORD_HASH:
@@ -381,6 +510,18 @@ class MainWindow(QMainWindow):
         logging.info("System-level (sudo) password authenticated.")
         return True
 
+    def start_privileged_helper(self):
+        """Runs sudo scripts through one root helper process, or falls back to sudo per script."""
+        from app.utils.privileged_helper import start_helper
+        if start_helper(self.system_password, settings.SCRIPT_DIR) is None:
+            self.start_sudo_keep_alive()
+
+    def prewarm_shell_pool(self):
+        """Starts the shell workers for ephemeral scripts up front, if there are any."""
+        from app.utils.shell_pool import get_shell_pool
+        if any(script.get('ephemeral') and not script.get('needs_sudo') for script in settings.SCRIPTS):
+            get_shell_pool().prewarm()
+
     def start_sudo_keep_alive(self):
         import threading
         self.keep_alive_thread = threading.Thread(
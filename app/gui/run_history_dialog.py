@@ -0,0 +1,155 @@
+# app/gui/run_history_dialog.py
+
+import time
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTabWidget,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QDialogButtonBox
+)
+from PyQt6.QtCore import Qt
+
+RECENT_RUNS_LIMIT = 500
+
+
+def _format_time(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)) if timestamp else ""
+
+
+def _format_duration(seconds):
+    if seconds is None:
+        return ""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes < 60 else f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _format_cpu(seconds):
+    return "" if seconds is None else f"{seconds:.2f}s"
+
+
+def _format_rss(kilobytes):
+    return "" if kilobytes is None else _format_bytes(kilobytes * 1024)
+
+
+class _SortableItem(QTableWidgetItem):
+    """Table item that displays formatted text but sorts by a raw value."""
+    def __init__(self, text, sort_value):
+        super().__init__(text)
+        self.sort_value = -1 if sort_value is None else sort_value
+
+    def __lt__(self, other):
+        if isinstance(other, _SortableItem):
+            return self.sort_value < other.sort_value
+        return super().__lt__(other)
+
+
+class RunHistoryDialog(QDialog):
+    """Shows past runs from the run history and p50/p95 durations, CPU time and peak memory per script."""
+    def __init__(self, run_history, script_registry, parent=None):
+        super().__init__(parent)
+        self.run_history = run_history
+        self.script_registry = script_registry
+        self.setWindowTitle("Run History")
+        self.setMinimumSize(900, 550)
+        self.setup_ui()
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Script:"))
+        self.script_filter = QComboBox()
+        self.script_filter.addItem("All scripts", None)
+        for script in sorted(self.script_registry, key=lambda s: s['name'].lower()):
+            self.script_filter.addItem(f"{script['name']} ({script['id']})", script['id'])
+        self.script_filter.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.script_filter, 1)
+        layout.addLayout(filter_layout)
+
+        self.tabs = QTabWidget()
+        self.runs_table = self._create_table(["Started", "Script", "Workflow", "Duration", "Exit Code", "Sudo", "Output",
+                                              "CPU", "Max RSS"])
+        self.stats_table = self._create_table(["Script", "Runs", "Failures", "p50", "p95", "CPU p50", "Max RSS", "Last Run"])
+        self.runs_table.sortByColumn(0, Qt.SortOrder.DescendingOrder)
+        self.tabs.addTab(self.runs_table, "Recent Runs")
+        self.tabs.addTab(self.stats_table, "Script Timings")
+        layout.addWidget(self.tabs)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def _create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def _script_name(self, script_id):
+        script = self.script_registry.get(script_id)
+        return script['name'] if script else script_id
+
+    def refresh(self):
+        if not self.run_history.available:
+            self.status_label.setText(f"The run history could not be opened: {self.run_history.db_path}")
+            return
+        script_id = self.script_filter.currentData()
+        self._fill_runs(self.run_history.recent_runs(RECENT_RUNS_LIMIT, script_id))
+        self._fill_stats(self.run_history.duration_stats(script_id))
+
+    def _fill_runs(self, runs):
+        self.runs_table.setSortingEnabled(False)
+        self.runs_table.setRowCount(len(runs))
+        for row, run in enumerate(runs):
+            items = [
+                _SortableItem(_format_time(run['started_at']), run['started_at']),
+                QTableWidgetItem(self._script_name(run['script_id'])),
+                QTableWidgetItem(run['workflow_id'] or ""),
+                _SortableItem(_format_duration(run['duration']), run['duration']),
+                _SortableItem("killed" if run['exit_code'] is None else str(run['exit_code']), run['exit_code']),
+                QTableWidgetItem("Yes" if run['needs_sudo'] else ""),
+                _SortableItem(_format_bytes(run['output_bytes']), run['output_bytes']),
+                _SortableItem(_format_cpu(run['cpu_seconds']), run['cpu_seconds']),
+                _SortableItem(_format_rss(run['max_rss_kb']), run['max_rss_kb']),
+            ]
+            if run['exit_code'] != 0:
+                items[4].setForeground(Qt.GlobalColor.red)
+            for column, item in enumerate(items):
+                self.runs_table.setItem(row, column, item)
+        self.runs_table.setSortingEnabled(True)
+        self.status_label.setText(f"Showing the {len(runs)} most recent runs." if runs else "No runs recorded yet.")
+
+    def _fill_stats(self, stats):
+        self.stats_table.setSortingEnabled(False)
+        self.stats_table.setRowCount(len(stats))
+        for row, (script_id, entry) in enumerate(sorted(stats.items())):
+            items = [
+                QTableWidgetItem(self._script_name(script_id)),
+                _SortableItem(str(entry['runs']), entry['runs']),
+                _SortableItem(str(entry['failures']), entry['failures']),
+                _SortableItem(_format_duration(entry['p50']), entry['p50']),
+                _SortableItem(_format_duration(entry['p95']), entry['p95']),
+                _SortableItem(_format_cpu(entry['cpu_p50']), entry['cpu_p50']),
+                _SortableItem(_format_rss(entry['max_rss_kb']), entry['max_rss_kb']),
+                _SortableItem(_format_time(entry['last_run']), entry['last_run']),
+            ]
+            for column, item in enumerate(items):
+                self.stats_table.setItem(row, column, item)
+        self.stats_table.setSortingEnabled(True)
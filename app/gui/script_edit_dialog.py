@@ -7,9 +7,12 @@ from pathlib import Path
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QLineEdit, QTextEdit,
     QComboBox, QCheckBox, QDialogButtonBox, QWidget, QHBoxLayout,
-    QPushButton, QFileDialog, QMessageBox
+    QPushButton, QFileDialog, QMessageBox, QSpinBox
 )
 
+from app.utils.execution_engine import DEFAULT_GRACE_PERIOD, script_timeouts
+from app.utils.resource_limits import script_limits
+
 class ScriptEditDialog(QDialog):
     """
     A dialog for adding a new script or editing an existing one.
@@ -69,6 +72,40 @@ class ScriptEditDialog(QDialog):
         self.needs_sudo_checkbox.setToolTip("Check this if the script needs to be run with 'sudo' (administrator privileges).")
         self.needs_sudo_checkbox.setChecked(self.script_data.get("needs_sudo", False))
 
+        self.ephemeral_checkbox = QCheckBox()
+        self.ephemeral_checkbox.setToolTip("Check this for quick scripts that don't need sudo, to run them in an already running shell.\n"
+                                           "No resource usage is recorded for them.")
+        self.ephemeral_checkbox.setChecked(self.script_data.get("ephemeral", False))
+
+        timeout, grace_period = script_timeouts(self.script_data)
+        self.timeout_input = QSpinBox()
+        self.timeout_input.setRange(0, 7 * 24 * 3600)
+        self.timeout_input.setSuffix(" s")
+        self.timeout_input.setSpecialValueText("No limit")
+        self.timeout_input.setValue(int(timeout or 0))
+        self.timeout_input.setToolTip("Optional: Stop the script, and anything it started, if it runs longer than this.")
+
+        self.grace_period_input = QSpinBox()
+        self.grace_period_input.setRange(0, 3600)
+        self.grace_period_input.setSuffix(" s")
+        self.grace_period_input.setValue(int(grace_period))
+        self.grace_period_input.setToolTip("How long a timed-out or cancelled script gets to clean up before it is killed.")
+
+        limits = script_limits(self.script_data)
+        self.cpu_limit_input = self._create_limit_input(limits.get('cpu_seconds'), 7 * 24 * 3600, " s",
+            "Optional: CPU time the script, and each process it starts, may use before it is killed.")
+        self.memory_limit_input = self._create_limit_input(limits.get('memory_mb'), 1024 * 1024, " MB",
+            "Optional: Address space each process of the script may use (enforced on Linux, not on macOS).")
+        self.open_files_limit_input = self._create_limit_input(limits.get('open_files'), 1024 * 1024, "",
+            "Optional: Number of files each process of the script may have open.")
+        self.nice_input = self._create_limit_input(limits.get('nice'), 19, "",
+            "Optional: Run the script at a lower priority (1-19) so it doesn't slow down the Mac.")
+        self.nice_input.setSpecialValueText("Normal")
+
+        self.tags_input = QLineEdit(", ".join(self.script_data.get("tags", [])))
+        self.tags_input.setToolTip("Optional: Comma-separated tags used by the search bar (e.g., 'microsoft, office').")
+        self.tags_input.setPlaceholderText("e.g., microsoft, office")
+
         self.uninstall_id_input = QLineEdit(self.script_data.get("uninstall_id", ""))
         self.uninstall_id_input.setToolTip("Optional: If this is an installer, enter the ID of the corresponding uninstall script here.")
         self.uninstall_id_input.setPlaceholderText("e.g., uninstall_office")
@@ -79,6 +116,14 @@ class ScriptEditDialog(QDialog):
         form_layout.addRow("Description:", self.desc_input)
         form_layout.addRow("Category:", self.category_input)
         form_layout.addRow("Needs Sudo:", self.needs_sudo_checkbox)
+        form_layout.addRow("Quick Script:", self.ephemeral_checkbox)
+        form_layout.addRow("Timeout:", self.timeout_input)
+        form_layout.addRow("Grace Period:", self.grace_period_input)
+        form_layout.addRow("CPU Limit:", self.cpu_limit_input)
+        form_layout.addRow("Memory Limit:", self.memory_limit_input)
+        form_layout.addRow("Open Files Limit:", self.open_files_limit_input)
+        form_layout.addRow("Nice Level:", self.nice_input)
+        form_layout.addRow("Tags:", self.tags_input)
         form_layout.addRow("Uninstall Script ID:", self.uninstall_id_input)
         
         layout.addLayout(form_layout)
@@ -88,6 +133,15 @@ class ScriptEditDialog(QDialog):
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
+    def _create_limit_input(self, value, maximum, suffix, tooltip):
+        spin_box = QSpinBox()
+        spin_box.setRange(0, maximum)
+        spin_box.setSuffix(suffix)
+        spin_box.setSpecialValueText("No limit")
+        spin_box.setValue(value or 0)
+        spin_box.setToolTip(tooltip)
+        return spin_box
+
     def browse_for_script(self):
         """Opens a file dialog to select and copy a script file."""
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Script File", "", "Shell Scripts (*.sh);;All Files (*)")
@@ -143,6 +197,20 @@ class ScriptEditDialog(QDialog):
             "category": self.category_input.currentText().strip(),
             "needs_sudo": self.needs_sudo_checkbox.isChecked(),
         }
+        if self.ephemeral_checkbox.isChecked():
+            data["ephemeral"] = True
+        if self.timeout_input.value():
+            data["timeout"] = self.timeout_input.value()
+        if self.grace_period_input.value() != DEFAULT_GRACE_PERIOD:
+            data["grace_period"] = self.grace_period_input.value()
+        limits = {key: spin_box.value() for key, spin_box in (
+            ("cpu_seconds", self.cpu_limit_input), ("memory_mb", self.memory_limit_input),
+            ("open_files", self.open_files_limit_input), ("nice", self.nice_input)) if spin_box.value()}
+        if limits:
+            data["limits"] = limits
+        tags = [tag.strip() for tag in self.tags_input.text().split(",") if tag.strip()]
+        if tags:
+            data["tags"] = tags
         uninstall_id = self.uninstall_id_input.text().strip()
         if uninstall_id:
             data["uninstall_id"] = uninstall_id
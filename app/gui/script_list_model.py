@@ -0,0 +1,227 @@
+# app/gui/script_list_model.py
+
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QToolTip, QAbstractItemView
+from PyQt6.QtGui import QColor, QCursor, QIcon, QPainter, QPen
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QEvent, QModelIndex, QRect, QSize, QSortFilterProxyModel, pyqtSignal
+)
+
+ScriptRole = Qt.ItemDataRole.UserRole
+UninstallScriptRole = Qt.ItemDataRole.UserRole + 1
+ScriptIdRole = Qt.ItemDataRole.UserRole + 2
+CategoryRole = Qt.ItemDataRole.UserRole + 3
+
+# Colours match the QPushButton rules in style.py, since the delegate draws the buttons itself
+BUTTON_COLOR = QColor("#4a5160")
+BUTTON_HOVER_COLOR = QColor("#5a6170")
+BUTTON_BORDER_COLOR = QColor("#5a6170")
+BUTTON_TEXT_COLOR = QColor("#e0e0e0")
+
+
+class ScriptListModel(QAbstractListModel):
+    """
+    Flat list model of the scripts shown in the script tabs. Each row is a script,
+    optionally paired with the uninstall script shown next to it.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: List[Tuple[dict, Optional[dict]]] = []
+
+    def set_scripts(self, entries: List[Tuple[dict, Optional[dict]]]):
+        """
+        Replaces the rows with `entries`, matched up by script ID: rows of removed
+        scripts are removed, changed rows are updated in place and new scripts are
+        appended, so views only repaint what changed. Row order doesn't matter as
+        the proxies sort.
+        """
+        new_entries = {script['id']: (script, uninstall_script) for script, uninstall_script in entries}
+
+        for row in reversed(range(len(self._entries))):
+            if self._entries[row][0]['id'] not in new_entries:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._entries[row]
+                self.endRemoveRows()
+
+        existing = set()
+        for row, (script, uninstall_script) in enumerate(self._entries):
+            existing.add(script['id'])
+            entry = new_entries[script['id']]
+            changed = entry != (script, uninstall_script)
+            self._entries[row] = entry
+            if changed:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+        added = [entry for script_id, entry in new_entries.items() if script_id not in existing]
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self._entries), len(self._entries) + len(added) - 1)
+            self._entries.extend(added)
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._entries):
+            return None
+        script, uninstall_script = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return script['name']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return script.get('description', '')
+        if role == ScriptRole:
+            return script
+        if role == UninstallScriptRole:
+            return uninstall_script
+        if role == ScriptIdRole:
+            return script['id']
+        if role == CategoryRole:
+            return script.get('category', '')
+        return None
+
+
+class ScriptFilterProxyModel(QSortFilterProxyModel):
+    """
+    Shows the scripts of one category. While a search is active only matching
+    scripts are accepted and they are sorted by search rank; otherwise scripts
+    are sorted by name.
+    """
+    def __init__(self, category: str, parent=None):
+        super().__init__(parent)
+        self.category = category
+        self._ranking: Optional[Dict[str, int]] = None
+        self.sort(0)
+
+    def set_ranking(self, ranking: Optional[Dict[str, int]]):
+        """Takes a script ID -> rank mapping, or None to show every script."""
+        self._ranking = ranking
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        if index.data(CategoryRole) != self.category:
+            return False
+        return self._ranking is None or index.data(ScriptIdRole) in self._ranking
+
+    def lessThan(self, left, right):
+        if self._ranking is not None:
+            return self._ranking[left.data(ScriptIdRole)] < self._ranking[right.data(ScriptIdRole)]
+        return left.data(Qt.ItemDataRole.DisplayRole).lower() < right.data(Qt.ItemDataRole.DisplayRole).lower()
+
+
+class ScriptButtonDelegate(QStyledItemDelegate):
+    """
+    Paints each script as a button, with a small uninstall button on the right
+    for installers that have a linked uninstall script. Nothing is created per
+    item, so only the visible rows cost anything.
+    """
+    script_clicked = pyqtSignal(dict)
+    uninstall_clicked = pyqtSignal(dict)
+
+    MARGIN = 2
+    SPACING = 5
+    UNINSTALL_WIDTH = 35
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.uninstall_icon = QIcon.fromTheme("edit-delete")
+
+    def _button_rects(self, rect: QRect, has_uninstall: bool) -> Tuple[QRect, Optional[QRect]]:
+        rect = rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        if not has_uninstall:
+            return rect, None
+        uninstall_rect = QRect(rect.right() - self.UNINSTALL_WIDTH + 1, rect.top(), self.UNINSTALL_WIDTH, rect.height())
+        main_rect = rect.adjusted(0, 0, -(self.UNINSTALL_WIDTH + self.SPACING), 0)
+        return main_rect, uninstall_rect
+
+    def _paint_button(self, painter, rect, hovered):
+        painter.setPen(QPen(BUTTON_BORDER_COLOR))
+        painter.setBrush(BUTTON_HOVER_COLOR if hovered else BUTTON_COLOR)
+        painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 4, 4)
+
+    def paint(self, painter, option, index):
+        uninstall_script = index.data(UninstallScriptRole)
+        main_rect, uninstall_rect = self._button_rects(option.rect, uninstall_script is not None)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        cursor_pos = option.widget.viewport().mapFromGlobal(QCursor.pos()) if hovered else None
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._paint_button(painter, main_rect, hovered and (uninstall_rect is None or not uninstall_rect.contains(cursor_pos)))
+        painter.setPen(BUTTON_TEXT_COLOR)
+        painter.setFont(option.font)
+        text = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole), Qt.TextElideMode.ElideRight, main_rect.width() - 16)
+        painter.drawText(main_rect, Qt.AlignmentFlag.AlignCenter, text)
+
+        if uninstall_rect is not None:
+            self._paint_button(painter, uninstall_rect, hovered and uninstall_rect.contains(cursor_pos))
+            if self.uninstall_icon.isNull():
+                painter.setPen(BUTTON_TEXT_COLOR)
+                painter.drawText(uninstall_rect, Qt.AlignmentFlag.AlignCenter, "✕")
+            else:
+                self.uninstall_icon.paint(painter, uninstall_rect.adjusted(8, 8, -8, -8))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        view = option.widget
+        if isinstance(view, QListView) and view.gridSize().isValid():
+            return view.gridSize()
+        return QSize(200, ScriptGridView.ROW_HEIGHT)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            uninstall_script = index.data(UninstallScriptRole)
+            main_rect, uninstall_rect = self._button_rects(option.rect, uninstall_script is not None)
+            pos = event.position().toPoint()
+            if uninstall_rect is not None and uninstall_rect.contains(pos):
+                self.uninstall_clicked.emit(uninstall_script)
+                return True
+            if main_rect.contains(pos):
+                self.script_clicked.emit(index.data(ScriptRole))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        uninstall_script = index.data(UninstallScriptRole)
+        if event.type() == QEvent.Type.ToolTip and uninstall_script is not None:
+            _, uninstall_rect = self._button_rects(option.rect, True)
+            if uninstall_rect.contains(event.pos()):
+                QToolTip.showText(event.globalPos(), f"Uninstall: {uninstall_script['name']}\n{uninstall_script['description']}", view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+
+class ScriptGridView(QListView):
+    """A list view laid out as a fixed-column grid of delegate-drawn script buttons."""
+    COLUMNS = 3
+    ROW_HEIGHT = 42
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("ScriptGrid")
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setMouseTracking(True)
+        self.setGridSize(QSize(200, self.ROW_HEIGHT))
+
+    def mouseMoveEvent(self, event):
+        # Repaint the hovered item so the highlight follows the cursor between its two buttons
+        index = self.indexAt(event.position().toPoint())
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+        super().mouseMoveEvent(event)
+
+    def resizeEvent(self, event):
+        # QListView reserves room for the vertical scroll bar when deciding where to wrap
+        available = self.viewport().width() - self.verticalScrollBar().sizeHint().width() - 1
+        column_width = max(1, available // self.COLUMNS)
+        self.setGridSize(QSize(column_width, self.ROW_HEIGHT))
+        super().resizeEvent(event)
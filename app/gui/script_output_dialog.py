@@ -1,53 +1,187 @@
 # app/gui/script_output_dialog.py
 
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QTextEdit, QProgressBar, QPushButton,
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QProgressBar, QPushButton,
     QDialogButtonBox
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFontDatabase, QTextCursor # <-- Import QTextCursor
+from PyQt6.QtCore import Qt, QTimer, QUrl, pyqtSignal
+from PyQt6.QtGui import QDesktopServices, QFontDatabase, QTextCursor
+
+from app.config import settings
+from app.utils.workflow_progress import format_eta
+
+DEFAULT_MAX_OUTPUT_LINES = 10000
 
 class ScriptOutputDialog(QDialog):
     """
     A dialog to show real-time output and progress of a running script.
+
+    Output is buffered and written to the widget at most once per
+    FLUSH_INTERVAL_MS in a single insert, so chatty scripts cannot flood the
+    GUI thread. The widget keeps at most settings.OUTPUT_MAX_LINES lines.
+
+    When given the run's RunLog, the full output can be paged through from the
+    log file with the Earlier/Later buttons; live output resumes with Live.
+
+    While the run is going, Cancel (or closing the window) emits
+    cancel_requested instead of closing the dialog.
     """
-    def __init__(self, title, parent=None):
+    cancel_requested = pyqtSignal()
+
+    FLUSH_INTERVAL_MS = 50
+    PAGE_LINES = 2000
+
+    def __init__(self, title, parent=None, run_log=None):
         super().__init__(parent)
         self.setWindowTitle(title)
         self.setMinimumSize(700, 500)
 
         layout = QVBoxLayout(self)
 
-        self.output_text = QTextEdit()
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
+        # One extra block for the empty line after the last newline, so the widget holds the same lines as the run log tail
+        self.output_text.setMaximumBlockCount(getattr(settings, 'OUTPUT_MAX_LINES', DEFAULT_MAX_OUTPUT_LINES) + 1)
         font = QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
         self.output_text.setFont(font)
         self.output_text.setStyleSheet("background-color: #2E2E2E; color: #EAEAEA;")
         layout.addWidget(self.output_text)
 
+        self.run_log = run_log
+        self._page = None  # (start, end) byte offsets of the page shown from the log file, None while live
+        if run_log is not None:
+            layout.addLayout(self._create_log_navigation())
+
+        self._pending_output = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_output)
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 0)
         layout.addWidget(self.progress_bar)
 
         self.button_box = QDialogButtonBox()
+        self.cancel_button = self.button_box.addButton("Cancel", QDialogButtonBox.ButtonRole.RejectRole)
         self.close_button = self.button_box.addButton("Close", QDialogButtonBox.ButtonRole.AcceptRole)
         self.close_button.setEnabled(False)
         self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
         layout.addWidget(self.button_box)
 
+    def _create_log_navigation(self):
+        nav_layout = QHBoxLayout()
+        self.log_status_label = QLabel()
+        self.log_status_label.setToolTip(str(self.run_log.path))
+        self.earlier_button = QPushButton("Earlier")
+        self.earlier_button.clicked.connect(self.show_earlier_output)
+        self.later_button = QPushButton("Later")
+        self.later_button.clicked.connect(self.show_later_output)
+        self.live_button = QPushButton("Live")
+        self.live_button.clicked.connect(self.show_live_output)
+        open_log_button = QPushButton("Open Log File")
+        open_log_button.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(str(self.run_log.path))))
+        nav_layout.addWidget(self.log_status_label, 1)
+        for button in (self.earlier_button, self.later_button, self.live_button, open_log_button):
+            nav_layout.addWidget(button)
+        self._update_log_navigation()
+        return nav_layout
+
+    def _update_log_navigation(self):
+        if self.run_log is None:
+            return
+        if self._page is None:
+            self.log_status_label.setText(f"Showing the latest output. Full log: {self.run_log.path.name}")
+            self.earlier_button.setEnabled(self.run_log.tail_start() > 0)
+        else:
+            self.log_status_label.setText(f"Showing bytes {self._page[0]:,}-{self._page[1]:,} of {self.run_log.size:,} from the log file")
+            self.earlier_button.setEnabled(self._page[0] > 0)
+        self.later_button.setEnabled(self._page is not None)
+        self.live_button.setEnabled(self._page is not None)
+
+    def show_earlier_output(self):
+        end = self.run_log.tail_start() if self._page is None else self._page[0]
+        text, start = self.run_log.read_before(end, self.PAGE_LINES)
+        self._show_page(text, start, end)
+        self.output_text.verticalScrollBar().setValue(self.output_text.verticalScrollBar().maximum())
+
+    def show_later_output(self):
+        if self._page is None:
+            return
+        start = self._page[1]
+        if start >= self.run_log.tail_start():
+            self.show_live_output()
+            return
+        text, end = self.run_log.read_after(start, self.PAGE_LINES)
+        self._show_page(text, start, end)
+        self.output_text.verticalScrollBar().setValue(0)
+
+    def show_live_output(self):
+        self._page = None
+        self._pending_output.clear()
+        self.output_text.setPlainText(self.run_log.tail_text())
+        self.output_text.verticalScrollBar().setValue(self.output_text.verticalScrollBar().maximum())
+        self._update_log_navigation()
+
+    def _show_page(self, text, start, end):
+        self._page = (start, end)
+        self._pending_output.clear()
+        self.output_text.setPlainText(text)
+        self._update_log_navigation()
+
     def append_output(self, text):
-        """Appends text to the output window and scrolls to the bottom."""
-        # This is the corrected method to avoid the AttributeError
-        cursor = self.output_text.textCursor()
+        """Queues text for the next flush."""
+        if self._page is not None:
+            return  # The run log has it; show_live_output() reloads the tail from there
+        self._pending_output.append(text)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush_output(self):
+        """Writes all queued output in one insert and scrolls to the bottom if the user was there."""
+        if not self._pending_output:
+            self.flush_timer.stop()
+            return
+        text = "".join(self._pending_output)
+        self._pending_output.clear()
+
+        scroll_bar = self.output_text.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        cursor = QTextCursor(self.output_text.document())
         cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.output_text.setTextCursor(cursor)
-        self.output_text.insertPlainText(text)
-        self.output_text.ensureCursorVisible()
+        cursor.insertText(text)
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+        self._update_log_navigation()
+
+    def set_progress(self, percent, seconds_left=-1.0):
+        """Switches the progress bar to determinate mode; seconds_left < 0 means no ETA is known."""
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setTextVisible(True)
+        self.progress_bar.setValue(percent)
+        if seconds_left >= 0:
+            self.progress_bar.setFormat(f"%p% - {format_eta(seconds_left)} left")
+        else:
+            self.progress_bar.setFormat("%p%")
+
+    def reject(self):
+        """Cancels the run while it is going; closes the dialog once it has finished."""
+        if self.close_button.isEnabled():
+            super().reject()
+            return
+        if self.cancel_button.isEnabled():
+            self.cancel_button.setEnabled(False)
+            self.cancel_button.setText("Cancelling...")
+            self.cancel_requested.emit()
 
     def mark_as_finished(self, success):
         """Called when the script process is finished."""
+        self.flush_output()
+        self.flush_timer.stop()
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(100)
+        self.progress_bar.setFormat("%p%")
         
         if success:
             self.setWindowTitle(f"[SUCCESS] {self.windowTitle()}")
@@ -56,6 +190,7 @@ class ScriptOutputDialog(QDialog):
             self.setWindowTitle(f"[FAILED] {self.windowTitle()}")
             self.progress_bar.setStyleSheet("QProgressBar::chunk { background-color: #F44336; }")
 
+        self.cancel_button.hide()
         self.close_button.setEnabled(True)
         self.close_button.setFocus()
 
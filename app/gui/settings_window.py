@@ -14,6 +14,7 @@ from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt
 
 from app.utils.config_manager import load_config, save_config, reset_to_defaults
+from app.utils.script_registry import ScriptRegistry
 from app.gui.script_edit_dialog import ScriptEditDialog
 from app.gui.in_app_editor_dialog import InAppEditorDialog
 from app.config import settings as app_settings
@@ -26,6 +27,7 @@ class SettingsWindow(QDialog):
         self.setModal(True)
 
         self.general_config, self.scripts_config, self.workflows_config = load_config()
+        self.script_registry = ScriptRegistry(self.scripts_config)
 
         layout = QVBoxLayout(self)
         self.tabs = QTabWidget()
@@ -60,6 +62,11 @@ class SettingsWindow(QDialog):
         self.max_attempts_input = QSpinBox()
         self.max_attempts_input.setRange(1, 10)
         self.max_attempts_input.setValue(self.general_config.get("MAX_LOGIN_ATTEMPTS", 3))
+        self.output_max_lines_input = QSpinBox()
+        self.output_max_lines_input.setRange(1000, 1000000)
+        self.output_max_lines_input.setSingleStep(1000)
+        self.output_max_lines_input.setToolTip("Lines of output kept in memory and shown in the script output window. The full output is always saved to a log file per run.")
+        self.output_max_lines_input.setValue(self.general_config.get("OUTPUT_MAX_LINES", 10000))
         logo_path_widget = QHBoxLayout()
         self.logo_path_input = QLineEdit(self.general_config.get("LOGO_PATH", ""))
         self.logo_path_input.setPlaceholderText("e.g., assets/logo.png")
@@ -76,6 +83,7 @@ class SettingsWindow(QDialog):
         form_layout.addRow("Company Name:", self.company_name_input)
         form_layout.addRow("Logo Path:", logo_path_widget)
         form_layout.addRow("Max Login Attempts:", self.max_attempts_input)
+        form_layout.addRow("Max Output Lines:", self.output_max_lines_input)
         form_layout.addRow("New Application Password:", self.new_password_input)
         form_layout.addRow("Confirm New Password:", self.confirm_password_input)
         layout.addWidget(form_group)
@@ -278,6 +286,7 @@ class SettingsWindow(QDialog):
                 raise ValueError("Invalid configuration file. Missing required keys.")
             self.general_config = imported_config["general"]
             self.scripts_config = imported_config["scripts"]
+            self.script_registry.rebuild(self.scripts_config)
             self.workflows_config = imported_config["workflows"]
             self.repopulate_all_tabs()
             QMessageBox.information(self, "Success", "Settings imported. Review the changes and click 'Save and Close' to apply them.")
@@ -290,6 +299,7 @@ class SettingsWindow(QDialog):
         self.company_name_input.setText(self.general_config.get("COMPANY_NAME", ""))
         self.logo_path_input.setText(self.general_config.get("LOGO_PATH", ""))
         self.max_attempts_input.setValue(self.general_config.get("MAX_LOGIN_ATTEMPTS", 3))
+        self.output_max_lines_input.setValue(self.general_config.get("OUTPUT_MAX_LINES", 10000))
         self.new_password_input.clear()
         self.confirm_password_input.clear()
         self.populate_script_list()
@@ -301,6 +311,7 @@ class SettingsWindow(QDialog):
         self.general_config['COMPANY_NAME'] = self.company_name_input.text()
         self.general_config['LOGO_PATH'] = self.logo_path_input.text()
         self.general_config['MAX_LOGIN_ATTEMPTS'] = self.max_attempts_input.value()
+        self.general_config['OUTPUT_MAX_LINES'] = self.output_max_lines_input.value()
         new_password = self.new_password_input.text()
         if new_password:
             self.general_config['new_password'] = new_password
@@ -320,24 +331,22 @@ class SettingsWindow(QDialog):
         self.edit_file_button.setEnabled(has_selection)
 
     def add_script(self):
-        existing_ids = [s['id'] for s in self.scripts_config]
-        dialog = ScriptEditDialog(script_dir=app_settings.SCRIPT_DIR, existing_ids=existing_ids, parent=self)
+        dialog = ScriptEditDialog(script_dir=app_settings.SCRIPT_DIR, existing_ids=self.script_registry.ids(), parent=self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_data = dialog.get_data()
-            self.scripts_config.append(new_data)
+            self.script_registry.add(new_data)
             self.populate_script_list()
             logging.info(f"Added new script '{new_data['id']}' to configuration.")
 
     def edit_script(self):
         selected_item = self.script_list_widget.selectedItems()[0]
         script_id = selected_item.data(Qt.ItemDataRole.UserRole)
-        script_to_edit = next((s for s in self.scripts_config if s['id'] == script_id), None)
+        script_to_edit = self.script_registry.get(script_id)
         if not script_to_edit: return
         dialog = ScriptEditDialog(script_dir=app_settings.SCRIPT_DIR, script_data=script_to_edit, parent=self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             updated_data = dialog.get_data()
-            for i, script in enumerate(self.scripts_config):
-                if script['id'] == script_id: self.scripts_config[i] = updated_data
+            self.script_registry.update(script_id, updated_data)
             self.populate_script_list()
             logging.info(f"Edited script '{script_id}'.")
             
@@ -346,7 +355,7 @@ class SettingsWindow(QDialog):
         if not selected_items:
             return
         script_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        script_info = next((s for s in self.scripts_config if s['id'] == script_id), None)
+        script_info = self.script_registry.get(script_id)
         if not script_info:
             QMessageBox.critical(self, "Error", "Could not find script data for the selected item.")
             return
@@ -364,7 +373,7 @@ class SettingsWindow(QDialog):
             f"Are you sure you want to remove the script '{script_id}'?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            self.scripts_config = [s for s in self.scripts_config if s['id'] != script_id]
+            self.script_registry.remove(script_id)
             self.populate_script_list()
             logging.info(f"Removed script '{script_id}'.")
 
@@ -402,18 +411,17 @@ class SettingsWindow(QDialog):
         self.workflow_desc_input.textChanged.connect(self.update_workflow_details)
 
         included_ids = set(workflow.get('scripts', []))
-        all_scripts_map = {s['id']: s['name'] for s in self.scripts_config}
-
         for script_id in workflow.get('scripts', []):
-            if script_id in all_scripts_map:
-                item = QListWidgetItem(f"{all_scripts_map[script_id]} ({script_id})")
+            script = self.script_registry.get(script_id)
+            if script:
+                item = QListWidgetItem(f"{script['name']} ({script_id})")
                 item.setData(Qt.ItemDataRole.UserRole, script_id)
                 self.included_scripts_widget.addItem(item)
 
-        for script_id, script_name in all_scripts_map.items():
-            if script_id not in included_ids:
-                item = QListWidgetItem(f"{script_name} ({script_id})")
-                item.setData(Qt.ItemDataRole.UserRole, script_id)
+        for script in self.script_registry:
+            if script['id'] not in included_ids:
+                item = QListWidgetItem(f"{script['name']} ({script['id']})")
+                item.setData(Qt.ItemDataRole.UserRole, script['id'])
                 self.available_scripts_widget.addItem(item)
         
         self.update_workflow_button_states()
@@ -450,9 +458,16 @@ class SettingsWindow(QDialog):
     def remove_script_from_workflow(self):
         selected_wf_item = self.workflow_list_widget.selectedItems()[0]
         wf_id = selected_wf_item.data(Qt.ItemDataRole.UserRole)
+        workflow = self.workflows_config[wf_id]
         for item in self.included_scripts_widget.selectedItems():
             script_id = item.data(Qt.ItemDataRole.UserRole)
-            self.workflows_config[wf_id]['scripts'].remove(script_id)
+            workflow['scripts'].remove(script_id)
+            if script_id not in workflow['scripts'] and isinstance(workflow.get('after'), dict):
+                # Drop dependencies on the removed step so the workflow stays schedulable
+                workflow['after'].pop(script_id, None)
+                for deps in workflow['after'].values():
+                    if script_id in deps:
+                        deps.remove(script_id)
         self.workflow_selection_changed()
 
     def move_script_in_workflow(self, direction):
@@ -495,7 +510,7 @@ class SettingsWindow(QDialog):
             QMessageBox.warning(self, "Password Mismatch", "The new passwords do not match. Please re-enter them.")
             return
         if save_config(self.general_config, self.scripts_config, self.workflows_config):
-            QMessageBox.information(self, "Success", "Configuration saved successfully. The application may need to be restarted for some changes to take effect.")
+            QMessageBox.information(self, "Success", "Configuration saved successfully.")
             self.accept()
         else:
             QMessageBox.critical(self, "Error", "Failed to save configuration. Check the logs for details.")
@@ -98,6 +98,12 @@ QListWidget::item:selected {
     color: #ffffff;
 }
 
+/* Script tabs in the main window; the buttons are drawn by ScriptButtonDelegate */
+QListView#ScriptGrid {
+    background-color: transparent;
+    border: none;
+}
+
 QTabWidget::pane {
     border: 1px solid #4a5160;
     border-radius: 4px;
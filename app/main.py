@@ -23,7 +23,7 @@ def setup_logging():
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(str(log_file)),
-                logging.StreamHandler(sys.stdout)
+                logging.StreamHandler(sys.stderr)
             ]
         )
         logging.info(f"Logging initialized. Log file: {log_file}")
@@ -35,6 +35,11 @@ def main():
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
 
+    from app.utils import startup_profiler
+    if '--profile-startup' in sys.argv:
+        sys.argv.remove('--profile-startup')
+        startup_profiler.enable()
+
     try:
         setup_logging()
         logging.info("Starting Script Weaver application")
@@ -43,16 +48,21 @@ def main():
         from PyQt6.QtWidgets import QApplication, QDialog
         from app.config import settings
         from app.gui.style import STYLESHEET
-        from app.gui.setup_wizard import SetupWizard
+        startup_profiler.mark("settings and Qt imported")
 
         app = QApplication(sys.argv)
         app.setStyle('Fusion')
         app.setStyleSheet(STYLESHEET)
+        startup_profiler.mark("QApplication created")
 
         DEFAULT_HASH = "e7cf3ef4f17c3999a94f2c6f612e8a888e5b1026878e4e19398b23bd38ec221a"
         if settings.PASSWORD_HASH == DEFAULT_HASH:
             logging.info("Default password hash detected. Running first-time setup wizard.")
+            # The wizard (and the config manager it needs) is only loaded on first run
+            from app.gui.setup_wizard import SetupWizard
             wizard = SetupWizard()
+            startup_profiler.mark("setup wizard shown")
+            startup_profiler.report()
             if wizard.exec() == QDialog.DialogCode.Accepted:
                 sys.exit(0)
             else:
@@ -60,7 +70,8 @@ def main():
                 sys.exit(0)
 
         from app.gui.main_window import MainWindow
-        
+        startup_profiler.mark("main window module imported")
+
         logging.info("Creating main window")
         window = MainWindow()
         
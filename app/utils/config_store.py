@@ -0,0 +1,183 @@
+# app/utils/config_store.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Union
+
+# Settings module attributes kept in the 'general' section
+GENERAL_KEYS = ('APP_NAME', 'APP_VERSION', 'COMPANY_NAME', 'LOGO_PATH', 'MAX_LOGIN_ATTEMPTS',
+                'OUTPUT_MAX_LINES', 'PASSWORD_HASH')
+# Each section is stored in its own file, so saving one doesn't rewrite the others
+SECTIONS = ('general', 'scripts', 'workflows')
+
+_store = None
+
+
+def write_atomic(path: Path, text: Union[str, bytes]):
+    """Writes to a temporary file next to `path` and renames it into place, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with (os.fdopen(fd, 'wb') if isinstance(text, bytes) else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False) + "\n"
+
+
+class ConfigStore:
+    """
+    Stores the editable configuration (general settings, scripts and workflows)
+    as one JSON file per section under DATA_DIR/config, and applies it onto the
+    settings module so code reading settings.SCRIPTS etc. sees the saved values.
+
+    On first run the sections are imported from the values in settings.py.
+    update() only rewrites sections whose content changed, replacing each file
+    atomically, and then calls the subscribed callbacks with the names of the
+    changed sections so the UI can refresh without reloading the module.
+    """
+    def __init__(self, config_dir: Path, settings_module):
+        self.config_dir = Path(config_dir)
+        self.settings = settings_module
+        self._lock = threading.RLock()
+        self._saved: Dict[str, str] = {}  # section -> JSON text as last read or written
+        self._subscribers: List[Callable[[Set[str]], None]] = []
+
+    def _path(self, section: str) -> Path:
+        return self.config_dir / f"{section}.json"
+
+    def load(self):
+        """Reads every section, importing any that don't exist yet from the settings module."""
+        with self._lock:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            for section in SECTIONS:
+                path = self._path(section)
+                try:
+                    text = path.read_text(encoding='utf-8')
+                    json.loads(text)
+                except FileNotFoundError:
+                    text = _dumps(self._from_module(section))
+                    try:
+                        write_atomic(path, text)
+                        logging.info(f"Imported the '{section}' settings from settings.py into {path}")
+                    except OSError as e:
+                        logging.error(f"Could not write {path}: {e}")
+                except (OSError, ValueError) as e:
+                    # Leave the broken file alone for inspection; the next save replaces it
+                    logging.error(f"Could not read {path}, using the values from settings.py: {e}")
+                    text = _dumps(self._from_module(section))
+                self._saved[section] = text
+                self._apply(section, json.loads(text))
+
+    def reload_from_disk(self) -> Set[str]:
+        """
+        Re-reads the section files, e.g. after they were edited outside the app,
+        and applies and announces the ones that changed. Unreadable or invalid
+        files are skipped. Returns the names of the sections that changed.
+        """
+        changed = set()
+        with self._lock:
+            for section in SECTIONS:
+                path = self._path(section)
+                try:
+                    text = path.read_text(encoding='utf-8')
+                    value = json.loads(text)
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Ignoring {path} until it can be read: {e}")
+                    continue
+                if text == self._saved.get(section):
+                    continue
+                self._saved[section] = text
+                self._apply(section, value)
+                changed.add(section)
+        if changed:
+            logging.info(f"Reloaded config sections changed on disk: {', '.join(sorted(changed))}")
+            self._notify(changed)
+        return changed
+
+    def _from_module(self, section: str):
+        if section == 'general':
+            return {key: getattr(self.settings, key) for key in GENERAL_KEYS if hasattr(self.settings, key)}
+        return getattr(self.settings, section.upper())
+
+    def _apply(self, section: str, value):
+        if section == 'general':
+            for key in GENERAL_KEYS:
+                if key in value:
+                    setattr(self.settings, key, value[key])
+        else:
+            setattr(self.settings, section.upper(), value)
+
+    def get(self, section: str):
+        """Returns a fresh copy of a section that the caller is free to modify."""
+        with self._lock:
+            return json.loads(self._saved[section])
+
+    def update(self, sections: Dict[str, object]) -> Set[str]:
+        """
+        Saves the given sections, skipping any whose content is unchanged, and
+        notifies subscribers. Returns the names of the sections that changed.
+        Raises OSError if a section cannot be written.
+        """
+        changed = set()
+        with self._lock:
+            for section, value in sections.items():
+                if section not in SECTIONS:
+                    raise KeyError(f"Unknown config section '{section}'")
+                text = _dumps(value)
+                if text == self._saved.get(section):
+                    continue
+                write_atomic(self._path(section), text)
+                self._saved[section] = text
+                self._apply(section, json.loads(text))
+                changed.add(section)
+        if changed:
+            logging.info(f"Saved config sections: {', '.join(sorted(changed))}")
+            self._notify(changed)
+        return changed
+
+    def subscribe(self, callback: Callable[[Set[str]], None]):
+        """Calls `callback(changed_sections)` after every update() or reload_from_disk() that changed something."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Set[str]], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self, changed: Set[str]):
+        for callback in list(self._subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                logging.error(f"Config change listener {callback} failed: {e}", exc_info=True)
+
+
+def apply_saved_config(settings_module) -> Optional[ConfigStore]:
+    """Loads the config store onto the settings module. Called at the end of settings.py."""
+    global _store
+    try:
+        _store = ConfigStore(settings_module.DATA_DIR / "config", settings_module)
+        _store.load()
+    except OSError as e:
+        logging.error(f"Could not open the config store, using settings.py as is: {e}")
+        _store = None
+    return _store
+
+
+def get_store() -> Optional[ConfigStore]:
+    if _store is None:
+        from app.config import settings  # noqa: F401 -- importing settings loads the store
+    return _store
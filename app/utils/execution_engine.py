@@ -0,0 +1,323 @@
+# app/utils/execution_engine.py
+"""
+The one place scripts are started: an asyncio engine that reads the output
+of each process through the event loop. The GUI (ScriptRunner), the command
+line (headless_runner) and sudo_utils all run their scripts through it.
+
+    engine = ExecutionEngine(max_concurrent=4)
+    async for event in engine.run(["/bin/bash", "setup.sh"], timeout=600):
+        if isinstance(event, OutputEvent):
+            print(event.text, end="")
+        elif isinstance(event, ExitEvent):
+            print("exit code", event.exit_code)
+
+Code without an event loop, e.g. a worker thread, can use run_command().
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterable, NamedTuple, Optional, Tuple, Union
+
+from app.utils.resource_limits import ResourceUsage, limit_setter, wait_with_usage
+
+# Exit code reported for a command that could not be started at all
+EXIT_SPAWN_FAILED = 127
+# Reported for a command that exited with 0 after being stopped on timeout or cancel, as by timeout(1)
+EXIT_STOPPED = 124
+DEFAULT_MAX_CONCURRENT = 4
+# Seconds a timed-out or cancelled command gets to exit after SIGTERM before it is killed
+DEFAULT_GRACE_PERIOD = 10
+# Longest line returned as one event; longer lines arrive in pieces of about this size
+STREAM_LIMIT = 64 * 1024
+
+
+class StartedEvent(NamedTuple):
+    pid: int
+
+
+class OutputEvent(NamedTuple):
+    text: str  # One line, including its newline unless it is the last line or a piece of a long line
+    stream: str  # 'stdout' or 'stderr'; merged output is all 'stdout'
+
+
+class ExitEvent(NamedTuple):
+    exit_code: int  # Negative for a signal, as in subprocess; EXIT_SPAWN_FAILED if it never started
+    duration: float
+    timed_out: bool = False
+    cancelled: bool = False
+    usage: Optional[ResourceUsage] = None  # None if it never started
+
+    @property
+    def status(self) -> int:
+        """The exit code to report and record: a stopped command failed even if it exited with 0."""
+        if self.exit_code == 0 and (self.timed_out or self.cancelled):
+            return EXIT_STOPPED
+        return self.exit_code
+
+
+Event = Union[StartedEvent, OutputEvent, ExitEvent]
+
+
+def script_timeouts(script_info: dict) -> Tuple[Optional[float], float]:
+    """
+    Returns the (timeout, grace_period) in seconds from a script definition's
+    optional 'timeout' and 'grace_period' fields. No timeout, or 0, means no limit.
+    """
+    try:
+        timeout = float(script_info.get('timeout') or 0) or None
+        grace_period = float(script_info.get('grace_period', DEFAULT_GRACE_PERIOD))
+    except (TypeError, ValueError):
+        logging.warning(f"Ignoring the invalid timeout settings of script '{script_info.get('id')}'.")
+        return None, DEFAULT_GRACE_PERIOD
+    return timeout, max(0.0, grace_period)
+
+
+def signal_group(pid: int, sig: int) -> bool:
+    """Sends a signal to the process group led by `pid`. Returns False if the group is gone."""
+    try:
+        os.killpg(pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Members that changed user, like sudo's command, can't be signalled; sudo relays SIGTERM to them itself
+        logging.debug(f"Not allowed to signal every process in group {pid}.")
+        return True
+
+
+def stop_group(pid: int, grace_period: float = DEFAULT_GRACE_PERIOD):
+    """
+    Blocking counterpart of how the engine stops a run, for code outside the
+    event loop: SIGTERM to the process group led by `pid`, then SIGKILL if
+    anything is left after `grace_period` seconds.
+    """
+    if not signal_group(pid, signal.SIGTERM):
+        return
+    deadline = time.monotonic() + grace_period
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        if not signal_group(pid, 0):
+            return
+    logging.warning(f"Process group {pid} did not stop within {grace_period:g} s; killing it.")
+    signal_group(pid, signal.SIGKILL)
+
+
+async def _read_lines(stream: asyncio.StreamReader, name: str, queue: asyncio.Queue):
+    while True:
+        try:
+            data = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            data = e.partial  # End of output, possibly without a final newline
+        except asyncio.LimitOverrunError as e:
+            data = await stream.read(e.consumed or STREAM_LIMIT)
+        if not data:
+            break
+        await queue.put(OutputEvent(data.decode(errors='ignore'), name))
+    await queue.put(None)
+
+
+def _in_thread(loop: asyncio.AbstractEventLoop, function: Callable, *args) -> asyncio.Future:
+    """
+    Runs a blocking call on a thread of its own and returns a future for its
+    result. Unlike the loop's default executor, this never queues behind other
+    runs' waits.
+    """
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if not future.done():
+            future.set_exception(error) if error is not None else future.set_result(result)
+
+    def target():
+        result, error = None, None
+        try:
+            result = function(*args)
+        except Exception as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            pass  # The loop is closed; nobody is waiting any more
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+def _write_stdin(pipe, data: bytes):
+    try:
+        pipe.write(data)
+        pipe.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # The command exited without reading all of its input
+
+
+class ScriptRun:
+    """
+    One command run by the engine. Iterate over it (once) with 'async for' to
+    start the command and receive its events; the last one is always an
+    ExitEvent. cancel() may be called from any thread.
+
+    The command runs in its own process group, with the resource `limits` of
+    resource_limits applied. On timeout or cancel the whole group gets SIGTERM,
+    and SIGKILL if anything is left after `grace_period` seconds, so scripts
+    can't leave children behind.
+
+    The process is reaped with wait4() on a worker thread rather than by
+    asyncio's child watcher, so the ExitEvent can carry its resource usage.
+    """
+    def __init__(self, engine: "ExecutionEngine", command: list, stdin_data: Optional[bytes],
+                 timeout: Optional[float], merge_stderr: bool, cwd=None, env=None,
+                 grace_period: float = DEFAULT_GRACE_PERIOD, limits: Optional[dict] = None):
+        self.engine = engine
+        self.command = command
+        self.stdin_data = stdin_data
+        self.timeout = timeout
+        self.grace_period = grace_period
+        self.merge_stderr = merge_stderr
+        self.cwd = cwd
+        self.env = env
+        self.limits = limits
+        self.pid = None
+        self._loop = None
+        self._stop = None
+        self._cancelled = False
+        self._timed_out = False
+
+    def cancel(self):
+        self._cancelled = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                pass  # The run already finished and its loop is closed
+
+    def __aiter__(self) -> AsyncIterator[Event]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[Event]:
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if self._cancelled:
+            yield ExitEvent(EXIT_SPAWN_FAILED, 0.0, cancelled=True)
+            return
+        async with self.engine.slot():
+            started = time.monotonic()
+            try:
+                process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE if self.stdin_data is not None else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT if self.merge_stderr else subprocess.PIPE,
+                    cwd=self.cwd, env=self.env, bufsize=0, start_new_session=True,
+                    preexec_fn=limit_setter(self.limits))
+            except (OSError, subprocess.SubprocessError) as e:
+                logging.error(f"Could not start {self.command}: {e}")
+                yield OutputEvent(f"ERROR: Could not start {self.command[0]}: {e}\n", 'stderr')
+                yield ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+                return
+
+            self.pid = process.pid
+            reaped = _in_thread(self._loop, wait_with_usage, process.pid)
+            queue = asyncio.Queue()
+            transports = []
+            tasks = []
+            watchdog = asyncio.create_task(self._watch(process.pid))
+            try:
+                streams = [(process.stdout, 'stdout')] + ([] if self.merge_stderr else [(process.stderr, 'stderr')])
+                for pipe, name in streams:
+                    reader = asyncio.StreamReader(STREAM_LIMIT)
+                    transport, _ = await self._loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+                    transports.append(transport)
+                    tasks.append(asyncio.create_task(_read_lines(reader, name, queue)))
+                if self.stdin_data is not None:
+                    _in_thread(self._loop, _write_stdin, process.stdin, self.stdin_data)
+                yield StartedEvent(process.pid)
+                open_streams = len(streams)
+                while open_streams:
+                    event = await queue.get()
+                    if event is None:
+                        open_streams -= 1
+                    else:
+                        yield event
+                process.returncode, usage = await asyncio.shield(reaped)
+                yield ExitEvent(process.returncode, time.monotonic() - started, self._timed_out, self._cancelled, usage)
+            finally:
+                # Also reached when the consumer stops iterating early or its task is cancelled
+                watchdog.cancel()
+                if process.returncode is None:
+                    signal_group(process.pid, signal.SIGKILL)
+                    process.returncode, _ = await reaped
+                for task in tasks:
+                    task.cancel()
+                for transport in transports:
+                    transport.close()
+
+    async def _watch(self, pid: int):
+        try:
+            await asyncio.wait_for(self._stop.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out = True
+            logging.warning(f"{self.command} timed out after {self.timeout:g} s; stopping it.")
+        else:
+            logging.info(f"{self.command} was cancelled; stopping it.")
+        # Runs until the group is gone, or is itself cancelled once the output has ended and the command exited
+        if not signal_group(pid, signal.SIGTERM):
+            return
+        deadline = time.monotonic() + self.grace_period
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            if not signal_group(pid, 0):
+                return
+        logging.warning(f"{self.command} did not stop within {self.grace_period:g} s; killing it.")
+        signal_group(pid, signal.SIGKILL)
+
+
+class ExecutionEngine:
+    """
+    Starts commands on the running event loop, at most `max_concurrent` at a
+    time; further runs wait for a free slot before their process is started.
+    An engine belongs to the event loop it is first used on.
+    """
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        self.max_concurrent = max(1, max_concurrent)
+        self._semaphore = None
+
+    def slot(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def run(self, command: Iterable[str], stdin_data: Optional[bytes] = None, timeout: Optional[float] = None,
+            merge_stderr: bool = True, cwd=None, env=None, grace_period: float = DEFAULT_GRACE_PERIOD,
+            limits: Optional[dict] = None) -> ScriptRun:
+        """Returns a ScriptRun; the command starts when iteration over it begins."""
+        return ScriptRun(self, [str(arg) for arg in command], stdin_data, timeout, merge_stderr, cwd, env, grace_period,
+                         limits)
+
+
+async def collect(run: ScriptRun, output: Callable[[str], None]) -> ExitEvent:
+    """Passes a run's output to `output` and returns its ExitEvent."""
+    async for event in run:
+        if isinstance(event, OutputEvent):
+            output(event.text)
+        elif isinstance(event, ExitEvent):
+            return event
+
+
+def run_command(command: Iterable[str], output: Callable[[str], None], stdin_data: Optional[bytes] = None,
+                timeout: Optional[float] = None, on_start: Optional[Callable[[ScriptRun], None]] = None,
+                grace_period: float = DEFAULT_GRACE_PERIOD, limits: Optional[dict] = None) -> ExitEvent:
+    """
+    Runs a command to completion on a private event loop, for callers without
+    one. `on_start` receives the ScriptRun before it starts, e.g. to keep it
+    for cancelling from another thread.
+    """
+    run = ExecutionEngine(1).run(command, stdin_data, timeout, grace_period=grace_period, limits=limits)
+    if on_start is not None:
+        on_start(run)
+    return asyncio.run(collect(run, output))
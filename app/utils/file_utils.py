@@ -2,14 +2,16 @@
 
 import logging
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
-def audit_script_files(scripts_config: List[dict], script_directory: Path) -> Tuple[List[str], List[str]]:
+from app.utils.script_registry import ScriptRegistry
+
+def audit_script_files(scripts_config: Union[ScriptRegistry, List[dict]], script_directory: Path) -> Tuple[List[str], List[str]]:
     """
     Compares scripts on disk with scripts defined in the configuration.
 
     Args:
-        scripts_config: The list of script dictionaries from settings.py.
+        scripts_config: A ScriptRegistry, or the list of script dictionaries from settings.py.
         script_directory: The Path object pointing to the 'scripts' folder.
 
     Returns:
@@ -22,7 +24,10 @@ def audit_script_files(scripts_config: List[dict], script_directory: Path) -> Tu
         return [], []
 
     # Get a set of all .sh filenames defined in the config
-    configured_scripts = {Path(s['path']).name for s in scripts_config if 'path' in s}
+    if isinstance(scripts_config, ScriptRegistry):
+        configured_scripts = scripts_config.script_files()
+    else:
+        configured_scripts = {Path(s['path']).name for s in scripts_config if 'path' in s}
     
     # Get a set of all .sh files currently in the script directory
     disk_scripts = {p.name for p in script_directory.glob('*.sh')}
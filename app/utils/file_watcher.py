@@ -0,0 +1,114 @@
+# app/utils/file_watcher.py
+
+import logging
+from pathlib import Path
+from typing import Dict, Tuple
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+Snapshot = Dict[str, Tuple[int, int]]  # filename -> (mtime in ns, size)
+
+
+def snapshot_directory(directory: Path, pattern: str) -> Snapshot:
+    snapshot = {}
+    try:
+        for path in directory.glob(pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Removed while listing
+            snapshot[path.name] = (stat.st_mtime_ns, stat.st_size)
+    except OSError as e:
+        logging.warning(f"Could not list {directory}: {e}")
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot):
+    """Returns the (added, removed, modified) filenames between two snapshots."""
+    added = set(new) - set(old)
+    removed = set(old) - set(new)
+    modified = {name for name in set(old) & set(new) if old[name] != new[name]}
+    return added, removed, modified
+
+
+class ConfigWatcher(QObject):
+    """
+    Watches the scripts directory and the config store for changes made outside
+    the app. Uses QFileSystemWatcher (inotify on Linux, kqueue on macOS) and falls
+    back to polling modification times when a path can't be watched. Bursts of
+    events, such as an editor's save-and-rename, are debounced into one check.
+    """
+    scripts_changed = pyqtSignal(set, set, set)  # added, removed, modified filenames
+    config_changed = pyqtSignal(set)  # changed config filenames
+
+    DEBOUNCE_MS = 300
+    POLL_INTERVAL_MS = 2000
+
+    def __init__(self, script_dir: Path, config_dir: Path, script_pattern: str = "*.sh",
+                 use_polling: bool = False, parent=None):
+        super().__init__(parent)
+        self.script_dir = Path(script_dir)
+        self.config_dir = Path(config_dir)
+        self.script_pattern = script_pattern
+        self._scripts = snapshot_directory(self.script_dir, self.script_pattern)
+        self._config = snapshot_directory(self.config_dir, "*.json")
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.check_for_changes)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.check_for_changes)
+
+        self.watcher = None
+        if not use_polling:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self._on_event)
+            self.watcher.fileChanged.connect(self._on_event)
+            failed = self.watcher.addPaths([str(self.script_dir), str(self.config_dir)])
+            if failed:
+                logging.warning(f"Cannot watch {', '.join(failed)}; polling every {self.POLL_INTERVAL_MS} ms instead.")
+                # The paths that were added would otherwise keep sending events on top of the polling
+                self.watcher.directoryChanged.disconnect(self._on_event)
+                self.watcher.fileChanged.disconnect(self._on_event)
+                self.watcher.deleteLater()
+                self.watcher = None
+            else:
+                self._watch_config_files()
+        if self.watcher is None:
+            self.poll_timer.start()
+
+    @property
+    def is_polling(self) -> bool:
+        return self.poll_timer.isActive()
+
+    def _watch_config_files(self):
+        # Files replaced by a rename drop out of the watch list, so re-add them after every change.
+        # The directory watch alone misses in-place writes.
+        paths = [str(self.config_dir / name) for name in self._config]
+        watched = set(self.watcher.files())
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def _on_event(self, _path):
+        self.debounce_timer.start()
+
+    def check_for_changes(self):
+        scripts = snapshot_directory(self.script_dir, self.script_pattern)
+        added, removed, modified = diff_snapshots(self._scripts, scripts)
+        self._scripts = scripts
+        if added or removed or modified:
+            logging.info(f"Scripts directory changed: {len(added)} added, {len(removed)} removed, {len(modified)} modified")
+            self.scripts_changed.emit(added, removed, modified)
+
+        config = snapshot_directory(self.config_dir, "*.json")
+        changed = set().union(*diff_snapshots(self._config, config))
+        self._config = config
+        if self.watcher is not None:
+            self._watch_config_files()
+        if changed:
+            logging.info(f"Config files changed: {', '.join(sorted(changed))}")
+            self.config_changed.emit(changed)
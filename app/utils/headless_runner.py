@@ -0,0 +1,170 @@
+# app/utils/headless_runner.py
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.utils.execution_engine import DEFAULT_GRACE_PERIOD, EXIT_SPAWN_FAILED, ExitEvent, run_command, script_timeouts
+from app.utils.resource_limits import format_usage, script_limits
+from app.utils.result_cache import format_cached_step
+from app.utils.shell_pool import get_shell_pool
+from app.utils.run_history import OutputCounter
+from app.utils.workflow_graph import OutputPrefixer, WorkflowSchedule
+
+
+def build_command(script_path: Path, needs_sudo: bool, password: Optional[str]) -> list:
+    """
+    Builds the command line for a script. Mirrors ScriptRunner: sudo scripts are run
+    through 'sudo -S' when a password is available, and 'sudo -n' otherwise so an
+    unattended run fails fast instead of hanging on a prompt.
+    """
+    command = []
+    if needs_sudo and os.geteuid() != 0:
+        if password:
+            command.extend(["sudo", "-S", "-p", ""])
+        else:
+            command.extend(["sudo", "-n"])
+    command.extend(["/bin/bash", str(script_path)])
+    return command
+
+
+def run_script(script_path: Path, needs_sudo: bool = False, password: Optional[str] = None,
+               output: Callable[[str], None] = sys.stdout.write, timeout: Optional[float] = None,
+               grace_period: float = DEFAULT_GRACE_PERIOD, limits: Optional[dict] = None,
+               ephemeral: bool = False) -> ExitEvent:
+    """
+    Runs a script without Qt, streaming its merged stdout/stderr line by line to
+    `output` as it arrives, followed by its resource usage. Returns its
+    execution_engine.ExitEvent; report and record its `status`. A script still running after `timeout` seconds is stopped, along
+    with its children; `limits` are resource_limits limits. `ephemeral` scripts
+    that don't need sudo run on a prewarmed shell_pool worker.
+    """
+    if ephemeral and not needs_sudo:
+        result = get_shell_pool().run(script_path, output, timeout, grace_period, limits=limits)
+    else:
+        command = build_command(script_path, needs_sudo, password)
+        logging.debug(f"Executing command: {' '.join(command)}")
+        stdin_data = f"{password}\n".encode() if needs_sudo and password and command[0] == "sudo" else None
+        result = run_command(command, output, stdin_data, timeout, grace_period=grace_period, limits=limits)
+    if result.timed_out:
+        output(f"\n--- Timed out after {timeout:g}s ---\n")
+    usage_text = ""
+    if result.usage:
+        usage_text = f" ({format_usage(result.usage)})"
+        output(f"\n--- Resources: {format_usage(result.usage)} ---\n")
+    logging.info(f"Script {script_path} finished with exit code {result.exit_code}{usage_text}.")
+    return result
+
+
+class HeadlessWorkflowRunner:
+    """
+    Runs workflow steps on worker threads, honouring the same dependency graph and
+    concurrency limit as the GUI's WorkflowRunner. Output of parallel steps is
+    prefixed with the step name; writes are serialized so lines never interleave.
+    Each step that runs is recorded in `history`, if given. Steps are run with
+    `execute`, which takes the same arguments as run_script() (the default) and
+    also returns an ExitEvent, with the script's timeout, grace period, resource limits and ephemeral flag.
+    With a result_cache.ResultCache, steps that already succeeded recently are
+    skipped, as in WorkflowRunner.
+    """
+    def __init__(self, steps, scripts_by_id, script_dir: Path, password: Optional[str] = None,
+                 max_parallel: int = 1, continue_on_error: bool = False,
+                 output: Callable[[str], None] = sys.stdout.write, history=None, workflow_id: Optional[str] = None,
+                 execute: Callable[..., ExitEvent] = run_script, cache=None):
+        self.steps = steps
+        self.scripts_by_id = scripts_by_id
+        self.script_dir = script_dir
+        self.password = password
+        self.schedule = WorkflowSchedule(steps, max_parallel)
+        self.continue_on_error = continue_on_error
+        self.history = history
+        self.workflow_id = workflow_id
+        self.execute = execute
+        self.cache = cache
+        self.cached = set()  # Indexes of the steps that were skipped as cached
+        self._output = output
+        self._output_lock = threading.Lock()
+        self.results = {}
+
+    def write(self, text: str):
+        with self._output_lock:
+            self._output(text)
+            sys.stdout.flush()
+
+    def run(self) -> bool:
+        """Runs the workflow to completion and returns True if every step succeeded."""
+        completed = queue.Queue()
+        while not self.schedule.is_done():
+            for step in self.schedule.start_ready():
+                self._start_step(step, completed)
+            if not self.schedule.running:
+                continue
+            index, exit_code = completed.get()
+            self._finish_step(index, exit_code)
+        return self.schedule.all_succeeded()
+
+    def _start_step(self, step, completed: queue.Queue):
+        index = step['index']
+        script_info = self.scripts_by_id(step['id'])
+        if not script_info:
+            self.write(f"\n--- ERROR ---\nWorkflow aborted: Script with ID '{step['id']}' not found.\n")
+            logging.error(f"Workflow aborted: Script with ID '{step['id']}' not found.")
+            self.schedule.mark_finished(index, False)
+            self.schedule.stop()
+            return
+
+        self.write(f"\n--- Starting Step {index+1}/{len(self.steps)}: {script_info['name']} ---\n")
+        script_path = self.script_dir / script_info['path']
+        if not script_path.exists():
+            self.write(f"ERROR: Script file not found: {script_path}\n")
+            completed.put((index, EXIT_SPAWN_FAILED))
+            return
+
+        cache_key = self.cache.key(script_info) if self.cache else None
+        cached_at = self.cache.cached_success(cache_key) if self.cache else None
+        if cached_at is not None:
+            self.write(format_cached_step(cached_at))
+            self.cached.add(index)
+            completed.put((index, 0))
+            return
+
+        if self.schedule.max_parallel > 1:
+            prefixer = OutputPrefixer(f"[{script_info['name']}] ")
+            output = lambda text: self.write(prefixer(text))
+        else:
+            output = self.write
+
+        def worker():
+            counter = OutputCounter(output)
+            started_at = time.time()
+            try:
+                timeout, grace_period = script_timeouts(script_info)
+                result = self.execute(script_path, script_info.get('needs_sudo', False), self.password, counter,
+                                      timeout, grace_period, script_limits(script_info),
+                                      script_info.get('ephemeral', False))
+            except Exception as e:
+                logging.error(f"Step '{script_info['id']}' crashed: {e}", exc_info=True)
+                result = ExitEvent(EXIT_SPAWN_FAILED, time.time() - started_at)
+            if self.history is not None:
+                self.history.record_run(script_info['id'], started_at, time.time(), result.status,
+                                        script_info.get('needs_sudo', False), counter.bytes, self.workflow_id,
+                                        result.usage, cache_key)
+            completed.put((index, result.status))
+
+        threading.Thread(target=worker, name=f"step-{script_info['id']}", daemon=True).start()
+
+    def _finish_step(self, index: int, exit_code: int):
+        success = exit_code == 0
+        self.results[self.steps[index]['id']] = exit_code
+        self.schedule.mark_finished(index, success)
+        if index in self.cached:
+            self.write(f"--- Step {index+1} Succeeded (cached) ---\n")
+        else:
+            self.write(f"--- Step {index+1} {'Succeeded' if success else f'Failed (exit code {exit_code})'} ---\n")
+        if not success and not self.continue_on_error:
+            self.schedule.stop()
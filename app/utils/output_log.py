@@ -0,0 +1,176 @@
+# app/utils/output_log.py
+
+import logging
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+DEFAULT_TAIL_LINES = 10000
+# Only this many of the newest run logs are kept in the runs directory
+KEEP_RUN_LOGS = 100
+# A line without a newline is cut into tail entries of at most this many characters,
+# which tail_text() joins back together
+MAX_LINE_LENGTH = 64 * 1024
+# Upper bound on the bytes read from disk for one page of older output
+MAX_PAGE_BYTES = 4 * 1024 * 1024
+_READ_BLOCK_SIZE = 64 * 1024
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def run_log_dir() -> Path:
+    from app.config import settings
+    return settings.LOG_DIR / "runs"
+
+
+def prune_run_logs(log_dir: Path, keep: int = KEEP_RUN_LOGS):
+    """Deletes the oldest run logs so at most `keep` remain."""
+    logs = sorted(log_dir.glob("*.log"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old_log in logs[keep:]:
+        try:
+            old_log.unlink()
+        except OSError as e:
+            logging.warning(f"Could not remove old run log {old_log}: {e}")
+
+
+class RunLog:
+    """
+    Streams the full output of one run to its own file under LOG_DIR/runs as it
+    arrives, and keeps only the last `tail_lines` lines in memory for the UI.
+    Older output can be paged back in from the file with read_before() and
+    read_after(), which work on byte offsets into the file.
+
+    write() is thread-safe and becomes a no-op once the log is closed; the
+    read methods keep working after close().
+    """
+    def __init__(self, name: str, log_dir: Optional[Path] = None, tail_lines: int = DEFAULT_TAIL_LINES):
+        log_dir = Path(log_dir) if log_dir else run_log_dir()
+        log_dir.mkdir(parents=True, exist_ok=True)
+        prune_run_logs(log_dir, KEEP_RUN_LOGS - 1)
+
+        safe_name = _UNSAFE_NAME_CHARS.sub("_", name).strip("_") or "run"
+        stem = f"{datetime.now():%Y%m%d-%H%M%S}_{safe_name}"
+        self.path = log_dir / f"{stem}.log"
+        counter = 1
+        while self.path.exists():
+            counter += 1
+            self.path = log_dir / f"{stem}_{counter}.log"
+
+        self._file = open(self.path, "wb")
+        self._lock = threading.Lock()
+        # (byte offset, text, whether a newline ends it) for each line or piece of a long line
+        self._tail = deque(maxlen=max(1, tail_lines))
+        self._partial = ""
+        self._partial_offset = 0
+        self.size = 0
+        logging.info(f"Capturing run output to {self.path}")
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+    def write(self, text: str):
+        if not text:
+            return
+        data = text.encode("utf-8", errors="replace")
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._add_to_tail(text)
+            self.size += len(data)
+
+    def _add_to_tail(self, text: str):
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        offset = self._partial_offset
+        for line in lines:
+            self._tail.append((offset, line, True))
+            offset += len(line.encode("utf-8", errors="replace")) + 1
+        while len(self._partial) > MAX_LINE_LENGTH:
+            chunk, self._partial = self._partial[:MAX_LINE_LENGTH], self._partial[MAX_LINE_LENGTH:]
+            self._tail.append((offset, chunk, False))
+            offset += len(chunk.encode("utf-8", errors="replace"))
+        self._partial_offset = offset
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    # ------------------------------------------------------------------
+    # In-memory tail
+    # ------------------------------------------------------------------
+    def tail_text(self) -> str:
+        """The retained tail of the output, including any unfinished last line."""
+        with self._lock:
+            text = "".join(line + "\n" if ends_line else line for _, line, ends_line in self._tail)
+            return text + self._partial
+
+    def tail_start(self) -> int:
+        """Byte offset in the file where the in-memory tail begins."""
+        with self._lock:
+            return self._tail[0][0] if self._tail else self._partial_offset
+
+    # ------------------------------------------------------------------
+    # Paging from the file
+    # ------------------------------------------------------------------
+    def read_before(self, offset: int, max_lines: int) -> Tuple[str, int]:
+        """
+        Reads up to `max_lines` lines ending at byte `offset`. Returns the text and
+        the offset it starts at, to pass to the next read_before() call.
+        """
+        self.flush()
+        offset = min(offset, self.size)
+        position = offset
+        chunks = []
+        read_bytes = 0
+        newlines = 0
+        with open(self.path, "rb") as f:
+            while position > 0 and newlines < max_lines and read_bytes < MAX_PAGE_BYTES:
+                block_size = min(_READ_BLOCK_SIZE, position)
+                position -= block_size
+                f.seek(position)
+                chunk = f.read(block_size)
+                chunks.append(chunk)
+                read_bytes += block_size
+                # The newline ending the line just before `offset` doesn't start a new line
+                newlines += chunk.count(b"\n") - (1 if position + block_size == offset and chunk.endswith(b"\n") else 0)
+        data = b"".join(reversed(chunks))
+
+        lines = data.split(b"\n")
+        ends_with_newline = data.endswith(b"\n")
+        if ends_with_newline:
+            lines.pop()
+        lines = lines[-max_lines:] if max_lines > 0 else []
+        page = b"\n".join(lines) + (b"\n" if ends_with_newline and lines else b"")
+        return page.decode("utf-8", errors="replace"), offset - len(page)
+
+    def read_after(self, offset: int, max_lines: int) -> Tuple[str, int]:
+        """
+        Reads up to `max_lines` lines starting at byte `offset`. Returns the text and
+        the offset just after it, to pass to the next read_after() call.
+        """
+        self.flush()
+        lines = []
+        read_bytes = 0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while len(lines) < max_lines and read_bytes < MAX_PAGE_BYTES:
+                line = f.readline(MAX_PAGE_BYTES - read_bytes)
+                if not line:
+                    break
+                lines.append(line)
+                read_bytes += len(line)
+        return b"".join(lines).decode("utf-8", errors="replace"), offset + read_bytes
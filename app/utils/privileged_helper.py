@@ -0,0 +1,386 @@
+# app/utils/privileged_helper.py
+"""
+A root helper process that runs the sudo scripts, so each one doesn't go
+through its own 'sudo -S' (PAM, a fork and the password on a pipe).
+
+The app starts the helper once with sudo, sending the password a single time,
+and then asks it to run scripts over a Unix socket in a private directory.
+The helper streams the output back and exits when the app closes its stdin,
+i.e. when the app exits or crashes. It only runs scripts from the scripts
+directory, and only for clients that present the random token it makes at
+startup and reports on its stdout, which only the app reads. Scripts run in
+their own process group, which the helper stops (SIGTERM, then SIGKILL after
+the grace period) on timeout or when the app cancels the run by shutting down
+its side of the connection. The script's resource limits are applied by the
+helper, which also reports its resource usage along with the exit status.
+
+When run as root this file is executed directly with 'python -I', so the
+server half must only use the standard library, and resource_limits.py,
+which it loads from this directory by path.
+"""
+
+import argparse
+import codecs
+import hmac
+import importlib.util
+import json
+import logging
+import os
+import secrets
+import select
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+# Frames are a type byte and a payload length, then the payload
+HEADER = struct.Struct("!cI")
+OUTPUT, EXIT, ERROR, PONG = b"O", b"X", b"E", b"P"
+EXIT_STATUS = struct.Struct("!i??")  # exit code, timed out, cancelled
+USAGE = struct.Struct("!ddqqq")  # Follows the exit status; the fields of resource_limits.ResourceUsage
+READ_SIZE = 64 * 1024
+MAX_REQUEST_BYTES = 64 * 1024
+START_TIMEOUT = 15
+# These match execution_engine, which the server half can't import
+EXIT_SPAWN_FAILED = 127
+DEFAULT_GRACE_PERIOD = 10
+
+_helper = None
+
+
+# --- Server (runs as root) ---
+
+def _send(conn: socket.socket, kind: bytes, payload: bytes = b""):
+    conn.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def _stop_group(pgid: int, grace_period: float):
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    deadline = time.monotonic() + grace_period
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _load_resource_limits():
+    # 'python -I' leaves this directory off sys.path, so load the one module needed from it by path
+    spec = importlib.util.spec_from_file_location("resource_limits", Path(__file__).resolve().with_name("resource_limits.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _HelperServer:
+    def __init__(self, socket_path: Path, script_dir: Path, owner_uid: int, token: str, resource_limits):
+        self.socket_path = socket_path
+        self.script_dir = script_dir.resolve()
+        self.owner_uid = owner_uid
+        self.token = token
+        self.resource_limits = resource_limits
+        self.processes = set()
+        self.lock = threading.Lock()
+
+    def serve(self):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.socket_path))
+        os.chown(self.socket_path, self.owner_uid, -1)
+        os.chmod(self.socket_path, 0o600)
+        server.listen()
+        threading.Thread(target=self._exit_when_app_closes, daemon=True).start()
+        print(f"ready {self.token}", flush=True)
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _exit_when_app_closes(self):
+        # This also discards the password, if sudo didn't need it
+        while sys.stdin.buffer.read(READ_SIZE):
+            pass
+        with self.lock:
+            for process in self.processes:
+                try:
+                    os.killpg(process.pid, signal.SIGTERM)
+                except OSError:
+                    pass
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+        os._exit(0)
+
+    def _read_request(self, conn: socket.socket) -> dict:
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(4096)
+            if not chunk or len(data) + len(chunk) > MAX_REQUEST_BYTES:
+                raise ValueError("incomplete or oversized request")
+            data += chunk
+        return json.loads(data)
+
+    def _handle(self, conn: socket.socket):
+        with conn:
+            try:
+                request = self._read_request(conn)
+                if not hmac.compare_digest(str(request.get('token', '')), self.token):
+                    raise PermissionError("invalid token")
+                if request.get('ping'):
+                    _send(conn, PONG)
+                    return
+                script = Path(request['script']).resolve()
+                if self.script_dir not in script.parents or not script.is_file():
+                    raise PermissionError(f"{script} is not a script in {self.script_dir}")
+                timeout = float(request.get('timeout') or 0) or None
+                grace_period = max(0.0, float(request.get('grace_period', DEFAULT_GRACE_PERIOD)))
+                limits = self.resource_limits.script_limits({'id': script.name, 'limits': request.get('limits')})
+            except (ValueError, KeyError, TypeError, AttributeError, OSError) as e:
+                _send(conn, ERROR, str(e).encode())
+                return
+            try:
+                self._run(conn, script, timeout, grace_period, limits)
+            except OSError:
+                pass  # The app went away
+
+    def _run(self, conn: socket.socket, script: Path, timeout: float, grace_period: float, limits: dict):
+        try:
+            process = subprocess.Popen(["/bin/bash", str(script)], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, start_new_session=True,
+                                       preexec_fn=self.resource_limits.limit_setter(limits))
+        except (OSError, subprocess.SubprocessError) as e:
+            _send(conn, ERROR, str(e).encode())
+            return
+        with self.lock:
+            self.processes.add(process)
+        state = {'timed_out': False, 'cancelled': False, 'done': False}
+
+        def stop(reason):
+            if not state['done'] and not (state['timed_out'] or state['cancelled']):
+                state[reason] = True
+                _stop_group(process.pid, grace_period)
+
+        def watch_for_cancel():
+            # The app cancels by shutting down its side of the connection, which ends this read
+            try:
+                conn.recv(1)
+            except OSError:
+                pass
+            stop('cancelled')
+
+        timer = threading.Timer(timeout, stop, ('timed_out',)) if timeout else None
+        if timer is not None:
+            timer.daemon = True
+            timer.start()
+        threading.Thread(target=watch_for_cancel, daemon=True).start()
+        try:
+            fd = process.stdout.fileno()
+            while True:
+                chunk = os.read(fd, READ_SIZE)
+                if not chunk:
+                    break
+                try:
+                    _send(conn, OUTPUT, chunk)
+                except OSError:
+                    # Nobody is listening any more, so stop the script
+                    os.killpg(process.pid, signal.SIGTERM)
+                    raise
+            process.returncode, usage = self.resource_limits.wait_with_usage(process.pid)
+            state['done'] = True
+            _send(conn, EXIT, EXIT_STATUS.pack(process.returncode, state['timed_out'], state['cancelled'])
+                  + USAGE.pack(*usage))
+        finally:
+            state['done'] = True
+            if timer is not None:
+                timer.cancel()
+            process.stdout.close()
+            process.wait()
+            with self.lock:
+                self.processes.discard(process)
+
+
+def _serve_main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", required=True, type=Path)
+    parser.add_argument("--script-dir", required=True, type=Path)
+    parser.add_argument("--uid", required=True, type=int)
+    args = parser.parse_args()
+    _HelperServer(args.socket, args.script_dir, args.uid, secrets.token_hex(32), _load_resource_limits()).serve()
+
+
+# --- Client (runs in the app) ---
+
+class PrivilegedHelper:
+    """The app's handle on a running helper process."""
+    def __init__(self, script_dir: Path):
+        self.script_dir = Path(script_dir)
+        self.process = None
+        self.socket_dir = None
+        self.socket_path = None
+        self._token = None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, password: str) -> bool:
+        """
+        Starts the helper with sudo and checks that it answers a request. Returns
+        False, after cleaning up, if it doesn't.
+        """
+        self.socket_dir = Path(tempfile.mkdtemp(prefix="sw-helper-"))  # Created with mode 0700
+        self.socket_path = self.socket_dir / "helper.sock"
+        # sudo doesn't read the password when it needs none (root, NOPASSWD), so nothing
+        # else is sent on stdin; the helper reads and discards whatever sudo leaves there
+        command = ["sudo", "-S", "-k", "-p", "", sys.executable, "-I", str(Path(__file__).resolve()),
+                   "--socket", str(self.socket_path), "--script-dir", str(self.script_dir), "--uid", str(os.getuid())]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL)
+            self.process.stdin.write(f"{password}\n".encode())
+            self.process.stdin.flush()
+        except OSError as e:
+            logging.warning(f"Could not start the privileged helper: {e}")
+            self.stop()
+            return False
+
+        ready, _, _ = select.select([self.process.stdout], [], [], START_TIMEOUT)
+        status, _, token = (self.process.stdout.readline().decode(errors='ignore').strip().partition(" ")
+                            if ready else ("", "", ""))
+        self._token = token
+        if status != "ready" or not token or not self.ping():
+            logging.warning("The privileged helper did not start; sudo scripts will use sudo directly.")
+            self.stop()
+            return False
+        logging.info(f"Privileged helper started (PID {self.process.pid}).")
+        return True
+
+    def stop(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()  # The helper exits when its stdin closes
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                logging.warning("The privileged helper did not exit when asked.")
+            self.process = None
+        if self.socket_dir is not None:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+            self.socket_dir = None
+
+    def ping(self) -> bool:
+        """Whether the helper accepts a request."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(START_TIMEOUT)
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps({'token': self._token, 'ping': True}).encode() + b"\n")
+                reply = sock.makefile('rb').read(HEADER.size)
+        except OSError as e:
+            logging.warning(f"Could not reach the privileged helper: {e}")
+            return False
+        if len(reply) < HEADER.size or HEADER.unpack(reply)[0] != PONG:
+            logging.warning("The privileged helper refused a request.")
+            return False
+        return True
+
+    def run(self, script_path: Path, output: Callable[[str], None] = sys.stdout.write,
+            timeout: Optional[float] = None, grace_period: float = DEFAULT_GRACE_PERIOD,
+            on_start: Optional[Callable[[Callable[[], None]], None]] = None, limits: Optional[dict] = None):
+        """
+        Runs a script as root through the helper, streaming its merged output to
+        `output`, and returns an execution_engine.ExitEvent. `on_start` receives
+        a function that cancels the run and may be called from any thread.
+        """
+        from app.utils.execution_engine import ExitEvent
+        from app.utils.resource_limits import ResourceUsage
+
+        started = time.monotonic()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')  # Chunks can end mid-character
+        request = {'token': self._token, 'script': str(script_path), 'timeout': timeout, 'grace_period': grace_period,
+                   'limits': limits or {}}
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps(request).encode() + b"\n")
+                if on_start is not None:
+                    on_start(lambda: _shutdown_write(sock))
+                reader = sock.makefile('rb')
+                while True:
+                    header = reader.read(HEADER.size)
+                    if len(header) < HEADER.size:
+                        logging.error(f"The privileged helper stopped while running {script_path}.")
+                        break
+                    kind, length = HEADER.unpack(header)
+                    payload = reader.read(length)
+                    if kind == OUTPUT:
+                        text = decoder.decode(payload)
+                        if text:
+                            output(text)
+                    elif kind == EXIT:
+                        exit_code, timed_out, cancelled = EXIT_STATUS.unpack_from(payload)
+                        usage = ResourceUsage(*USAGE.unpack_from(payload, EXIT_STATUS.size))
+                        return ExitEvent(exit_code, time.monotonic() - started, timed_out, cancelled, usage)
+                    else:
+                        logging.error(f"The privileged helper refused {script_path}: {payload.decode(errors='ignore')}")
+                        break
+        except OSError as e:
+            logging.error(f"Could not reach the privileged helper: {e}")
+        return ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+
+    def run_script(self, script_path: Path, needs_sudo: bool = True, password: Optional[str] = None,
+                   output: Callable[[str], None] = sys.stdout.write, timeout: Optional[float] = None,
+                   grace_period: float = DEFAULT_GRACE_PERIOD, limits: Optional[dict] = None,
+                   ephemeral: bool = False):
+        """
+        Takes the same arguments as headless_runner.run_script, and returns an
+        ExitEvent like it. Scripts that don't
+        need sudo are run directly.
+        """
+        if not needs_sudo:
+            from app.utils.headless_runner import run_script
+            return run_script(script_path, False, None, output, timeout, grace_period, limits, ephemeral)
+        return self.run(script_path, output, timeout, grace_period, limits=limits)
+
+
+def _shutdown_write(sock: socket.socket):
+    try:
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass  # Already finished
+
+
+def start_helper(password: str, script_dir: Path) -> Optional[PrivilegedHelper]:
+    """Starts the shared helper used by ScriptRunner for sudo scripts."""
+    global _helper
+    helper = PrivilegedHelper(script_dir)
+    _helper = helper if helper.start(password) else None
+    return _helper
+
+
+def get_helper() -> Optional[PrivilegedHelper]:
+    return _helper if _helper is not None and _helper.running else None
+
+
+def stop_helper():
+    global _helper
+    if _helper is not None:
+        _helper.stop()
+        _helper = None
+
+
+if __name__ == "__main__":
+    _serve_main()
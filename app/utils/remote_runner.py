@@ -0,0 +1,233 @@
+# app/utils/remote_runner.py
+
+import logging
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from app.utils.execution_engine import DEFAULT_GRACE_PERIOD, EXIT_SPAWN_FAILED, ExitEvent, run_command
+from app.utils.headless_runner import HeadlessWorkflowRunner
+from app.utils.resource_limits import limits_preamble
+from app.utils.workflow_graph import OutputPrefixer
+
+# Hosts worked on at the same time
+DEFAULT_MAX_HOSTS = 8
+CONNECT_TIMEOUT = 10
+# How long an idle master connection stays open after its last session
+CONTROL_PERSIST = 60
+# ssh's own exit code for connection and authentication errors
+EXIT_SSH_ERROR = 255
+# Reads the whole script from stdin before running it, with stdin from /dev/null, so
+# commands in the script that read stdin can't consume the rest of it as 'bash -s' allows
+SCRIPT_RUNNER = '__sw_script=$(cat); exec </dev/null; eval "unset __sw_script; $__sw_script"'
+# Reads the password line from stdin, then runs the rest of stdin, the script, with
+# SCRIPT_RUNNER under sudo. The password is only passed on to sudo when sudo needs one,
+# so with NOPASSWD, a root login or cached credentials bash never sees it.
+SUDO_WRAPPER = (
+    'IFS= read -r password; '
+    'if sudo -n true 2>/dev/null; then exec sudo -n /bin/bash -c {runner}; fi; '
+    '{{ printf "%s\\n" "$password"; unset password; cat; }} | sudo -S -p "" /bin/bash -c {runner}'
+).format(runner=shlex.quote(SCRIPT_RUNNER))
+
+
+class HostResult(NamedTuple):
+    host: str
+    success: bool
+    exit_codes: Dict[str, int]  # script ID -> exit code, for the steps that ran
+    duration: float
+    log_path: Optional[Path]
+    error: Optional[str] = None  # Set when the host could not be reached
+
+
+def read_hosts_file(path: Path) -> List[str]:
+    """One host per line, as accepted by ssh ([user@]host or a Host alias); '#' starts a comment."""
+    hosts = []
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            hosts.append(line)
+    return hosts
+
+
+class SSHConnection:
+    """
+    Runs commands on one host over ssh. All sessions share one master connection
+    (OpenSSH ControlMaster), so only the first pays for the handshake and
+    authentication; ssh falls back to a separate connection if the master is busy
+    being set up. Sessions are non-interactive (BatchMode), so hosts need key or
+    agent authentication.
+    """
+    def __init__(self, host: str, control_dir: Path, ssh_command: str = "ssh",
+                 ssh_options: Sequence[str] = (), connect_timeout: int = CONNECT_TIMEOUT):
+        self.host = host
+        self.ssh_command = ssh_command
+        self.options = [
+            "-o", "BatchMode=yes",
+            "-o", f"ConnectTimeout={connect_timeout}",
+            "-o", "ControlMaster=auto",
+            # %C is a hash of the connection details, which keeps the socket path short enough for macOS
+            "-o", f"ControlPath={control_dir}/%C",
+            "-o", f"ControlPersist={CONTROL_PERSIST}",
+            *ssh_options,
+        ]
+
+    def command(self, remote_command: str) -> list:
+        return [self.ssh_command, *self.options, "--", self.host, remote_command]
+
+    def connect(self) -> Optional[str]:
+        """Opens the master connection. Returns None on success or ssh's error message."""
+        try:
+            result = subprocess.run(self.command("true"), stdin=subprocess.DEVNULL, capture_output=True,
+                                    timeout=CONNECT_TIMEOUT * 3)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return str(e)
+        if result.returncode != 0:
+            return result.stderr.decode(errors='ignore').strip() or f"ssh exited with code {result.returncode}"
+        return None
+
+    def close(self):
+        """Stops the master connection, if one is running."""
+        try:
+            subprocess.run([self.ssh_command, *self.options, "-O", "exit", "--", self.host],
+                           stdin=subprocess.DEVNULL, capture_output=True, timeout=CONNECT_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+    def run_script(self, script_path: Path, needs_sudo: bool = False, password: Optional[str] = None,
+                   output: Callable[[str], None] = sys.stdout.write, timeout: Optional[float] = None,
+                   grace_period: float = DEFAULT_GRACE_PERIOD, limits: Optional[dict] = None,
+                   ephemeral: bool = False) -> ExitEvent:
+        """
+        Runs a local script on the host by feeding it to SCRIPT_RUNNER on stdin, so
+        nothing needs to be copied there first. Takes the same arguments as headless_runner.run_script;
+        `ephemeral` makes no difference here.
+        """
+        try:
+            script = limits_preamble(limits) + Path(script_path).read_bytes()
+        except OSError as e:
+            logging.error(f"Could not read {script_path}: {e}")
+            return ExitEvent(EXIT_SPAWN_FAILED, 0.0)
+
+        remote_command = ["/bin/bash", "-c", SCRIPT_RUNNER]
+        stdin = script
+        if needs_sudo:
+            if password:
+                remote_command = ["/bin/bash", "-c", SUDO_WRAPPER]
+                stdin = f"{password}\n".encode() + script
+            else:
+                remote_command = ["sudo", "-n", *remote_command]
+
+        command = self.command(shlex.join(remote_command))
+        logging.debug(f"Executing on {self.host}: {shlex.join(remote_command)} < {script_path}")
+        result = run_command(command, output, stdin, timeout, grace_period=grace_period)
+        if result.timed_out:
+            # Stopping ssh ends the session, but a remote script that writes no more output may keep running
+            output(f"\n--- Timed out after {timeout:g}s ---\n")
+        logging.info(f"Script {script_path} on {self.host} finished with exit code {result.exit_code}.")
+        # The resource usage measured here is ssh's, not the script's
+        return result._replace(usage=None)
+
+
+class RemoteRunner:
+    """
+    Runs a script or workflow on many hosts at once, at most `max_hosts` at a
+    time. Each host gets its own run log, and its output is also passed to
+    `output` with a '[host] ' prefix on every line. Workflow steps run on each
+    host with the same ordering and parallelism as a local run.
+    """
+    def __init__(self, hosts: Sequence[str], script_dir: Path, max_hosts: int = DEFAULT_MAX_HOSTS,
+                 ssh_command: str = "ssh", ssh_options: Sequence[str] = (),
+                 output: Callable[[str], None] = sys.stdout.write):
+        self.hosts = list(dict.fromkeys(hosts))
+        self.script_dir = script_dir
+        self.max_hosts = max(1, max_hosts)
+        self.ssh_command = ssh_command
+        self.ssh_options = list(ssh_options)
+        self._output = output
+        self._output_lock = threading.Lock()
+
+    def write(self, text: str):
+        with self._output_lock:
+            self._output(text)
+            sys.stdout.flush()
+
+    def run(self, name: str, steps, scripts_by_id, password: Optional[str] = None,
+            max_parallel: int = 1, continue_on_error: bool = False) -> List[HostResult]:
+        """Runs the steps on every host and returns one result per host, in host order."""
+        control_dir = Path(tempfile.mkdtemp(prefix="sw-ssh-"))
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_hosts, len(self.hosts) or 1),
+                                    thread_name_prefix="remote") as pool:
+                futures = [pool.submit(self._run_host, host, control_dir, name, steps, scripts_by_id,
+                                       password, max_parallel, continue_on_error)
+                           for host in self.hosts]
+                return [future.result() for future in futures]
+        finally:
+            shutil.rmtree(control_dir, ignore_errors=True)
+
+    def _run_host(self, host, control_dir, name, steps, scripts_by_id, password, max_parallel, continue_on_error):
+        from app.utils.output_log import RunLog
+
+        started = time.monotonic()
+        prefixer = OutputPrefixer(f"[{host}] ")
+        connection = SSHConnection(host, control_dir, self.ssh_command, self.ssh_options)
+        error = connection.connect()
+        if error:
+            logging.error(f"Could not connect to {host}: {error}")
+            self.write(prefixer(f"Could not connect: {error}\n"))
+            return HostResult(host, False, {}, time.monotonic() - started, None, error)
+
+        # Nothing shows the in-memory tail, so keep it small
+        run_log = RunLog(f"{name}_{host}", tail_lines=100)
+
+        def output(text: str):
+            run_log.write(text)
+            self.write(prefixer(text))
+
+        try:
+            runner = HeadlessWorkflowRunner(steps, scripts_by_id, self.script_dir, password, max_parallel,
+                                            continue_on_error, output, execute=connection.run_script)
+            success = runner.run()
+        except Exception as e:
+            logging.error(f"Remote run on {host} crashed: {e}", exc_info=True)
+            success = False
+            runner = None
+        finally:
+            run_log.close()
+            connection.close()
+
+        exit_codes = dict(runner.results) if runner else {}
+        error = None
+        if EXIT_SSH_ERROR in exit_codes.values():
+            error = "connection lost"
+        return HostResult(host, success, exit_codes, time.monotonic() - started, run_log.path, error)
+
+
+def format_summary(results: Sequence[HostResult]) -> str:
+    """A table with one line per host and a total line, failed hosts first."""
+    lines = [f"{'Host':<30} {'Result':<12} {'Time':>8}  Details"]
+    for result in sorted(results, key=lambda r: (r.success, r.host)):
+        if result.success:
+            status, details = "ok", ""
+        elif result.error and not result.exit_codes:
+            status, details = "unreachable", result.error.splitlines()[-1]
+        else:
+            status = "failed"
+            details = ", ".join(f"{script_id}={code}" for script_id, code in result.exit_codes.items() if code != 0)
+            if result.error:
+                details = f"{details} ({result.error})" if details else result.error
+        lines.append(f"{result.host:<30} {status:<12} {result.duration:>7.1f}s  {details}")
+    failed = sum(1 for result in results if not result.success)
+    lines.append(f"{len(results) - failed}/{len(results)} hosts succeeded")
+    return "\n".join(lines) + "\n"
+
+
+def results_as_dicts(results: Sequence[HostResult]) -> List[dict]:
+    return [{**result._asdict(), 'log_path': str(result.log_path) if result.log_path else None} for result in results]
@@ -0,0 +1,129 @@
+# app/utils/resource_limits.py
+"""
+Optional per-script resource limits, applied as a script is started, and the
+resource usage of a finished script, read when it is reaped.
+
+A script definition may carry a 'limits' dict:
+
+    "limits": {"cpu_seconds": 600, "memory_mb": 2048, "open_files": 256, "nice": 10}
+
+The limits are inherited by everything the script starts. memory_mb limits
+address space, which Linux enforces but macOS does not.
+
+The privileged helper loads this file on its own, so it must only use the
+standard library.
+"""
+
+import logging
+import os
+import resource
+import sys
+from typing import Callable, NamedTuple, Optional, Tuple
+
+# Script definition field -> (rlimit, bytes or units per value)
+RLIMITS = {
+    'cpu_seconds': (resource.RLIMIT_CPU, 1),
+    'memory_mb': (resource.RLIMIT_AS, 1024 * 1024),
+    'open_files': (resource.RLIMIT_NOFILE, 1),
+}
+NICE_RANGE = range(0, 20)
+# A script over its CPU limit gets SIGXCPU, then SIGKILL after this many more CPU seconds
+CPU_KILL_MARGIN = 5
+
+
+class ResourceUsage(NamedTuple):
+    user_cpu: float  # Seconds
+    system_cpu: float
+    max_rss_kb: int  # Largest single process, in KiB
+    block_in: int  # Block input and output operations
+    block_out: int
+
+    @property
+    def cpu(self) -> float:
+        return self.user_cpu + self.system_cpu
+
+
+def script_limits(script_info: dict) -> dict:
+    """
+    Returns the valid entries of a script definition's optional 'limits' field,
+    as whole numbers; invalid or unknown ones are logged and left out.
+    """
+    limits = {}
+    for key, raw_value in (script_info.get('limits') or {}).items():
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            value = None
+        if key in RLIMITS and value is not None and value > 0:
+            limits[key] = value
+        elif key == 'nice' and value in NICE_RANGE:
+            limits[key] = value
+        else:
+            logging.warning(f"Ignoring the invalid limit {key}={raw_value!r} of script '{script_info.get('id')}'.")
+    return limits
+
+
+def limit_setter(limits: Optional[dict]) -> Optional[Callable[[], None]]:
+    """
+    Returns a subprocess preexec_fn that applies `limits` in the new process
+    before it runs the script, or None when there are none. Limits are capped
+    at the current hard limits, since only root may raise those.
+    """
+    if not limits:
+        return None
+
+    def apply_limits():
+        for key, (rlimit, unit) in RLIMITS.items():
+            if key not in limits:
+                continue
+            soft = limits[key] * unit
+            hard = soft + CPU_KILL_MARGIN if key == 'cpu_seconds' else soft
+            _, current_hard = resource.getrlimit(rlimit)
+            if current_hard != resource.RLIM_INFINITY:
+                soft, hard = min(soft, current_hard), min(hard, current_hard)
+            resource.setrlimit(rlimit, (soft, hard))
+        if limits.get('nice'):
+            os.nice(limits['nice'])
+
+    return apply_limits
+
+
+def limits_preamble(limits: Optional[dict], renice: bool = True) -> bytes:
+    """
+    Shell lines that apply `limits` to the rest of a bash script, for processes
+    that can't be given them with limit_setter(), e.g. on a remote host. The
+    nice level is set with renice on $$, so leave it out with renice=False
+    where $$ is not the script's own shell.
+    """
+    lines = []
+    if limits:
+        if 'cpu_seconds' in limits:
+            lines.append(f"ulimit -t {limits['cpu_seconds']}")
+        if 'memory_mb' in limits:
+            lines.append(f"ulimit -v {limits['memory_mb'] * 1024}")
+        if 'open_files' in limits:
+            lines.append(f"ulimit -n {limits['open_files']}")
+        if renice and limits.get('nice'):
+            lines.append(f"renice -n {limits['nice']} -p $$ >/dev/null")
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+def usage_from_rusage(rusage) -> ResourceUsage:
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    max_rss = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    return ResourceUsage(rusage.ru_utime, rusage.ru_stime, max_rss, rusage.ru_inblock, rusage.ru_oublock)
+
+
+def wait_with_usage(pid: int) -> Tuple[int, ResourceUsage]:
+    """
+    Waits for a child process and returns its exit code (negative for a signal,
+    as in subprocess) and its resource usage, which includes the processes it
+    waited for itself, e.g. sudo's command or the script's own children.
+    """
+    _, status, rusage = os.wait4(pid, 0)
+    return os.waitstatus_to_exitcode(status), usage_from_rusage(rusage)
+
+
+def format_usage(usage: ResourceUsage) -> str:
+    return (f"CPU {usage.user_cpu:.2f}s user + {usage.system_cpu:.2f}s system, "
+            f"max RSS {usage.max_rss_kb / 1024:.1f} MB, block I/O {usage.block_in} in / {usage.block_out} out")
@@ -0,0 +1,83 @@
+# app/utils/result_cache.py
+"""
+Lets a rerun of a workflow skip the steps that already succeeded, e.g. the big
+installs before the step that failed. Workflows opt in with a 'cache_ttl' in
+seconds:
+
+    'new_setup': {'name': 'New Setup', 'scripts': [...], 'cache_ttl': 4 * 3600}
+
+A step is skipped when the run history has a successful run of it, within the
+TTL, with the same cache key: a hash of the script's ID and content, whether it
+uses sudo, the host, OS and user, and the values of any environment variables
+listed in the script's optional 'cache_env'. Scripts that must always run,
+e.g. ones that check state, set 'cacheable': False.
+"""
+
+import getpass
+import hashlib
+import json
+import logging
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.utils.script_manifest import hash_file
+
+
+def workflow_cache_ttl(workflow: dict) -> Optional[float]:
+    """The workflow's 'cache_ttl' in seconds, or None if it doesn't use the result cache."""
+    try:
+        ttl = float(workflow.get('cache_ttl') or 0)
+    except (TypeError, ValueError):
+        logging.warning(f"Invalid cache_ttl value {workflow.get('cache_ttl')!r}; not caching step results.")
+        return None
+    return ttl if ttl > 0 else None
+
+
+def _environment() -> dict:
+    try:
+        user = getpass.getuser()
+    except (OSError, KeyError):
+        user = str(os.getuid())
+    return {'host': platform.node(), 'os': platform.platform(), 'user': user}
+
+
+class ResultCache:
+    """
+    Looks up and computes cache keys for the steps of one workflow run. With
+    force=True nothing is skipped, but keys are still computed so the runs are
+    recorded for later reruns.
+    """
+    def __init__(self, history, script_dir: Path, ttl: float, force: bool = False):
+        self.history = history
+        self.script_dir = Path(script_dir)
+        self.ttl = ttl
+        self.force = force
+        self._environment = _environment()
+
+    def key(self, script_info: dict) -> Optional[str]:
+        """The step's cache key, or None if its results are not cached."""
+        if not script_info.get('cacheable', True):
+            return None
+        try:
+            digest = hash_file(self.script_dir / script_info['path'])
+        except OSError as e:
+            logging.warning(f"Could not hash {script_info['path']}; not caching its result: {e}")
+            return None
+        material = dict(self._environment, id=script_info['id'], sha256=digest,
+                        needs_sudo=bool(script_info.get('needs_sudo', False)),
+                        env={name: os.environ.get(name) for name in script_info.get('cache_env', [])})
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def cached_success(self, key: Optional[str]) -> Optional[float]:
+        """When a successful run with this key finished, if one did within the TTL."""
+        if key is None or self.force:
+            return None
+        return self.history.last_success(key, time.time() - self.ttl)
+
+
+def format_cached_step(finished_at: float) -> str:
+    when = time.strftime('%Y-%m-%d %H:%M', time.localtime(finished_at))
+    return f"Skipped: already succeeded at {when} with the same script and environment.\n"
@@ -0,0 +1,199 @@
+# app/utils/run_history.py
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Runs older than this are dropped when the history is opened
+KEEP_DAYS = 365
+# Percentiles are computed over each script's most recent runs only, so a
+# regression shows up quickly instead of being averaged away by old runs
+STATS_WINDOW = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script_id TEXT NOT NULL,
+    workflow_id TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    exit_code INTEGER,
+    needs_sudo INTEGER NOT NULL DEFAULT 0,
+    output_bytes INTEGER NOT NULL DEFAULT 0,
+    cpu_seconds REAL,
+    max_rss_kb INTEGER,
+    cache_key TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_script ON runs (script_id, started_at);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (started_at);
+"""
+# Columns added since the first version of the table, for databases created before them
+_ADDED_COLUMNS = {'cpu_seconds': "REAL", 'max_rss_kb': "INTEGER", 'cache_key': "TEXT"}
+
+
+def default_history_path() -> Path:
+    from app.config import settings
+    return settings.DATA_DIR / "run_history.sqlite3"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * fraction))
+    return sorted_values[rank - 1]
+
+
+class RunHistory:
+    """
+    Local SQLite store of past script runs: which script ran, as part of which
+    workflow, when, for how long, with what exit code, whether it used sudo, how
+    much output it produced and, when known, its CPU time and peak memory.
+
+    Safe to share between threads. Recording never raises: a broken or locked
+    database is logged and the run carries on.
+    """
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else default_history_path()
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=5, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(runs)")}
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {column_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS runs_by_cache_key ON runs (cache_key, finished_at)")
+            self._conn.execute("DELETE FROM runs WHERE started_at < ?", (time.time() - KEEP_DAYS * 86400,))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Could not open run history at {self.db_path}: {e}")
+            self._conn = None
+
+    @property
+    def available(self) -> bool:
+        return self._conn is not None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def record_run(self, script_id: str, started_at: float, finished_at: float, exit_code: Optional[int],
+                   needs_sudo: bool = False, output_bytes: int = 0, workflow_id: Optional[str] = None, usage=None,
+                   cache_key: Optional[str] = None):
+        """
+        Stores one finished run. Times are Unix timestamps; exit_code is None if the
+        script was killed. `usage` is its resource_limits.ResourceUsage, if known,
+        and `cache_key` its result_cache key, if it ran in a cached workflow.
+        """
+        cpu_seconds = usage.cpu if usage else None
+        max_rss_kb = usage.max_rss_kb if usage else None
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT INTO runs (script_id, workflow_id, started_at, finished_at, exit_code, needs_sudo, output_bytes, "
+                    "cpu_seconds, max_rss_kb, cache_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (script_id, workflow_id, started_at, finished_at, exit_code, int(bool(needs_sudo)), output_bytes,
+                     cpu_seconds, max_rss_kb, cache_key))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"Could not record run of '{script_id}' in the run history: {e}")
+
+    def recent_runs(self, limit: int = 200, script_id: Optional[str] = None) -> List[dict]:
+        """The most recent runs, newest first, optionally for one script only."""
+        query = "SELECT * FROM runs"
+        params = []
+        if script_id:
+            query += " WHERE script_id = ?"
+            params.append(script_id)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row, duration=row['finished_at'] - row['started_at']) for row in self._query(query, params)]
+
+    def duration_stats(self, script_id: Optional[str] = None, window: int = STATS_WINDOW) -> Dict[str, dict]:
+        """
+        Per-script timing statistics over each script's last `window` runs:
+        {script_id: {'runs', 'failures', 'p50', 'p95', 'cpu_p50', 'max_rss_kb', 'last_run'}},
+        durations and CPU time in seconds. cpu_p50 and max_rss_kb are None for
+        scripts with no recorded resource usage.
+        """
+        query = ("SELECT script_id, started_at, finished_at - started_at AS duration, exit_code, cpu_seconds, max_rss_kb FROM ("
+                 "  SELECT *, ROW_NUMBER() OVER (PARTITION BY script_id ORDER BY started_at DESC) AS recency FROM runs"
+                 + (" WHERE script_id = ?" if script_id else "") +
+                 ") WHERE recency <= ?")
+        params = ([script_id] if script_id else []) + [window]
+
+        durations: Dict[str, List[float]] = {}
+        cpu_times: Dict[str, List[float]] = {}
+        stats: Dict[str, dict] = {}
+        for row in self._query(query, params):
+            entry = stats.setdefault(row['script_id'], {'runs': 0, 'failures': 0, 'last_run': row['started_at'],
+                                                        'max_rss_kb': None})
+            entry['runs'] += 1
+            entry['failures'] += row['exit_code'] != 0
+            entry['last_run'] = max(entry['last_run'], row['started_at'])
+            durations.setdefault(row['script_id'], []).append(row['duration'])
+            if row['cpu_seconds'] is not None:
+                cpu_times.setdefault(row['script_id'], []).append(row['cpu_seconds'])
+            if row['max_rss_kb'] is not None:
+                entry['max_rss_kb'] = max(entry['max_rss_kb'] or 0, row['max_rss_kb'])
+        for sid, values in durations.items():
+            values.sort()
+            stats[sid]['p50'] = percentile(values, 0.5)
+            stats[sid]['p95'] = percentile(values, 0.95)
+            stats[sid]['cpu_p50'] = percentile(sorted(cpu_times.get(sid, [])), 0.5)
+        return stats
+
+    def recent_durations(self, script_ids: List[str], limit: int) -> Dict[str, List[float]]:
+        """Durations of each script's last `limit` successful runs, oldest first."""
+        if not script_ids:
+            return {}
+        placeholders = ", ".join("?" * len(script_ids))
+        query = ("SELECT script_id, duration FROM ("
+                 "  SELECT script_id, started_at, finished_at - started_at AS duration,"
+                 "         ROW_NUMBER() OVER (PARTITION BY script_id ORDER BY started_at DESC) AS recency"
+                 f"  FROM runs WHERE exit_code = 0 AND script_id IN ({placeholders})"
+                 ") WHERE recency <= ? ORDER BY started_at")
+        durations: Dict[str, List[float]] = {}
+        for row in self._query(query, list(script_ids) + [limit]):
+            durations.setdefault(row['script_id'], []).append(row['duration'])
+        return durations
+
+    def last_success(self, cache_key: str, since: float) -> Optional[float]:
+        """When the latest successful run with this cache key finished, if that was after `since`."""
+        rows = self._query("SELECT MAX(finished_at) AS finished_at FROM runs "
+                           "WHERE cache_key = ? AND exit_code = 0 AND finished_at >= ?", [cache_key, since])
+        return rows[0]['finished_at'] if rows else None
+
+    def _query(self, query: str, params) -> List[sqlite3.Row]:
+        with self._lock:
+            if self._conn is None:
+                return []
+            try:
+                return self._conn.execute(query, params).fetchall()
+            except sqlite3.Error as e:
+                logging.warning(f"Run history query failed: {e}")
+                return []
+
+
+class OutputCounter:
+    """Wraps an output callback and counts the bytes passed through it."""
+    def __init__(self, output: Callable[[str], None]):
+        self._output = output
+        self.bytes = 0
+
+    def __call__(self, text: str):
+        self.bytes += len(text.encode("utf-8", errors="replace"))
+        self._output(text)
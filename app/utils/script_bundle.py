@@ -0,0 +1,216 @@
+# app/utils/script_bundle.py
+"""
+A single-file bundle of scripts, for shipping thousands of them as one file
+and reading one without loading the rest. The file is memory-mapped, so only
+the pages of the index and of the scripts actually read are loaded.
+
+Layout, with big-endian integers:
+
+    header    magic, version, entry count, names size, metadata size
+    index     one fixed-size entry per script, sorted by script ID: where its ID
+              is in the names table, its flags, the offset and length of its
+              stored data, and the size and SHA-256 of its plain content
+    names     the script IDs, UTF-8
+    metadata  JSON {"scripts": [...]}: the definitions of the bundled scripts
+    data      the scripts, compressed with zlib and/or encrypted with Fernet
+              (in that order) as their flags say
+
+Lookups binary-search the index, so opening a bundle doesn't parse it.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+from cryptography.fernet import InvalidToken
+
+from app.utils.config_store import write_atomic
+
+MAGIC = b"SWBUNDLE"
+BUNDLE_VERSION = 1
+# magic, version, entry count, names size, metadata size
+HEADER = struct.Struct("!8sHxxIQQ")
+# name offset, name length, flags, data offset, data length, plain size, SHA-256
+ENTRY = struct.Struct("!IHBxQQQ32s")
+
+FLAG_COMPRESSED = 1
+FLAG_ENCRYPTED = 2
+
+
+class BundleError(ValueError):
+    """Raised for a file that is not a valid bundle, or a script that can't be read from one."""
+
+
+class BundleEntry(NamedTuple):
+    script_id: str
+    flags: int
+    offset: int
+    length: int  # Stored bytes
+    size: int  # Plain bytes
+    sha256: str
+
+    @property
+    def compressed(self) -> bool:
+        return bool(self.flags & FLAG_COMPRESSED)
+
+    @property
+    def encrypted(self) -> bool:
+        return bool(self.flags & FLAG_ENCRYPTED)
+
+
+def build_bundle(path: Path, script_dir: Path, scripts: List[dict], compress: bool = True,
+                 fernet=None) -> List[str]:
+    """
+    Packs the files of the script definitions `scripts` (e.g. settings.SCRIPTS)
+    from `script_dir` into a bundle at `path`, keyed by script ID, and returns
+    the IDs of the scripts whose files are missing, which are left out. With a
+    cryptography Fernet, the scripts are stored encrypted. A script is only
+    stored compressed when that makes it smaller.
+    """
+    script_dir = Path(script_dir)
+    packed, missing = {}, []
+    for script in scripts:
+        if script['id'] in packed:
+            raise BundleError(f"Script ID '{script['id']}' is defined more than once")
+        try:
+            content = (script_dir / script['path']).read_bytes()
+        except OSError as e:
+            logging.warning(f"Not bundling script '{script['id']}': {e}")
+            missing.append(script['id'])
+            continue
+        flags, data = 0, content
+        if compress:
+            compressed = zlib.compress(content, 9)
+            if len(compressed) < len(content):
+                flags, data = FLAG_COMPRESSED, compressed
+        if fernet is not None:
+            flags, data = flags | FLAG_ENCRYPTED, fernet.encrypt(data)
+        packed[script['id']] = (script, flags, data, len(content), hashlib.sha256(content).digest())
+
+    ids = sorted(packed, key=lambda script_id: script_id.encode())
+    names = b"".join(script_id.encode() for script_id in ids)
+    metadata = json.dumps({'scripts': [packed[script_id][0] for script_id in ids]}, ensure_ascii=False).encode()
+    offset = HEADER.size + ENTRY.size * len(ids) + len(names) + len(metadata)
+    index, name_offset = [], 0
+    for script_id in ids:
+        _, flags, data, size, digest = packed[script_id]
+        name = script_id.encode()
+        index.append(ENTRY.pack(name_offset, len(name), flags, offset, len(data), size, digest))
+        name_offset += len(name)
+        offset += len(data)
+
+    header = HEADER.pack(MAGIC, BUNDLE_VERSION, len(ids), len(names), len(metadata))
+    write_atomic(Path(path), b"".join([header, *index, names, metadata, *(packed[i][2] for i in ids)]))
+    logging.info(f"Bundled {len(ids)} scripts into {path} ({offset:,} bytes)")
+    return missing
+
+
+class ScriptBundle:
+    """
+    Read access to a bundle file. Reads are safe from several threads; close()
+    (or leaving a `with` block) unmaps the file.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise BundleError(f"{self.path} is empty") from None
+        try:
+            magic, version, self._count, names_size, metadata_size = HEADER.unpack_from(self._map)
+        except struct.error:
+            magic, version = None, None
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            self._map.close()
+            raise BundleError(f"{self.path} is not a version {BUNDLE_VERSION} script bundle")
+        self._names_offset = HEADER.size + ENTRY.size * self._count
+        self._metadata_offset = self._names_offset + names_size
+        self._metadata_size = metadata_size
+        if self._metadata_offset + metadata_size > len(self._map):
+            self._map.close()
+            raise BundleError(f"{self.path} is truncated")
+        self._scripts = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, script_id: str) -> bool:
+        return self.entry(script_id) is not None
+
+    def _name(self, index: int) -> bytes:
+        name_offset, name_length = struct.unpack_from("!IH", self._map, HEADER.size + ENTRY.size * index)
+        start = self._names_offset + name_offset
+        return self._map[start:start + name_length]
+
+    def _entry(self, index: int) -> BundleEntry:
+        name_offset, name_length, flags, offset, length, size, digest = ENTRY.unpack_from(
+            self._map, HEADER.size + ENTRY.size * index)
+        start = self._names_offset + name_offset
+        return BundleEntry(self._map[start:start + name_length].decode(), flags, offset, length, size, digest.hex())
+
+    def entries(self) -> Iterator[BundleEntry]:
+        for index in range(self._count):
+            yield self._entry(index)
+
+    def ids(self) -> List[str]:
+        return [self._name(index).decode() for index in range(self._count)]
+
+    def entry(self, script_id: str) -> Optional[BundleEntry]:
+        name = script_id.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._name(low) == name:
+            return self._entry(low)
+        return None
+
+    def scripts(self) -> List[dict]:
+        """The definitions of the bundled scripts, parsed on first use."""
+        if self._scripts is None:
+            metadata = self._map[self._metadata_offset:self._metadata_offset + self._metadata_size]
+            self._scripts = json.loads(metadata.decode('utf-8'))['scripts']
+        return self._scripts
+
+    def read(self, script_id: str, fernet=None, verify: bool = True) -> bytes:
+        """
+        Returns a script's plain content. Encrypted scripts need the Fernet
+        they were bundled with. With verify, the content is checked against
+        its SHA-256.
+        """
+        entry = self.entry(script_id)
+        if entry is None:
+            raise BundleError(f"Script {script_id} is not in {self.path}")
+        if entry.offset + entry.length > len(self._map):
+            raise BundleError(f"Script {script_id} is truncated in {self.path}")
+        data = self._map[entry.offset:entry.offset + entry.length]
+        try:
+            if entry.encrypted:
+                if fernet is None:
+                    raise BundleError(f"Script {script_id} is encrypted and no key was given")
+                data = fernet.decrypt(data)
+            if entry.compressed:
+                data = zlib.decompress(data)
+        except (InvalidToken, zlib.error) as e:
+            raise BundleError(f"Script {script_id} could not be read from {self.path}: {e}") from e
+        if verify and hashlib.sha256(data).hexdigest() != entry.sha256:
+            raise BundleError(f"Script {script_id} in {self.path} does not match its SHA-256")
+        return data
@@ -0,0 +1,149 @@
+# app/utils/script_manifest.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from app.utils.config_store import write_atomic
+
+MANIFEST_VERSION = 1
+HASH_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+_READ_SIZE = 1024 * 1024
+
+
+class AuditReport(NamedTuple):
+    untracked: List[str]  # On disk but not configured
+    missing: List[str]  # Configured but not on disk
+    modified: List[str]  # Content changed since the previous audit
+    hashed: int  # Files that had to be re-read; the rest matched the manifest's size and mtime
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_READ_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_manifest_path() -> Path:
+    from app.config import settings
+    return settings.DATA_DIR / "script_manifest.json"
+
+
+class ScriptManifest:
+    """
+    Remembers the size, mtime and SHA-256 of every script in the scripts
+    directory (in DATA_DIR/script_manifest.json) so audits can tell when a
+    script's content changed, e.g. it was edited or truncated, and not just
+    whether it exists.
+
+    An audit only re-hashes files whose size or mtime differ from the manifest,
+    using a thread pool, and then records the new state: a change is reported
+    by the first audit that sees it.
+    """
+    def __init__(self, script_dir: Path, manifest_path: Optional[Path] = None, pattern: str = "*.sh"):
+        self.script_dir = Path(script_dir)
+        self.path = Path(manifest_path) if manifest_path else default_manifest_path()
+        self.pattern = pattern
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get('version') == MANIFEST_VERSION and str(self.script_dir) == data.get('script_dir'):
+                return data['files']
+            logging.info(f"Script manifest {self.path} is for another version or directory; starting a new one.")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.warning(f"Could not read the script manifest {self.path}, starting a new one: {e}")
+        return {}
+
+    def _save(self):
+        data = {'version': MANIFEST_VERSION, 'script_dir': str(self.script_dir), 'files': self._entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.path, json.dumps(data, indent=1, sort_keys=True))
+        except OSError as e:
+            logging.warning(f"Could not save the script manifest {self.path}: {e}")
+
+    def _stat_files(self, names: Optional[Iterable[str]]) -> Dict[str, os.stat_result]:
+        if names is None:
+            paths = self.script_dir.glob(self.pattern)
+        else:
+            paths = (self.script_dir / name for name in names)
+        stats = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                stats[path.name] = stat
+        return stats
+
+    def audit(self, configured_scripts: Set[str], names: Optional[Iterable[str]] = None) -> AuditReport:
+        """
+        Audits the whole scripts directory, or only the given filenames, against
+        the configured script filenames and the manifest.
+        """
+        if not self.script_dir.is_dir():
+            logging.error(f"Script audit failed: Directory not found at '{self.script_dir}'")
+            return AuditReport([], [], [], 0)
+        with self._lock:
+            names = None if names is None else set(names)
+            stats = self._stat_files(names)
+            checked = set(self._entries) | set(stats) if names is None else names
+
+            to_hash = [name for name, stat in stats.items() if not self._matches(name, stat)]
+            hashes = {}
+            if to_hash:
+                with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(to_hash))) as pool:
+                    for name, digest in zip(to_hash, pool.map(self._hash_or_none, to_hash)):
+                        if digest is not None:
+                            hashes[name] = digest
+
+            modified = []
+            changed = False
+            for name in checked:
+                if name not in stats:
+                    if self._entries.pop(name, None) is not None:
+                        changed = True
+                    continue
+                if name not in hashes:
+                    continue
+                previous = self._entries.get(name)
+                if previous is not None and previous['sha256'] != hashes[name]:
+                    modified.append(name)
+                stat = stats[name]
+                self._entries[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': hashes[name]}
+                changed = True
+            if changed:
+                self._save()
+
+            untracked = sorted(name for name in stats if name not in configured_scripts and name in checked)
+            missing = sorted(name for name in configured_scripts if name not in stats and (names is None or name in names))
+            return AuditReport(untracked, missing, sorted(modified), len(hashes))
+
+    def _matches(self, name: str, stat: os.stat_result) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+    def _hash_or_none(self, name: str) -> Optional[str]:
+        try:
+            return hash_file(self.script_dir / name)
+        except OSError as e:
+            logging.warning(f"Could not hash {name}: {e}")
+            return None
+
+    def sha256(self, name: str) -> Optional[str]:
+        """The recorded content hash of a script, as of the last audit."""
+        entry = self._entries.get(name)
+        return entry['sha256'] if entry else None
@@ -0,0 +1,167 @@
+# app/utils/script_registry.py
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+
+class ScriptRegistry:
+    """
+    Indexes the script definitions from settings.SCRIPTS so lookups don't need
+    a scan of the whole list. Build it once per config load; add(), update(),
+    remove() and sync() keep both the indexes and the wrapped list in sync, so
+    the list can still be saved as-is.
+
+    Indexes:
+        by ID               script_id -> script
+        by category         category -> scripts, in config order
+        uninstall links     installer ID -> its 'uninstall_id'
+        reverse links       uninstaller ID -> IDs of installers linking to it
+    """
+    def __init__(self, scripts: Optional[List[dict]] = None):
+        self.rebuild(scripts if scripts is not None else [])
+
+    def rebuild(self, scripts: List[dict]):
+        """Re-indexes from scratch, e.g. after the configuration was reloaded."""
+        self.scripts = scripts
+        self._by_id: Dict[str, dict] = {}
+        self._by_category: Dict[str, List[dict]] = {}
+        self._uninstall_links: Dict[str, str] = {}
+        self._linked_from: Dict[str, Set[str]] = {}
+        self._script_files: Dict[str, int] = {}
+        for script in scripts:
+            self._index(script)
+
+    def _index(self, script: dict):
+        self._by_id[script['id']] = script
+        self._by_category.setdefault(script.get('category', ''), []).append(script)
+        if script.get('uninstall_id'):
+            self._uninstall_links[script['id']] = script['uninstall_id']
+            self._linked_from.setdefault(script['uninstall_id'], set()).add(script['id'])
+        if script.get('path'):
+            name = Path(script['path']).name
+            self._script_files[name] = self._script_files.get(name, 0) + 1
+
+    def _unindex(self, script: dict):
+        del self._by_id[script['id']]
+        category_scripts = self._by_category[script.get('category', '')]
+        category_scripts.remove(script)
+        if not category_scripts:
+            del self._by_category[script.get('category', '')]
+        uninstall_id = self._uninstall_links.pop(script['id'], None)
+        if uninstall_id:
+            installers = self._linked_from[uninstall_id]
+            installers.discard(script['id'])
+            if not installers:
+                del self._linked_from[uninstall_id]
+        if script.get('path'):
+            name = Path(script['path']).name
+            self._script_files[name] -= 1
+            if not self._script_files[name]:
+                del self._script_files[name]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def get(self, script_id: str) -> Optional[dict]:
+        return self._by_id.get(script_id)
+
+    def __contains__(self, script_id: str) -> bool:
+        return script_id in self._by_id
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.scripts)
+
+    def __len__(self) -> int:
+        return len(self.scripts)
+
+    def ids(self) -> List[str]:
+        return [s['id'] for s in self.scripts]
+
+    def categories(self) -> List[str]:
+        return sorted(self._by_category)
+
+    def by_category(self, category: str) -> List[dict]:
+        return list(self._by_category.get(category, []))
+
+    def uninstaller_for(self, script_id: str) -> Optional[dict]:
+        """Returns the uninstall script linked to an installer, if it exists."""
+        uninstall_id = self._uninstall_links.get(script_id)
+        return self._by_id.get(uninstall_id) if uninstall_id else None
+
+    def installers_for(self, uninstall_id: str) -> Set[str]:
+        """Returns the IDs of the installers that link to an uninstall script."""
+        return set(self._linked_from.get(uninstall_id, ()))
+
+    def is_linked_uninstaller(self, script_id: str) -> bool:
+        return script_id in self._linked_from
+
+    def script_files(self) -> Set[str]:
+        """Filenames of all configured scripts, as used by the script audit."""
+        return set(self._script_files)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+    def add(self, script: dict):
+        if script['id'] in self._by_id:
+            raise ValueError(f"A script with ID '{script['id']}' already exists.")
+        self.scripts.append(script)
+        self._index(script)
+
+    def update(self, script_id: str, script: dict):
+        """Replaces a script definition in place, keeping its position in the list."""
+        old_script = self._by_id[script_id]
+        if script['id'] != script_id and script['id'] in self._by_id:
+            raise ValueError(f"A script with ID '{script['id']}' already exists.")
+        self._unindex(old_script)
+        self.scripts[self._position(old_script)] = script
+        self._index(script)
+        # _index appends to the category list; restore config order within the category
+        category = script.get('category', '')
+        self._by_category[category] = [s for s in self.scripts if s.get('category', '') == category]
+
+    def remove(self, script_id: str) -> Optional[dict]:
+        script = self._by_id.get(script_id)
+        if script is None:
+            return None
+        self._unindex(script)
+        del self.scripts[self._position(script)]
+        return script
+
+    def sync(self, scripts: List[dict]) -> Set[str]:
+        """
+        Brings the registry up to date with a new version of the script list, e.g.
+        after the scripts were saved, removing, adding and updating only the
+        scripts that differ. The wrapped list is changed in place to match, in the
+        new order. Returns the IDs of the scripts that were removed, added or changed.
+        """
+        new_by_id = {script['id']: script for script in scripts}
+        if len(new_by_id) != len(scripts):
+            # Duplicate IDs can't be applied one by one
+            changed = set(self._by_id) | set(new_by_id)
+            self.rebuild(scripts)
+            return changed
+
+        changed = {script_id for script_id in self._by_id if script_id not in new_by_id}
+        for script_id in changed:
+            self.remove(script_id)
+        for script in scripts:
+            old_script = self._by_id.get(script['id'])
+            if old_script is None:
+                self.add(script)
+            elif old_script != script:
+                self.update(script['id'], script)
+            else:
+                continue
+            changed.add(script['id'])
+
+        if self.ids() != list(new_by_id):
+            # Scripts were reordered, or added other than at the end
+            position = {script_id: i for i, script_id in enumerate(new_by_id)}
+            self.scripts.sort(key=lambda s: position[s['id']])
+            for category_scripts in self._by_category.values():
+                category_scripts.sort(key=lambda s: position[s['id']])
+        return changed
+
+    def _position(self, script: dict) -> int:
+        return next(i for i, s in enumerate(self.scripts) if s is script)
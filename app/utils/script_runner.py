@@ -1,66 +1,134 @@
 # app/utils/script_runner.py
 
+import asyncio
 import logging
-from PyQt6.QtCore import QObject, pyqtSignal, QProcess, QThread
+import time
+from PyQt6.QtCore import pyqtSignal, QThread
+
+from app.utils.execution_engine import DEFAULT_GRACE_PERIOD, ExecutionEngine, ExitEvent, OutputEvent
+from app.utils.headless_runner import build_command
+from app.utils.privileged_helper import get_helper
+from app.utils.resource_limits import format_usage
+from app.utils.shell_pool import get_shell_pool
 
 class ScriptRunner(QThread):
     """
-    Runs a shell script in a separate thread using QProcess to avoid blocking the GUI.
-    It captures output in real-time.
+    Runs a shell script in a separate thread, on the asyncio execution engine,
+    to avoid blocking the GUI. It captures output in real-time. Sudo scripts go
+    through the privileged helper when one is running, and through 'sudo -S'
+    otherwise. Other `ephemeral` scripts run on a prewarmed shell_pool worker.
+
+    The script is stopped, with its whole process group, after `timeout`
+    seconds or when cancel() is called; it gets `grace_period` seconds to exit
+    after SIGTERM before it is killed. `limits` are resource_limits limits,
+    applied as it starts; its resource usage is in `usage` once it has finished.
     """
+    # Output arriving within this many seconds is sent to the GUI as one signal
+    OUTPUT_BATCH_SECONDS = 0.05
+
     # Signals to communicate with the GUI thread
     output_ready = pyqtSignal(str)
     finished = pyqtSignal(bool)  # bool indicates success or failure
 
-    def __init__(self, script_path, password, needs_sudo=False, parent=None):
+    def __init__(self, script_path, password, needs_sudo=False, timeout=None, grace_period=DEFAULT_GRACE_PERIOD,
+                 limits=None, ephemeral=False, parent=None):
         super().__init__(parent)
         self.script_path = script_path
         self.password = password
         self.needs_sudo = needs_sudo
+        self.timeout = timeout
+        self.grace_period = grace_period
+        self.limits = limits
+        self.ephemeral = ephemeral
         self._success = False
+        self._cancel = None
+        self._cancel_requested = False
+        # Filled in as the script runs, for the run history
+        self.started_at = None
+        self.finished_at = None
+        self.exit_code = None
+        self.output_bytes = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.usage = None
 
     def run(self):
         """The main logic of the thread."""
-        self.process = QProcess()
-        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.started_at = time.time()
+        helper = get_helper() if self.needs_sudo else None
+        if helper is not None:
+            result = helper.run(self.script_path, self.emit_output, self.timeout, self.grace_period, self._set_cancel,
+                                self.limits)
+        elif self.ephemeral and not self.needs_sudo:
+            result = get_shell_pool().run(self.script_path, self.emit_output, self.timeout, self.grace_period,
+                                          self._set_cancel, self.limits)
+        else:
+            result = asyncio.run(self.run_with_engine())
+        self.handle_finish(result)
 
-        # Connect QProcess signals to our handlers
-        self.process.readyReadStandardOutput.connect(self.handle_output)
-        self.process.finished.connect(self.handle_finish)
+    async def run_with_engine(self):
+        command = build_command(self.script_path, self.needs_sudo, self.password)
+        logging.debug(f"Executing command: {' '.join(command)}")
+        stdin_data = f"{self.password}\n".encode() if command[0] == "sudo" else None
+        run = ExecutionEngine(1).run(command, stdin_data, self.timeout, grace_period=self.grace_period,
+                                     limits=self.limits)
+        self._set_cancel(run.cancel)
 
-        command = []
-        if self.needs_sudo:
-            # Using 'sudo -S' to read the password from standard input.
-            # This is generally safer than putting the password on the command line.
-            command.extend(["sudo", "-S", "-p", "''"])
-        
-        command.extend(["/bin/bash", self.script_path])
+        loop = asyncio.get_running_loop()
+        pending = []
+        flush_handle = None
 
-        logging.debug(f"Executing command: {' '.join(command)}")
-        
-        self.process.start(command[0], command[1:])
-        
-        if self.needs_sudo:
-            # Write the password to the process's standard input
-            self.process.write(f"{self.password}\n".encode())
-            self.process.closeWriteChannel()
-
-        # Start the event loop for this thread
-        self.exec()
-
-    def handle_output(self):
-        """Reads output from the process and emits it."""
-        data = self.process.readAllStandardOutput().data().decode(errors='ignore')
+        def flush():
+            nonlocal flush_handle
+            flush_handle = None
+            if pending:
+                self.emit_output("".join(pending))
+                pending.clear()
+
+        async for event in run:
+            if isinstance(event, OutputEvent):
+                pending.append(event.text)
+                if flush_handle is None:
+                    flush_handle = loop.call_later(self.OUTPUT_BATCH_SECONDS, flush)
+            elif isinstance(event, ExitEvent):
+                if flush_handle is not None:
+                    flush_handle.cancel()
+                flush()
+                return event
+
+    def _set_cancel(self, cancel):
+        self._cancel = cancel
+        if self._cancel_requested:
+            cancel()
+
+    def cancel(self):
+        """Stops the script and its child processes. Safe to call from any thread, before or after it starts."""
+        self._cancel_requested = True
+        if self._cancel is not None:
+            self._cancel()
+
+    def emit_output(self, data):
+        self.output_bytes += len(data.encode())
         self.output_ready.emit(data)
 
-    def handle_finish(self, exit_code, exit_status):
+    def handle_finish(self, result):
         """
         Handles the process finishing, determines success, and emits the finished signal.
         """
-        logging.info(f"Script {self.script_path} finished with exit code {exit_code}.")
-        self._success = (exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit)
+        self.usage = result.usage
+        usage_text = f" ({format_usage(result.usage)})" if result.usage else ""
+        logging.info(f"Script {self.script_path} finished with exit code {result.exit_code}{usage_text}.")
+        self.finished_at = time.time()
+        self.timed_out = result.timed_out
+        self.cancelled = result.cancelled
+        if result.timed_out:
+            self.emit_output(f"\n--- Timed out after {self.timeout:g}s ---\n")
+        elif result.cancelled:
+            self.emit_output("\n--- Cancelled ---\n")
+        # Killed by a signal; recorded as no exit code, as before
+        self.exit_code = result.status if result.status >= 0 else None
+        self._success = result.status == 0
         self.finished.emit(self._success)
-        self.quit() # End the thread's event loop
 
     def get_success_status(self):
         """Allows retrieving the final status after the thread has finished."""
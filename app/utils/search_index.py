@@ -0,0 +1,144 @@
+# app/utils/search_index.py
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+# How much a match in each field counts towards a script's rank
+FIELD_WEIGHTS = {'name': 10, 'id': 6, 'tags': 5, 'category': 4, 'description': 2}
+
+# Grams of up to this many characters are indexed, so queries of any length
+# can be answered from the index (shorter query terms use shorter grams).
+MAX_GRAM = 3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _script_fields(script: dict) -> Dict[str, str]:
+    tags = script.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return {
+        'name': script.get('name', '').lower(),
+        'id': script.get('id', '').lower(),
+        'tags': " ".join(tags).lower(),
+        'category': script.get('category', '').lower(),
+        'description': script.get('description', '').lower(),
+    }
+
+
+def _grams(text: str, size: int) -> Set[str]:
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class ScriptSearchIndex:
+    """
+    An inverted n-gram index over script name, ID, tags, category and description.
+
+    A query is split into terms; a script matches when every term is a substring
+    of one of its fields. Candidates come from intersecting the gram postings of
+    each term, so only those few scripts are checked. If a query extends the
+    previous one (the user kept typing), only the previous matches are searched.
+    Results are ranked by field weight and match quality: an exact word beats a
+    word prefix, which beats a match inside a word.
+    """
+    def __init__(self, scripts: Iterable[dict] = ()):
+        self.rebuild(scripts)
+
+    def rebuild(self, scripts: Iterable[dict]):
+        self._fields: Dict[str, Dict[str, str]] = {}
+        self._tokens: Dict[str, Dict[str, Set[str]]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        for script in scripts:
+            self.add(script)
+
+    def add(self, script: dict):
+        script_id = script['id']
+        if script_id in self._fields:
+            self.remove(script_id)
+        fields = _script_fields(script)
+        self._fields[script_id] = fields
+        self._tokens[script_id] = {field: set(_TOKEN_RE.findall(text)) for field, text in fields.items()}
+        for gram in self._script_grams(fields):
+            self._postings.setdefault(gram, set()).add(script_id)
+        self._reset_narrowing()
+
+    def update(self, script: dict):
+        self.add(script)
+
+    def remove(self, script_id: str):
+        fields = self._fields.pop(script_id, None)
+        if fields is None:
+            return
+        del self._tokens[script_id]
+        for gram in self._script_grams(fields):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(script_id)
+                if not postings:
+                    del self._postings[gram]
+        self._reset_narrowing()
+
+    def _script_grams(self, fields: Dict[str, str]) -> Set[str]:
+        grams = set()
+        for text in fields.values():
+            for size in range(1, MAX_GRAM + 1):
+                grams |= _grams(text, size)
+        return grams
+
+    def _reset_narrowing(self):
+        self._last_query = None
+        self._last_matches: Optional[Set[str]] = None
+
+    def search(self, query: str) -> List[str]:
+        """Returns the IDs of matching scripts, best match first. An empty query matches nothing."""
+        query = query.strip().lower()
+        terms = query.split()
+        if not terms:
+            self._reset_narrowing()
+            return []
+
+        if self._last_query and query.startswith(self._last_query):
+            candidates = set(self._last_matches)
+        else:
+            candidates = None
+        for term in terms:
+            term_candidates = self._candidates_for(term)
+            candidates = term_candidates if candidates is None else candidates & term_candidates
+            if not candidates:
+                break
+
+        matches = {script_id for script_id in candidates
+                   if all(any(term in text for text in self._fields[script_id].values()) for term in terms)}
+        self._last_query = query
+        self._last_matches = matches
+
+        return sorted(matches, key=lambda script_id: (-self._score(script_id, terms), self._fields[script_id]['name']))
+
+    def _candidates_for(self, term: str) -> Set[str]:
+        size = min(MAX_GRAM, len(term))
+        candidates = None
+        for gram in _grams(term, size):
+            postings = self._postings.get(gram, set())
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        return candidates or set()
+
+    def _score(self, script_id: str, terms: List[str]) -> float:
+        score = 0.0
+        fields = self._fields[script_id]
+        tokens = self._tokens[script_id]
+        for term in terms:
+            best = 0.0
+            for field, weight in FIELD_WEIGHTS.items():
+                if term not in fields[field]:
+                    continue
+                if term in tokens[field]:
+                    quality = 3
+                elif any(token.startswith(term) for token in tokens[field]):
+                    quality = 2
+                else:
+                    quality = 1
+                best = max(best, weight * quality)
+            score += best
+        return score
@@ -0,0 +1,288 @@
+# app/utils/shell_pool.py
+"""
+A pool of prewarmed bash workers for short scripts. A script whose definition
+sets 'ephemeral': True, and that doesn't need sudo, is run by sending its body
+to an idle worker, which runs it in a fresh subshell, instead of starting a new
+/bin/bash for it. Its output, exit code (negative for a signal), timeout, cancel,
+$0 and BASH_SOURCE are as for a normal run; only no resource usage is recorded,
+since the subshell is not the app's child. In the subshell $$ and
+BASH_EXECUTION_STRING are the worker's, so scripts that use them, or BASHPID,
+run normally instead, as do scripts that use $0 where bash can't set it
+(before 5.0, such as macOS's /bin/bash).
+
+Each worker reads NUL-terminated commands on stdin. It runs each one as a
+background job, which job control puts in its own process group, with the
+output going to the worker's FIFO; the command sources the script by its path.
+The worker reports the job's PID, then the job's line from `jobs -l` when it
+ends, which tells an exit from a signal, and then its exit status, on stdout.
+The FIFO reaches end of file once the script and anything it started have
+closed their output, just as a normal run's output pipe does.
+"""
+
+import atexit
+import codecs
+import itertools
+import logging
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.utils.execution_engine import DEFAULT_GRACE_PERIOD, EXIT_SPAWN_FAILED, ExitEvent, run_command, stop_group
+from app.utils.resource_limits import limits_preamble
+
+# Idle workers kept ready; busy workers beyond this are stopped once their script ends
+DEFAULT_POOL_SIZE = 4
+WORKER_NAME = "scriptweaver-worker"
+READ_SIZE = 64 * 1024
+# bash's exit code for a file it won't run as a script
+EXIT_CANNOT_EXECUTE = 126
+
+# $1 is the worker's FIFO. The job turns job control off again, so the script's own
+# background jobs stay in its process group, and its fd 4 and stdin are not the worker's.
+# The CHLD trap prints the job's status, e.g. 'Exit 143' or 'Terminated', while bash
+# still has it; the exit status alone is 128 + the signal number either way.
+WORKER_LOOP = r"""
+set -m
+__sw_fifo=$1
+set --
+trap 'LC_ALL=C jobs -l %% 2>/dev/null' CHLD
+while IFS= read -r -d '' __sw_script; do
+    exec 4>"$__sw_fifo"
+    ( trap - CHLD; set +m; exec 4>&- </dev/null; unset __sw_fifo; eval "unset __sw_script; $__sw_script" ) >&4 2>&1 &
+    exec 4>&-
+    printf 'pid %d\n' "$!"
+    wait "$!"
+    printf 'exit %d\n' "$?"
+done
+"""
+# A `jobs -l` line for a job that exited rather than being killed by a signal
+_EXITED_JOB = re.compile(rb"\[\d+\][+-]?\s+\d+\s+(Done|Exit \d+)\b")
+# $0 and ${0...} in a script
+_USES_SCRIPT_NAME = re.compile(rb"\$\{?0")
+# Parameters that are the worker's in its subshell: $$, BASHPID and BASH_EXECUTION_STRING
+_USES_WORKER_PARAMETERS = re.compile(rb"\$\{?(\$|BASHPID\b|BASH_EXECUTION_STRING\b)")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class _Worker:
+    def __init__(self, fifo: Path):
+        self.fifo = fifo
+        os.mkfifo(fifo, 0o600)
+        self.process = subprocess.Popen(
+            ["/bin/bash", "--noprofile", "--norc", "-c", WORKER_LOOP, WORKER_NAME, str(fifo)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0,
+            start_new_session=True)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def read_status(self, kind: bytes):
+        """
+        Reads the worker's stdout up to the next `kind` line and returns its number
+        and the last job line before it, or raises ValueError if the worker stopped.
+        """
+        job_line = None
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise ValueError("the worker stopped")
+            if line.startswith(kind + b" "):
+                return int(line[len(kind) + 1:]), job_line
+            if line.startswith(b"["):
+                job_line = line
+
+    def close(self):
+        try:
+            self.process.stdin.close()  # The worker's loop ends when its stdin closes
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        try:
+            self.fifo.unlink()
+        except OSError:
+            pass
+
+
+class ShellPool:
+    """
+    Keeps up to `size` idle bash workers and runs scripts on them. Safe to use
+    from several threads at once; each run has a worker to itself, and a new
+    one is started when none is idle.
+    """
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.size = max(1, size)
+        self._dir = Path(tempfile.mkdtemp(prefix="sw-pool-"))  # Created with mode 0700
+        self._names = itertools.count()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # Setting $0 needs BASH_ARGV0, from bash 5.0
+        self.sets_script_name = _bash_version() >= 5
+
+    def _new_worker(self) -> _Worker:
+        return _Worker(self._dir / f"worker-{next(self._names)}")
+
+    def prewarm(self):
+        """Starts workers until `size` are idle."""
+        with self._lock:
+            while not self._closed and len(self._idle) < self.size:
+                self._idle.append(self._new_worker())
+
+    def _acquire(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+                worker.close()
+            return self._new_worker()
+
+    def _release(self, worker: _Worker):
+        with self._lock:
+            if not self._closed and worker.alive and len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def run(self, script_path: Path, output: Callable[[str], None] = sys.stdout.write,
+            timeout: Optional[float] = None, grace_period: float = DEFAULT_GRACE_PERIOD,
+            on_start: Optional[Callable[[Callable[[], None]], None]] = None,
+            limits: Optional[dict] = None) -> ExitEvent:
+        """
+        Runs a script on a worker, streaming its merged output to `output`, and
+        returns an execution_engine.ExitEvent. Takes the same arguments as
+        PrivilegedHelper.run().
+        """
+        started = time.monotonic()
+        try:
+            body = Path(script_path).read_bytes()
+        except OSError as e:
+            logging.error(f"Could not read {script_path}: {e}")
+            output(f"ERROR: Could not read {script_path}: {e}\n")
+            return ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+        if b"\0" in body:
+            output(f"{script_path}: cannot execute binary file\n")
+            return ExitEvent(EXIT_CANNOT_EXECUTE, time.monotonic() - started)
+        # Scripts that would see the worker instead of themselves run the usual way
+        if _USES_WORKER_PARAMETERS.search(body) or (not self.sets_script_name and _USES_SCRIPT_NAME.search(body)):
+            return run_command(["/bin/bash", str(script_path)], output, None, timeout,
+                               (lambda run: on_start(run.cancel)) if on_start else None, grace_period, limits)
+        # Sourced by path, so BASH_SOURCE is the path; a bare name would be looked up on PATH
+        path = shlex.quote(str(script_path) if os.sep in str(script_path) else f".{os.sep}{script_path}")
+        command = (limits_preamble(limits, renice=False)
+                   + f"BASH_ARGV0={path}; unset BASH_ARGV0; source {path}".encode())
+
+        try:
+            worker = self._acquire()
+        except OSError as e:
+            logging.error(f"Could not start a shell worker: {e}")
+            output(f"ERROR: Could not start a shell worker: {e}\n")
+            return ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+
+        # Opened before the script is sent, so the worker's open of the FIFO doesn't block
+        fd = os.open(worker.fifo, os.O_RDONLY | os.O_NONBLOCK)
+        state = {'timed_out': False, 'cancelled': False, 'done': False}
+        timer = None
+        try:
+            try:
+                worker.process.stdin.write(command + b"\0")
+                pid, _ = worker.read_status(b"pid")
+            except (OSError, ValueError):
+                logging.error(f"A shell worker stopped before running {script_path}.")
+                worker.close()
+                return ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+            # The worker opened the FIFO before starting the job, so from here end of file is the real end
+            os.set_blocking(fd, True)
+
+            def stop(reason):
+                if not state['done'] and not (state['timed_out'] or state['cancelled']):
+                    state[reason] = True
+                    threading.Thread(target=stop_group, args=(pid, grace_period), daemon=True).start()
+
+            if timeout:
+                timer = threading.Timer(timeout, stop, ('timed_out',))
+                timer.daemon = True
+                timer.start()
+            if on_start is not None:
+                on_start(lambda: stop('cancelled'))
+            if limits and limits.get('nice'):
+                try:
+                    os.setpriority(os.PRIO_PGRP, pid, os.getpriority(os.PRIO_PROCESS, 0) + limits['nice'])
+                except OSError:
+                    pass  # Already finished
+
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')  # Chunks can end mid-character
+            while True:
+                chunk = os.read(fd, READ_SIZE)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    output(text)
+            try:
+                exit_code, job_line = worker.read_status(b"exit")
+            except (OSError, ValueError):
+                logging.error(f"A shell worker stopped while running {script_path}.")
+                worker.close()
+                return ExitEvent(EXIT_SPAWN_FAILED, time.monotonic() - started)
+            state['done'] = True
+            if job_line is not None:
+                signalled = not _EXITED_JOB.match(job_line)
+            else:
+                signalled = state['timed_out'] or state['cancelled']
+            if exit_code > 128 and signalled:
+                exit_code = 128 - exit_code  # Report the signal as the engine does
+            self._release(worker)
+            return ExitEvent(exit_code, time.monotonic() - started, state['timed_out'], state['cancelled'])
+        finally:
+            state['done'] = True
+            if timer is not None:
+                timer.cancel()
+            os.close(fd)
+
+
+def _bash_version() -> int:
+    try:
+        result = subprocess.run(["/bin/bash", "-c", 'echo "${BASH_VERSINFO[0]}"'], capture_output=True, text=True)
+        return int(result.stdout)
+    except (OSError, ValueError):
+        return 0
+
+
+def get_shell_pool() -> ShellPool:
+    """The shared pool, started on first use and closed when the app exits."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShellPool()
+            atexit.register(stop_shell_pool)
+        return _pool
+
+
+def stop_shell_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,124 @@
+# app/utils/startup_profiler.py
+"""
+Optional startup profiling, enabled with the --profile-startup flag.
+
+Works like `python -X importtime`, but summarized: a meta path hook times how
+long every module takes to execute (including the modules it imports), and
+the report lists the slowest packages and modules plus named startup phases
+such as "QApplication created" and "login prompt shown".
+
+All functions are no-ops unless enable() has been called.
+"""
+
+import sys
+import time
+from collections import defaultdict
+
+_enabled = False
+_reported = False
+_start_time = None
+_phases = []
+_timings = {}  # module name -> [cumulative seconds, self seconds]
+_stack = []
+
+
+class _TimingLoader:
+    """
+    Wraps a module loader and records how long create_module and exec_module
+    take. Extension modules such as PyQt6.QtWidgets do most of their work in
+    create_module, Python modules in exec_module.
+    """
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+        self._create_time = 0.0
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        started = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._create_time = time.perf_counter() - started
+            if _stack:
+                _stack[-1] += self._create_time
+
+    def exec_module(self, module):
+        _stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = _stack.pop()
+            if _stack:
+                _stack[-1] += elapsed
+            total = self._create_time + elapsed
+            _timings[self._name] = [total, total - children]
+
+
+class _TimingFinder:
+    """Meta path finder that defers to the real finders and wraps their loaders."""
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is cls or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimingLoader(spec.loader, name)
+                return spec
+        return None
+
+
+def enable():
+    """Starts recording import times. Call as early as possible."""
+    global _enabled, _start_time
+    if _enabled:
+        return
+    _enabled = True
+    _start_time = time.perf_counter()
+    sys.meta_path.insert(0, _TimingFinder)
+    mark("profiling started")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def mark(label: str):
+    """Records a named startup phase, relative to when profiling was enabled."""
+    if _enabled:
+        _phases.append((label, time.perf_counter() - _start_time))
+
+
+def report(stream=None, limit: int = 15):
+    """Prints the summary once and stops recording imports."""
+    global _reported
+    if not _enabled or _reported:
+        return
+    _reported = True
+    if _TimingFinder in sys.meta_path:
+        sys.meta_path.remove(_TimingFinder)
+    stream = stream or sys.stderr
+
+    by_package = defaultdict(float)
+    for name, (_, self_time) in _timings.items():
+        # Keep our own modules separate; group third-party and stdlib by top-level package
+        key = name if name.startswith('app.') else name.split('.')[0]
+        by_package[key] += self_time
+
+    total_import = sum(self_time for _, self_time in _timings.values())
+    lines = ["", "=== Startup profile ===", "Phases (since profiling started):"]
+    lines += [f"  {elapsed * 1000:9.1f} ms  {label}" for label, elapsed in _phases]
+    lines.append(f"Imports: {len(_timings)} modules, {total_import * 1000:.1f} ms total")
+    lines.append("Slowest packages (self time):")
+    for name, self_time in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        lines.append(f"  {self_time * 1000:9.1f} ms  {name}")
+    lines.append("Slowest modules (cumulative, including their imports):")
+    for name, (cumulative, _) in sorted(_timings.items(), key=lambda item: item[1][0], reverse=True)[:limit]:
+        lines.append(f"  {cumulative * 1000:9.1f} ms  {name}")
+    print("\n".join(lines), file=stream)
@@ -5,15 +5,18 @@ import threading
 import logging
 from pathlib import Path  # <-- Add this import
 
+# Lines of output copied into the app log when a script fails; the rest stays in its run log
+FAILURE_TAIL_LINES = 20
+
 def check_sudo_password(system_password: str) -> bool:
     """
     Validates the user's system password by calling `sudo -v`.
     Returns True if successful, False otherwise.
     """
     try:
-        # This just verifies the password is correct by elevating once
-        command = f"echo '{system_password}' | sudo -S -v"
-        subprocess.run(command, shell=True, check=True,
+        # This just verifies the password is correct by elevating once.
+        # The password goes straight to sudo's stdin, never through a shell.
+        subprocess.run(["sudo", "-S", "-k", "-p", "", "-v"], input=f"{system_password}\n".encode(), check=True,
                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         return True
     except subprocess.CalledProcessError:
@@ -25,9 +28,9 @@ def keep_sudo_active(system_password: str, interval: int = 240):
     This function should be run in a background thread.
     """
     while True:
-        command = f"echo '{system_password}' | sudo -S -v"
         # We don’t need the output, so pipe it to avoid printing on screen
-        subprocess.run(command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        subprocess.run(["sudo", "-S", "-p", "", "-v"], input=f"{system_password}\n".encode(),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         time.sleep(interval)
 
 def run_script_as_sudo(script_path: Path, system_password: str) -> bool:
@@ -36,25 +39,30 @@ def run_script_as_sudo(script_path: Path, system_password: str) -> bool:
     You only need the password if the session isn't kept alive,
     but passing it won't hurt if it's valid.
     """
-    command = f"echo '{system_password}' | sudo -S bash '{script_path}'"
-    try:
-        completed = subprocess.run(command, shell=True, check=True,
-                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logging.info("%s output:\n%s", script_path.name, completed.stdout.decode())
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error("Script %s failed as sudo: %s", script_path.name, e.stderr.decode())
-        return False
+    return _run_script_to_log(script_path, True, system_password)
 
 def run_script_no_sudo(script_path: Path) -> bool:
     """
     Runs script without sudo privileges.
     """
+    return _run_script_to_log(script_path, False, None)
+
+def _run_script_to_log(script_path: Path, needs_sudo: bool, system_password) -> bool:
+    """
+    Streams the script's output to its own run log as it arrives rather than
+    holding all of it in memory, and logs where the full output went.
+    """
+    from app.utils.headless_runner import run_script
+    from app.utils.output_log import RunLog
+
+    run_log = RunLog(script_path.stem)
     try:
-        completed = subprocess.run(["bash", str(script_path)], check=True,
-                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logging.info("%s output:\n%s", script_path.name, completed.stdout.decode())
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error("Script %s failed: %s", script_path.name, e.stderr.decode())
-        return False
\ No newline at end of file
+        exit_code = run_script(script_path, needs_sudo, system_password, run_log.write).status
+    finally:
+        run_log.close()
+    if exit_code != 0:
+        logging.error("Script %s failed%s with exit code %d, output in %s:\n%s", script_path.name,
+                      " as sudo" if needs_sudo else "", exit_code, run_log.path, "\n".join(run_log.tail_text().splitlines()[-FAILURE_TAIL_LINES:]))
+        return False
+    logging.info("%s finished, output in %s", script_path.name, run_log.path)
+    return True
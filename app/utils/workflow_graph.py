@@ -0,0 +1,148 @@
+# app/utils/workflow_graph.py
+
+import logging
+from typing import Dict, List, Set
+
+# Used when a workflow declares dependencies but no 'max_parallel' limit.
+DEFAULT_MAX_PARALLEL = 4
+
+
+class WorkflowGraphError(ValueError):
+    """Raised when a workflow's step dependencies cannot be scheduled."""
+
+
+def has_dependency_data(workflow: dict) -> bool:
+    """True if the workflow declares per-step dependencies via an 'after' mapping."""
+    return isinstance(workflow.get('after'), dict)
+
+
+def get_max_parallel(workflow: dict) -> int:
+    """
+    Returns how many steps of the workflow may run at the same time.
+    Workflows without dependency data always run one step at a time.
+    """
+    if not has_dependency_data(workflow):
+        return 1
+    try:
+        return max(1, int(workflow.get('max_parallel', DEFAULT_MAX_PARALLEL)))
+    except (TypeError, ValueError):
+        logging.warning(f"Invalid max_parallel value {workflow.get('max_parallel')!r}; using {DEFAULT_MAX_PARALLEL}.")
+        return DEFAULT_MAX_PARALLEL
+
+
+def build_steps(workflow: dict) -> List[dict]:
+    """
+    Turns a workflow definition into a list of steps:
+        {'index': 0, 'id': 'default_apps', 'after': {1, 2}}
+    where 'after' holds the indexes of the steps that must finish first.
+
+    A workflow may declare dependencies as
+        'after': {'install_office': ['default_apps'], ...}
+    keyed by script ID. Steps not listed there have no dependencies. Workflows
+    without an 'after' mapping keep the old behaviour: each step waits for the
+    one listed before it.
+    """
+    script_ids = list(workflow.get('scripts', []))
+    if not has_dependency_data(workflow):
+        return [
+            {'index': i, 'id': script_id, 'after': {i - 1} if i else set()}
+            for i, script_id in enumerate(script_ids)
+        ]
+
+    positions: Dict[str, List[int]] = {}
+    for i, script_id in enumerate(script_ids):
+        positions.setdefault(script_id, []).append(i)
+
+    dependencies = workflow['after']
+    for script_id in dependencies:
+        if script_id not in positions:
+            raise WorkflowGraphError(f"Dependencies declared for '{script_id}', which is not a step of this workflow.")
+
+    steps = []
+    for i, script_id in enumerate(script_ids):
+        after: Set[int] = set()
+        for dep_id in dependencies.get(script_id, []):
+            if dep_id not in positions:
+                raise WorkflowGraphError(f"Step '{script_id}' depends on '{dep_id}', which is not a step of this workflow.")
+            if dep_id == script_id:
+                raise WorkflowGraphError(f"Step '{script_id}' cannot depend on itself.")
+            after.update(positions[dep_id])
+        steps.append({'index': i, 'id': script_id, 'after': after})
+
+    _check_for_cycles(steps)
+    return steps
+
+
+def _check_for_cycles(steps: List[dict]):
+    """Raises WorkflowGraphError if the dependencies contain a cycle (Kahn's algorithm)."""
+    remaining = {step['index']: set(step['after']) for step in steps}
+    ready = [index for index, deps in remaining.items() if not deps]
+    resolved = 0
+    while ready:
+        done = ready.pop()
+        resolved += 1
+        for index, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(index)
+    if resolved != len(steps):
+        cyclic = sorted({steps[i]['id'] for i, deps in remaining.items() if deps})
+        raise WorkflowGraphError(f"Workflow dependencies contain a cycle involving: {', '.join(cyclic)}")
+
+
+class WorkflowSchedule:
+    """
+    Tracks which steps of a workflow are pending, running and finished, and
+    hands out the steps whose dependencies have all finished, up to the
+    concurrency limit. Steps are handed out in their listed order.
+    """
+    def __init__(self, steps: List[dict], max_parallel: int = 1):
+        self.steps = steps
+        self.max_parallel = max(1, max_parallel)
+        self.pending = [step['index'] for step in steps]
+        self.running: Set[int] = set()
+        self.finished: Dict[int, bool] = {}
+        self.stopped = False
+
+    def start_ready(self) -> List[dict]:
+        """Marks the steps that can start now as running and returns them."""
+        started = []
+        if self.stopped:
+            return started
+        for index in list(self.pending):
+            if len(self.running) >= self.max_parallel:
+                break
+            if self.steps[index]['after'].issubset(self.finished):
+                self.pending.remove(index)
+                self.running.add(index)
+                started.append(self.steps[index])
+        return started
+
+    def mark_finished(self, index: int, success: bool):
+        self.running.discard(index)
+        self.finished[index] = success
+
+    def stop(self):
+        """Stops handing out new steps; steps already running are left to finish."""
+        self.stopped = True
+
+    def is_done(self) -> bool:
+        return not self.running and (self.stopped or not self.pending)
+
+    def all_succeeded(self) -> bool:
+        return not self.pending and all(self.finished.values())
+
+
+class OutputPrefixer:
+    """Prefixes every output line of a parallel step so interleaved steps can be told apart."""
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.at_line_start = True
+
+    def __call__(self, text):
+        prefixed = []
+        for line in text.splitlines(keepends=True):
+            prefixed.append(self.prefix + line if self.at_line_start else line)
+            self.at_line_start = line.endswith("\n")
+        return "".join(prefixed)
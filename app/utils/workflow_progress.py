@@ -0,0 +1,100 @@
+# app/utils/workflow_progress.py
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Weight of the newest run in the rolling (exponentially weighted) average
+SMOOTHING = 0.3
+# Successful runs per script used to seed the average
+HISTORY_RUNS = 20
+# A running step never counts as more than this fraction done, so overruns don't show 100%
+MAX_RUNNING_FRACTION = 0.95
+
+
+class DurationEstimator:
+    """
+    Rolling average of how long each script takes, seeded from the run history.
+
+    Nothing is read at construction: the first estimate() call for a set of
+    scripts loads just their recent successful durations in one query, and
+    the averages are then kept up to date in memory with add_sample().
+    """
+    def __init__(self, history=None, smoothing: float = SMOOTHING):
+        self.history = history
+        self.smoothing = smoothing
+        self._averages: Dict[str, Optional[float]] = {}
+
+    def load(self, script_ids: Iterable[str]):
+        missing = [sid for sid in set(script_ids) if sid not in self._averages]
+        if not missing:
+            return
+        durations = self.history.recent_durations(missing, HISTORY_RUNS) if self.history is not None else {}
+        for script_id in missing:
+            average = None
+            for duration in durations.get(script_id, []):  # oldest first
+                average = duration if average is None else average + self.smoothing * (duration - average)
+            self._averages[script_id] = average
+
+    def estimate(self, script_id: str) -> Optional[float]:
+        """Expected duration in seconds, or None when the script has never completed."""
+        self.load([script_id])
+        return self._averages[script_id]
+
+    def add_sample(self, script_id: str, duration: float):
+        average = self.estimate(script_id)
+        self._averages[script_id] = duration if average is None else average + self.smoothing * (duration - average)
+
+
+class WorkflowProgress:
+    """
+    Estimates how far a workflow has got and how long is left from the expected
+    duration of each step. Steps without history are assumed to take as long as
+    the average known step; if no step has history, progress falls back to the
+    share of finished steps and no ETA is given.
+    """
+    def __init__(self, steps: List[dict], estimator: DurationEstimator, max_parallel: int = 1):
+        self.max_parallel = max(1, max_parallel)
+        estimator.load(step['id'] for step in steps)
+        known = {step['index']: estimator.estimate(step['id']) for step in steps}
+        known_values = [value for value in known.values() if value is not None]
+        self.has_estimates = bool(known_values)
+        fallback = sum(known_values) / len(known_values) if known_values else 1.0
+        self.expected = {index: (value if value is not None else fallback) for index, value in known.items()}
+        self.total = sum(self.expected.values()) or 1.0
+        self.started: Dict[int, float] = {}
+        self.finished = set()
+
+    def step_started(self, index: int):
+        self.started[index] = time.monotonic()
+
+    def step_finished(self, index: int):
+        self.started.pop(index, None)
+        self.finished.add(index)
+
+    def snapshot(self) -> Tuple[int, Optional[float]]:
+        """Returns (percent done, estimated seconds left or None)."""
+        if not self.has_estimates:
+            return int(100 * len(self.finished) / len(self.expected)) if self.expected else 100, None
+
+        now = time.monotonic()
+        done = sum(self.expected[index] for index in self.finished)
+        remaining = 0.0
+        for index, started in self.started.items():
+            elapsed = min(now - started, self.expected[index] * MAX_RUNNING_FRACTION)
+            done += elapsed
+            remaining += max(self.expected[index] - (now - started), 0.0)
+        pending = [self.expected[index] for index in self.expected
+                   if index not in self.finished and index not in self.started]
+        # Steps that run side by side overlap, so spread the remaining work across the parallel slots
+        remaining = (remaining + sum(pending)) / self.max_parallel
+        return min(99, int(100 * done / self.total)), remaining
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds < 60:
+        return "less than a minute"
+    minutes = (seconds + 59) // 60
+    if minutes < 60:
+        return f"about {minutes} min"
+    return f"about {minutes // 60} h {minutes % 60:02d} min"
@@ -0,0 +1,196 @@
+# app/utils/workflow_runner.py
+
+import logging
+import time
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from app.utils.execution_engine import script_timeouts
+from app.utils.resource_limits import script_limits
+from app.utils.result_cache import format_cached_step
+from app.utils.script_runner import ScriptRunner
+from app.utils.workflow_graph import OutputPrefixer, WorkflowSchedule
+from app.utils.workflow_progress import DurationEstimator, WorkflowProgress
+
+
+class WorkflowRunner(QObject):
+    """
+    Runs the steps of a workflow by chaining each ScriptRunner's finished signal
+    to the scheduling of the next ready steps, so the GUI thread stays idle in
+    its event loop while scripts are running.
+
+    When a step fails the runner pauses and emits step_failed; call resume()
+    with True to carry on with the remaining steps or False to stop. cancel()
+    stops the running steps and doesn't start any more.
+
+    While running, progress_changed reports the estimated percentage done and
+    seconds left (-1 when there is no history to estimate from) once a second.
+
+    With a result_cache.ResultCache, steps that already succeeded recently with
+    the same cache key are reported as cached and skipped.
+    """
+    PROGRESS_INTERVAL_MS = 1000
+
+    output_ready = pyqtSignal(str)
+    step_started = pyqtSignal(int, str)
+    step_finished = pyqtSignal(int, bool, dict)  # index, success, timing stats
+    step_failed = pyqtSignal(int, str)
+    progress_changed = pyqtSignal(int, float)  # percent, seconds left or -1
+    finished = pyqtSignal(bool)
+
+    def __init__(self, steps, scripts_by_id, script_dir, password, max_parallel=1, history=None, workflow_id=None,
+                 estimator=None, cache=None, parent=None):
+        super().__init__(parent)
+        self.steps = steps
+        self.scripts_by_id = scripts_by_id
+        self.script_dir = script_dir
+        self.password = password
+        self.history = history
+        self.workflow_id = workflow_id
+        self.estimator = estimator or DurationEstimator(history)
+        self.cache = cache
+        self.progress = None
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(self.PROGRESS_INTERVAL_MS)
+        self.progress_timer.timeout.connect(self._emit_progress)
+        self.schedule = WorkflowSchedule(steps, max_parallel)
+        self.is_parallel = self.schedule.max_parallel > 1
+        self.active_runners = {}
+        self.step_stats = {}
+        self._paused = False
+        self._done = False
+
+    def start(self):
+        self.progress = WorkflowProgress(self.steps, self.estimator, self.schedule.max_parallel)
+        self._emit_progress()
+        self.progress_timer.start()
+        self._schedule_ready_steps()
+
+    def resume(self, continue_workflow):
+        """Continues after a failed step, or stops launching new steps."""
+        self._paused = False
+        if not continue_workflow:
+            self.schedule.stop()
+        self._schedule_ready_steps()
+
+    def cancel(self):
+        self.schedule.stop()
+        for runner, *_ in self.active_runners.values():
+            runner.cancel()
+        self._schedule_ready_steps()
+
+    def _schedule_ready_steps(self):
+        # Steps that finish without running (a missing file or a cached result) are finished
+        # once the loop has started the other ready steps, so that finishing one doesn't
+        # schedule more steps from inside the loop, and a stop after a failure is seen here
+        while not self._paused:
+            finished_now = []
+            for step in self.schedule.start_ready():
+                result = self._start_step(step)
+                if result is not None:
+                    finished_now.append(result)
+            if not finished_now:
+                break
+            for result in finished_now:
+                self._finish_step(*result)
+        if self.schedule.is_done() and not self._done:
+            self._done = True
+            self.progress_timer.stop()
+            self._log_timing_summary()
+            self.finished.emit(self.schedule.all_succeeded())
+
+    def _start_step(self, step):
+        """Starts a step, or returns the arguments for _finish_step() if it finished without running."""
+        index = step['index']
+        script_info = self.scripts_by_id(step['id'])
+        if not script_info:
+            error_msg = f"Workflow aborted: Script with ID '{step['id']}' not found."
+            logging.error(error_msg)
+            self.output_ready.emit(f"\n--- ERROR ---\n{error_msg}\n")
+            self.schedule.mark_finished(index, False)
+            self.schedule.stop()
+            return
+
+        self.step_started.emit(index, script_info['name'])
+        self.output_ready.emit(f"\n--- Starting Step {index+1}/{len(self.steps)}: {script_info['name']} ---\n")
+
+        # CORRECTED PATH: Use SCRIPT_DIR, not APP_DIR
+        script_path = self.script_dir / script_info['path']
+        if not script_path.exists():
+            self.output_ready.emit(f"ERROR: Script file not found: {script_path}\n")
+            return index, script_info, False, {'wall': 0.0, 'cpu': 0.0, 'child_cpu': 0.0}
+
+        cache_key = self.cache.key(script_info) if self.cache else None
+        cached_at = self.cache.cached_success(cache_key) if self.cache else None
+        if cached_at is not None:
+            self.output_ready.emit(format_cached_step(cached_at))
+            return index, script_info, True, {'wall': 0.0, 'cpu': 0.0, 'cached': True}
+
+        timeout, grace_period = script_timeouts(script_info)
+        runner = ScriptRunner(str(script_path), self.password, script_info.get('needs_sudo', False), timeout, grace_period,
+                              script_limits(script_info), script_info.get('ephemeral', False))
+        if self.is_parallel:
+            runner.output_ready.connect(lambda text, p=OutputPrefixer(f"[{script_info['name']}] "): self.output_ready.emit(p(text)))
+        else:
+            runner.output_ready.connect(self.output_ready.emit)
+        runner.finished.connect(lambda success, i=index: self._on_runner_finished(i, success))
+
+        started = {'wall': time.monotonic(), 'cpu': time.process_time()}
+        self.active_runners[index] = (runner, script_info, started, cache_key)
+        self.progress.step_started(index)
+        runner.start()
+
+    def _on_runner_finished(self, index, success):
+        runner, script_info, started, cache_key = self.active_runners.pop(index)
+        # The QThread may still be unwinding its event loop; wait for it before dropping it.
+        runner.wait()
+        stats = {
+            'wall': time.monotonic() - started['wall'],
+            'cpu': time.process_time() - started['cpu'],
+            # The script's own usage, from when it was reaped, so it is exact for parallel steps too
+            'child_cpu': runner.usage.cpu if runner.usage else None,
+            'max_rss_kb': runner.usage.max_rss_kb if runner.usage else None,
+        }
+        if success:
+            self.estimator.add_sample(script_info['id'], stats['wall'])
+        if self.history is not None:
+            self.history.record_run(script_info['id'], runner.started_at, runner.finished_at, runner.exit_code,
+                                    runner.needs_sudo, runner.output_bytes, self.workflow_id, runner.usage, cache_key)
+        self._finish_step(index, script_info, success, stats)
+        self._schedule_ready_steps()
+
+    def _finish_step(self, index, script_info, success, stats):
+        self.schedule.mark_finished(index, success)
+        self.progress.step_finished(index)
+        self._emit_progress()
+        self.step_stats[index] = dict(stats, name=script_info['name'], success=success)
+        self.output_ready.emit(f"--- Step {index+1} {'Succeeded' if success else 'Failed'} ({format_step_stats(stats)}) ---\n")
+        logging.info(f"Workflow step '{script_info['id']}' {'succeeded' if success else 'failed'}: {format_step_stats(stats)}")
+        self.step_finished.emit(index, success, stats)
+
+        if not success and not self.schedule.stopped:
+            self._paused = True
+            self.step_failed.emit(index, script_info['name'])
+
+    def _emit_progress(self):
+        percent, seconds_left = self.progress.snapshot()
+        self.progress_changed.emit(percent, -1.0 if seconds_left is None else seconds_left)
+
+    def _log_timing_summary(self):
+        if not self.step_stats:
+            return
+        lines = ["\n--- Step Timings ---\n"]
+        for index in sorted(self.step_stats):
+            stats = self.step_stats[index]
+            lines.append(f"{index+1}. {stats['name']}: {format_step_stats(stats)}\n")
+        self.output_ready.emit("".join(lines))
+
+
+def format_step_stats(stats):
+    if stats.get('cached'):
+        return "cached"
+    text = f"wall {stats['wall']:.2f}s, app CPU {stats['cpu']:.2f}s"
+    if stats.get('child_cpu') is not None:
+        text += f", script CPU {stats['child_cpu']:.2f}s"
+    if stats.get('max_rss_kb') is not None:
+        text += f", max RSS {stats['max_rss_kb'] / 1024:.1f} MB"
+    return text
@@ -0,0 +1,70 @@
+# benchmarks/common.py
+"""Helpers shared by the benchmarks."""
+
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Regressions smaller than these are treated as noise, however large in relative terms
+MIN_TIME_REGRESSION_MS = 0.5
+MIN_MEMORY_REGRESSION_KB = 256
+
+
+def isolate_home() -> Path:
+    """
+    Points HOME at a new temporary directory, so the settings module's log and
+    data directories, the config store and the run history are throwaway, and
+    makes Qt use its offscreen platform. Call it before importing app.config.
+    """
+    home = Path(tempfile.mkdtemp(prefix="sw-bench-"))
+    os.environ['HOME'] = str(home)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return home
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Times `repeat` calls of fn after `warmup` untimed ones, then traces the Python memory peak of one more call."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median_ms': statistics.median(timings) * 1000, 'min_ms': min(timings) * 1000, 'peak_kb': peak / 1024}
+
+
+def save_results(path: Path, results: dict):
+    Path(path).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+
+
+def compare_with_baseline(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Returns a line for each case whose fastest time or memory peak grew by more
+    than `threshold` (e.g. 1.25 for 25%) over the baseline's. The fastest time
+    is compared rather than the median, as it is the least affected by other
+    load on the machine. Cases missing from either side are ignored.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key, unit, floor in (('min_ms', 'ms', MIN_TIME_REGRESSION_MS), ('peak_kb', 'KB', MIN_MEMORY_REGRESSION_KB)):
+            if key not in result or not base.get(key):
+                continue
+            if result[key] > base[key] * threshold and result[key] - base[key] > floor:
+                regressions.append(f"{name}: {key} {base[key]:.2f} -> {result[key]:.2f} {unit} "
+                                   f"({result[key] / base[key]:.2f}x, limit {threshold:.2f}x)")
+    return regressions
@@ -0,0 +1,239 @@
+# benchmarks/gui_bench.py
+"""
+Times the GUI's hot paths on synthetic catalogues of scripts and workflows,
+under Qt's offscreen platform and with a throwaway HOME:
+
+    python -m benchmarks.gui_bench --output results.json
+    python -m benchmarks.gui_bench --baseline results.json --threshold 1.5
+
+Each case records its median and fastest time and the peak of Python memory
+allocated during one call (tracemalloc; Qt's own allocations are not seen).
+With --baseline, exits with 1 if a case's fastest time or memory peak grew
+past the threshold, and with 2 if the baseline has none of the cases run.
+Timings vary by tens of percent between runs on a busy machine, so compare
+with a baseline from the same machine.
+"""
+
+import argparse
+import json
+import random
+import resource
+import sys
+
+from benchmarks.common import compare_with_baseline, isolate_home, measure, save_results
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_WORKFLOWS = 1000
+CATEGORIES = ("Tools", "Software", "Configuration", "Uninstall")
+WORDS = ("install", "office", "teams", "vpn", "printer", "firewall", "gatekeeper", "chrome", "zoom", "slack",
+         "update", "cleanup", "cache", "dock", "defaults", "profile", "network", "wifi", "bluetooth", "backup")
+# Typing a query, then a new one that matches nothing, then clearing the search
+QUERIES = ("i", "in", "install", "install off", "vpn", "zzz", "")
+
+
+def make_catalogue(script_count: int, workflow_count: int, seed: int = 0):
+    """Returns (scripts, workflows) in the settings format, the same for the same arguments."""
+    rng = random.Random(seed)
+    scripts = []
+    for i in range(script_count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        words = rng.sample(WORDS, 3)
+        scripts.append({
+            'id': f"{category.lower()}_{words[0]}_{i}",
+            'name': f"{' '.join(words).title()} {i}",
+            'path': f"{category.lower()}_{i}.sh",
+            'description': f"Synthetic {category.lower()} script {i}: {' '.join(rng.sample(WORDS, 6))}.",
+            'category': category,
+            'needs_sudo': i % 3 == 0,
+            'tags': rng.sample(WORDS, 2),
+        })
+    # Link each software script to the uninstaller that follows it, as real catalogues do
+    for i in range(1, script_count - 1, len(CATEGORIES)):
+        scripts[i]['uninstall_id'] = scripts[i + 2]['id']
+
+    workflows = {}
+    for i in range(workflow_count):
+        steps = rng.sample(scripts, min(len(scripts), rng.randint(3, 15)))
+        workflows[f"workflow_{i}"] = {
+            'name': f"Workflow {i}",
+            'description': f"Synthetic workflow {i} with {len(steps)} steps.",
+            'scripts': [script['id'] for script in steps],
+        }
+    return scripts, workflows
+
+
+def edited_versions(scripts, workflows):
+    """
+    Returns copies of the catalogue before and after an edit: a script and a
+    workflow changed, and one of each added.
+    """
+    versions = []
+    for edited in (False, True):
+        version_scripts, version_workflows = json.loads(json.dumps([scripts, workflows]))
+        if edited:
+            version_scripts[0]['description'] += " (edited)"
+            next(iter(version_workflows.values()))['description'] += " (edited)"
+            version_scripts.append(dict(version_scripts[0], id="added_script", name="Added Script",
+                                        path="added_script.sh"))
+            version_workflows['added_workflow'] = dict(next(iter(version_workflows.values())), name="Added Workflow")
+        versions.append((version_scripts, version_workflows))
+    return versions
+
+
+def cycle(values):
+    """A function returning the next of `values` on each call, round and round."""
+    state = {'next': 0}
+
+    def next_value():
+        value = values[state['next'] % len(values)]
+        state['next'] += 1
+        return value
+    return next_value
+
+
+def main_window_class():
+    """
+    MainWindow without the login prompts, the privileged helper, the shell pool
+    and the file watching. Import it after isolate_home().
+    """
+    from app.gui.main_window import MainWindow
+
+    class BenchMainWindow(MainWindow):
+        def authenticate(self):
+            return True
+
+        def authenticate_system_password(self):
+            self.system_password = None
+            return True
+
+        def start_privileged_helper(self):
+            pass
+
+        def prewarm_shell_pool(self):
+            pass
+
+        def perform_script_audit(self):
+            pass
+
+        def start_file_watcher(self):
+            pass
+
+    return BenchMainWindow
+
+
+def run_cases(sizes, workflow_count: int, repeat: int) -> dict:
+    from PyQt6.QtWidgets import QApplication
+    from app.config import settings
+    from app.gui.settings_window import SettingsWindow
+    from app.utils import config_manager
+    from app.utils.config_store import get_store
+    from app.utils.script_registry import ScriptRegistry
+
+    BenchMainWindow = main_window_class()
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    store = get_store()
+    results = {}
+
+    def record(name, fn):
+        results[name] = measure(fn, repeat)
+        print(f"{name:<48} median {results[name]['median_ms']:9.2f} ms   min {results[name]['min_ms']:9.2f} ms   "
+              f"peak {results[name]['peak_kb']:9.1f} KB", flush=True)
+
+    for size in sizes:
+        scripts, workflows = make_catalogue(size, workflow_count)
+        store.update({'scripts': scripts, 'workflows': workflows})
+        versions = edited_versions(scripts, workflows)
+
+        window = BenchMainWindow()
+        # The config benchmarks below would otherwise also time the window's refresh
+        store.unsubscribe(window.on_config_changed)
+
+        # Switch between the two versions on every call, so each refresh has rows to update
+        registries = [ScriptRegistry(version_scripts) for version_scripts, _ in versions]
+        next_registry = cycle(registries)
+
+        def populate_script_tabs():
+            window.script_registry = next_registry()
+            window.populate_script_tabs()
+        record(f"populate_script_tabs[{size}]", populate_script_tabs)
+        window.script_registry = registries[0]
+        window.populate_script_tabs()
+
+        def filter_scripts():
+            # All the queries in one call, since their costs differ a lot
+            for query in QUERIES:
+                window.search_bar.setText(query)
+                window.filter_scripts()
+        record(f"filter_scripts[{size}]", filter_scripts)
+
+        next_workflows = cycle([version_workflows for _, version_workflows in versions])
+
+        def setup_workflow_buttons():
+            settings.WORKFLOWS = next_workflows()
+            window.setup_workflow_buttons()
+        record(f"setup_workflow_buttons[{size},{workflow_count}]", setup_workflow_buttons)
+        settings.WORKFLOWS = versions[0][1]
+        window.setup_workflow_buttons()
+
+        dialog = SettingsWindow(window)
+        next_row = cycle(range(dialog.workflow_list_widget.count()))
+
+        def workflow_selection_changed():
+            dialog.workflow_list_widget.blockSignals(True)
+            dialog.workflow_list_widget.setCurrentRow(next_row())
+            dialog.workflow_list_widget.blockSignals(False)
+            dialog.workflow_selection_changed()
+        record(f"workflow_selection_changed[{size},{workflow_count}]", workflow_selection_changed)
+
+        general = store.get('general')
+        # Alternate between the two versions so every save has changes to write
+        next_version = cycle(versions)
+        record(f"save_config[{size},{workflow_count}]", lambda: config_manager.save_config(dict(general), *next_version()))
+        record(f"load_config[{size},{workflow_count}]", config_manager.load_config)
+
+        # Not close(): closeEvent asks for confirmation and runs the exit script
+        dialog.deleteLater()
+        window.deleteLater()
+        app.processEvents()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated script catalogue sizes (default: %(default)s).")
+    parser.add_argument('--workflows', type=int, default=DEFAULT_WORKFLOWS, help="Workflows per catalogue (default: %(default)s).")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed calls per case (default: %(default)s).")
+    parser.add_argument('--output', metavar="FILE", help="Save the results as JSON, e.g. to use as a baseline.")
+    parser.add_argument('--baseline', metavar="FILE", help="Compare with the results saved in FILE.")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="Fail when a case is this many times slower or bigger than the baseline (default: %(default)s).")
+    args = parser.parse_args()
+
+    home = isolate_home()
+    print(f"Using the throwaway home {home}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run_cases(sizes, args.workflows, args.repeat)
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Process max RSS: {max_rss // 1024 if sys.platform == 'darwin' else max_rss} KB")
+
+    if args.output:
+        save_results(args.output, results)
+        print(f"Saved the results to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not results.keys() & baseline.keys():
+            print(f"{args.baseline} has none of these cases; run with the same --sizes and --workflows")
+            return 2
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,352 @@
+# benchmarks/load_test.py
+"""
+Load test of the script execution path, with synthetic scripts and a fake
+sudo, so nothing gets installed and no root is needed:
+
+    python -m benchmarks.load_test --steps 1000 --parallel 4
+    python -m benchmarks.load_test --steps 200 --output-bytes 1000000
+    python -m benchmarks.load_test --steps 100 --fail-every 10 --hang-every 25 --sudo-every 3 --helper
+    python -m benchmarks.load_test --mode sudo-utils --steps 200 --sudo-every 2
+
+In the default workflow mode, a workflow of --steps synthetic scripts is run
+with MainWindow.run_multiple_scripts under Qt's offscreen platform: through
+WorkflowRunner and ScriptRunner to the output dialog, which is closed as soon
+as the workflow ends. Failed steps are continued past. The sudo-utils mode
+runs the scripts one after another with sudo_utils.run_script_no_sudo and
+run_script_as_sudo.
+
+Each synthetic script prints a marker line, then --output-bytes of output in
+100-byte lines (at --output-rate bytes/s, or as fast as it can with 0), sleeps
+for the rest of --runtime and exits with 0. Every --fail-every'th step exits
+with --fail-code instead, and every --hang-every'th ignores SIGTERM and hangs
+until its --hang-timeout stops it.
+
+Sudo steps go through a fake sudo put first on PATH, which checks the password
+from stdin and runs the command as the current user. When running as root the
+app doesn't use sudo, so sudo steps run directly. With --helper the privileged
+helper is started through the fake sudo, as the GUI does.
+
+Reported: steps/s; output MB/s reaching the output dialog; the delay from a
+step finishing to the next one starting (dispatch) and from a step starting to
+its first line reaching the dialog; and the process memory as the run goes on.
+"""
+
+import argparse
+import gc
+import os
+import re
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import isolate_home, save_results
+
+MARKER = "sw-load-step"
+_MARKER_RE = re.compile(MARKER + r" (\d+)")
+LINE_BYTES = 100
+# Lines printed between sleeps when the output rate is limited
+CHUNK_LINES = 40
+FAKE_PASSWORD = "load-test"
+# Memory samples taken over a run
+MEMORY_SAMPLES = 10
+
+FAKE_SUDO = r"""#!/bin/bash
+# Fake sudo for benchmarks/load_test.py: checks the password from stdin (-S)
+# against $SW_FAKE_SUDO_PASSWORD and runs the command as the current user.
+from_stdin=
+validate=
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -S) from_stdin=1; shift ;;
+        -p|-u) shift 2 ;;
+        -v) validate=1; shift ;;
+        --) shift; break ;;
+        -*) shift ;;
+        *) break ;;
+    esac
+done
+if [ -n "$from_stdin" ]; then
+    IFS= read -r password
+    if [ "$password" != "$SW_FAKE_SUDO_PASSWORD" ]; then
+        echo "Sorry, try again." >&2
+        exit 1
+    fi
+fi
+[ -n "$validate" ] && exit 0
+exec "$@"
+"""
+
+
+def install_fake_sudo(home: Path):
+    """Puts the fake sudo first on PATH, for this process and the scripts it starts."""
+    bin_dir = home / "bin"
+    bin_dir.mkdir()
+    sudo = bin_dir / "sudo"
+    sudo.write_text(FAKE_SUDO)
+    sudo.chmod(0o755)
+    os.environ['PATH'] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ['SW_FAKE_SUDO_PASSWORD'] = FAKE_PASSWORD
+
+
+def _every(n: int, index: int) -> bool:
+    return bool(n) and (index + 1) % n == 0
+
+
+def script_body(index: int, args, hang: bool, exit_code: int) -> str:
+    lines = ["#!/bin/bash", f"echo '{MARKER} {index}'"]
+    if hang:
+        # The sleeps die on SIGTERM, the loop doesn't, so it takes the SIGKILL after the grace period
+        lines += ["trap '' TERM", "while :; do sleep 1; done"]
+        return "\n".join(lines) + "\n"
+
+    line_count = args.output_bytes // LINE_BYTES
+    output_time = 0.0
+    if line_count:
+        lines.append(f"line={'x' * (LINE_BYTES - 1)}")
+        if args.output_rate > 0:
+            chunks = -(-line_count // CHUNK_LINES)
+            pause = CHUNK_LINES * LINE_BYTES / args.output_rate
+            output_time = chunks * pause
+            lines.append(f'for ((c = 0; c < {chunks}; c++)); do yes "$line" | head -n {CHUNK_LINES}; sleep {pause:.4f}; done')
+        else:
+            lines.append(f'yes "$line" | head -n {line_count}')
+    if args.runtime > output_time:
+        lines.append(f"sleep {args.runtime - output_time:.3f}")
+    lines.append(f"exit {exit_code}")
+    return "\n".join(lines) + "\n"
+
+
+def make_scripts(script_dir: Path, args):
+    """Writes the synthetic scripts and returns their definitions and the workflow running them all."""
+    script_dir.mkdir(parents=True, exist_ok=True)
+    scripts = []
+    for index in range(args.steps):
+        hang = _every(args.hang_every, index)
+        exit_code = args.fail_code if _every(args.fail_every, index) and not hang else 0
+        name = f"load_{index:05d}.sh"
+        (script_dir / name).write_text(script_body(index, args, hang, exit_code))
+        script = {'id': f"load_{index:05d}", 'name': f"Load Step {index}", 'path': name, 'category': 'Tools',
+                  'description': "Synthetic load test script.", 'needs_sudo': _every(args.sudo_every, index)}
+        if hang:
+            script.update(timeout=args.hang_timeout, grace_period=1)
+        scripts.append(script)
+
+    workflow = {'name': "Load Test", 'description': f"{args.steps} synthetic steps.",
+                'scripts': [script['id'] for script in scripts]}
+    if args.parallel > 1:
+        workflow.update(after={}, max_parallel=args.parallel)
+    return scripts, workflow
+
+
+def rss_kb() -> int:
+    """The current resident set size where /proc has it, otherwise the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+class Recorder:
+    """Collects the timings, output volume and memory samples of a run."""
+    def __init__(self, steps: int):
+        self.sample_every = max(1, steps // MEMORY_SAMPLES)
+        self.started_at = None
+        self.ended_at = None
+        self.step_started = {}
+        self.first_output = {}
+        self.dispatch = []
+        self.last_finished = None
+        self.finished = 0
+        self.failed = 0
+        self.sink_bytes = 0
+        self.memory = []
+
+    def start(self):
+        self.sample_memory()
+        self.started_at = time.perf_counter()
+
+    def end(self):
+        self.ended_at = time.perf_counter()
+        self.sample_memory()
+
+    def sample_memory(self):
+        self.memory.append({'steps': self.finished, 'rss_kb': rss_kb(), 'objects': len(gc.get_objects())})
+
+    def on_started(self, index, name):
+        now = time.perf_counter()
+        self.step_started[index] = now
+        self.dispatch.append(now - (self.last_finished if self.last_finished is not None else self.started_at))
+
+    def on_finished(self, index, success, stats=None):
+        self.last_finished = time.perf_counter()
+        self.finished += 1
+        self.failed += not success
+        if self.finished % self.sample_every == 0:
+            self.sample_memory()
+
+    def on_output(self, text):
+        now = time.perf_counter()
+        self.sink_bytes += len(text.encode())
+        if MARKER in text:
+            for match in _MARKER_RE.finditer(text):
+                self.first_output.setdefault(int(match.group(1)), now)
+
+    def results(self) -> dict:
+        wall = self.ended_at - self.started_at
+        first_output = [self.first_output[i] - started for i, started in self.step_started.items() if i in self.first_output]
+        return {
+            'steps': self.finished,
+            'failed': self.failed,
+            'wall_s': wall,
+            'steps_per_s': self.finished / wall if wall else None,
+            'sink_mb_per_s': self.sink_bytes / wall / 1e6 if wall and self.sink_bytes else None,
+            'sink_bytes': self.sink_bytes,
+            'dispatch_ms': _distribution(self.dispatch),
+            'first_output_ms': _distribution(first_output),
+            'memory': self.memory,
+            'rss_growth_kb': self.memory[-1]['rss_kb'] - self.memory[0]['rss_kb'],
+        }
+
+
+def _distribution(seconds: list) -> dict:
+    if not seconds:
+        return {}
+    values = sorted(seconds)
+    return {'p50': statistics.median(values) * 1000, 'p95': values[max(0, int(len(values) * 0.95) - 1)] * 1000,
+            'max': values[-1] * 1000}
+
+
+def run_workflow(args, scripts, workflow, recorder: Recorder):
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    import app.gui.script_output_dialog as script_output_dialog
+    import app.utils.workflow_runner as workflow_runner
+    from app.utils.config_store import get_store
+    from app.utils.privileged_helper import stop_helper
+    from app.utils.workflow_graph import build_steps
+    from benchmarks.gui_bench import main_window_class
+
+    class SinkDialog(script_output_dialog.ScriptOutputDialog):
+        """The output dialog, recording what reaches it, closed as soon as the workflow ends."""
+        def append_output(self, text):
+            recorder.on_output(text)
+            super().append_output(text)
+
+        def mark_as_finished(self, success):
+            super().mark_as_finished(success)
+            QTimer.singleShot(0, self.accept)
+
+    class RecordingWorkflowRunner(workflow_runner.WorkflowRunner):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.step_started.connect(recorder.on_started)
+            self.step_finished.connect(recorder.on_finished)
+
+    class LoadTestMainWindow(main_window_class()):
+        def authenticate_system_password(self):
+            self.system_password = FAKE_PASSWORD
+            return True
+
+        def start_privileged_helper(self):
+            if args.helper:
+                super().start_privileged_helper()
+
+        def confirm_continue_workflow(self, script_name):
+            return True
+
+    # run_multiple_scripts imports these when called
+    script_output_dialog.ScriptOutputDialog = SinkDialog
+    workflow_runner.WorkflowRunner = RecordingWorkflowRunner
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    get_store().update({'scripts': scripts, 'workflows': {'load_test': workflow}})
+    window = LoadTestMainWindow()
+    try:
+        recorder.start()
+        window.run_multiple_scripts(workflow, build_steps(workflow), 'load_test')
+        recorder.end()
+    finally:
+        stop_helper()
+    window.deleteLater()
+    app.processEvents()
+
+
+def run_sudo_utils(scripts, script_dir: Path, recorder: Recorder):
+    from app.utils import sudo_utils
+
+    if not sudo_utils.check_sudo_password(FAKE_PASSWORD):
+        print("WARNING: check_sudo_password rejected the fake sudo's password")
+    recorder.start()
+    for index, script in enumerate(scripts):
+        recorder.on_started(index, script['name'])
+        path = script_dir / script['path']
+        if script['needs_sudo']:
+            success = sudo_utils.run_script_as_sudo(path, FAKE_PASSWORD)
+        else:
+            success = sudo_utils.run_script_no_sudo(path)
+        recorder.on_finished(index, success)
+    recorder.end()
+
+
+def print_results(results: dict):
+    print(f"Steps:          {results['steps']} ({results['failed']} failed) in {results['wall_s']:.2f}s, "
+          f"{results['steps_per_s']:.1f} steps/s")
+    if results['sink_mb_per_s'] is not None:
+        print(f"Output:         {results['sink_bytes'] / 1e6:.1f} MB reached the output dialog, {results['sink_mb_per_s']:.2f} MB/s")
+    for label, key in (("Dispatch:", 'dispatch_ms'), ("First output:", 'first_output_ms')):
+        if results[key]:
+            print(f"{label:<15} p50 {results[key]['p50']:.2f} ms, p95 {results[key]['p95']:.2f} ms, max {results[key]['max']:.2f} ms")
+    print("Memory:         " + ", ".join(f"{sample['rss_kb'] / 1024:.1f} MB/{sample['objects']:,} objects after "
+                                         f"{sample['steps']} steps" for sample in results['memory'][::max(1, len(results['memory']) // 4)]))
+    print(f"RSS growth:     {results['rss_growth_kb'] / 1024:+.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=("workflow", "sudo-utils"), default="workflow")
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--parallel', type=int, default=1, help="Workflow steps run at the same time (default: %(default)s).")
+    parser.add_argument('--runtime', type=float, default=0.0, help="Seconds each script runs (default: %(default)s).")
+    parser.add_argument('--output-bytes', type=int, default=10000, help="Output per script (default: %(default)s).")
+    parser.add_argument('--output-rate', type=float, default=0.0,
+                        help="Output bytes per second per script; 0 prints it all at once (default: %(default)s).")
+    parser.add_argument('--fail-every', type=int, default=0, metavar="N", help="Make every Nth step fail.")
+    parser.add_argument('--fail-code', type=int, default=3, help="Exit code of failing steps (default: %(default)s).")
+    parser.add_argument('--hang-every', type=int, default=0, metavar="N", help="Make every Nth step hang until its timeout.")
+    parser.add_argument('--hang-timeout', type=float, default=2.0, help="Timeout of hanging steps (default: %(default)s).")
+    parser.add_argument('--sudo-every', type=int, default=0, metavar="N", help="Make every Nth step a sudo step.")
+    parser.add_argument('--helper', action="store_true", help="Run sudo steps through the privileged helper.")
+    parser.add_argument('--output', metavar="FILE", help="Save the results as JSON.")
+    args = parser.parse_args()
+    if args.mode == "sudo-utils" and args.hang_every:
+        parser.error("sudo_utils runs scripts without a timeout, so --hang-every needs --mode workflow")
+
+    home = isolate_home()
+    install_fake_sudo(home)
+    print(f"Using the throwaway home {home}")
+    if os.geteuid() == 0:
+        print("Running as root: sudo steps run directly, without the fake sudo.")
+
+    from app.config import settings
+    settings.SCRIPT_DIR = home / "scripts"
+    scripts, workflow = make_scripts(settings.SCRIPT_DIR, args)
+    recorder = Recorder(args.steps)
+    if args.mode == "workflow":
+        run_workflow(args, scripts, workflow, recorder)
+    else:
+        run_sudo_utils(scripts, settings.SCRIPT_DIR, recorder)
+
+    results = dict(recorder.results(), mode=args.mode, options=vars(args))
+    print_results(results)
+    if args.output:
+        save_results(args.output, results)
+        print(f"Saved the results to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# benchmarks/script_loader_bench.py
+"""
+Per-step latency of running embedded scripts with ScriptLoader, against the
+old way of decrypting on every run and running a temporary file.
+
+    python -m benchmarks.script_loader_bench [--steps 200] [--scripts 10] [--size 4096]
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import subprocess
+import time
+
+from cryptography.fernet import Fernet
+
+from app.core.script_loader import ScriptLoader
+
+
+def make_scripts(fernet: Fernet, count: int, size: int) -> dict:
+    scripts = {}
+    for i in range(count):
+        body = f"echo step {i}\n" + ": " + "x" * max(0, size - 20) + "\nexit 0\n"
+        scripts[f"script_{i}"] = base64.b64encode(fernet.encrypt(body.encode())).decode()
+    return scripts
+
+
+def run_via_temp_file(loader: ScriptLoader, script_id: str) -> subprocess.CompletedProcess:
+    """The previous execute_secure_script: no cache, plaintext in $TMPDIR."""
+    loader.clear_cache()
+    script_content = loader.load_encrypted_script(script_id)
+    temp_path = os.path.join(os.getenv('TMPDIR', '/tmp'), f'{os.urandom(16).hex()}.sh')
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(script_content)
+        os.chmod(temp_path, 0o700)
+        return subprocess.run(['bash', temp_path], capture_output=True, text=True)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def time_steps(run, loader: ScriptLoader, script_ids: list, steps: int) -> list:
+    timings = []
+    for step in range(steps):
+        started = time.perf_counter()
+        result = run(loader, script_ids[step % len(script_ids)])
+        timings.append(time.perf_counter() - started)
+        assert result.returncode == 0, result.stderr
+    return timings
+
+
+def report(name: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<28} mean {statistics.mean(timings) * 1000:7.3f} ms   "
+          f"p50 {statistics.median(timings) * 1000:7.3f} ms   p95 {p95 * 1000:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--scripts', type=int, default=10, help="Distinct scripts, run in turn")
+    parser.add_argument('--size', type=int, default=4096, help="Bytes per script")
+    args = parser.parse_args()
+
+    key = Fernet.generate_key()
+    scripts = make_scripts(Fernet(key), args.scripts, args.size)
+    script_ids = list(scripts)
+    loader = ScriptLoader(scripts, key.decode())
+
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        loader.clear_cache()
+        loader.load_encrypted_script(script_ids[0])
+    decrypt = (time.perf_counter() - started) / args.steps
+    print(f"Decrypting one script: {decrypt * 1e6:.1f} us; from the cache: ", end="")
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        loader.load_encrypted_script(script_ids[0])
+    print(f"{(time.perf_counter() - started) / args.steps * 1e6:.2f} us")
+
+    modes = [("temp file, no cache", run_via_temp_file),
+             ("/dev/fd, cached", lambda loader, script_id: loader.execute_secure_script(script_id))]
+    for name, run in modes:
+        time_steps(run, loader, script_ids, min(20, args.steps))  # Warm up
+        report(name, time_steps(run, loader, script_ids, args.steps))
+
+    if hasattr(os, 'memfd_create'):
+        # The pipe that is used where there is no memfd, e.g. on macOS
+        memfd_create = os.memfd_create
+        del os.memfd_create
+        try:
+            report("/dev/fd pipe, cached", time_steps(modes[1][1], loader, script_ids, args.steps))
+        finally:
+            os.memfd_create = memfd_create
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# tests/test_script_registry.py
+
+import copy
+
+import pytest
+
+from app.utils.script_registry import ScriptRegistry
+
+SCRIPTS = [
+    {'id': 'office', 'name': "Office", 'path': "office.sh", 'category': "Software", 'uninstall_id': 'office_remove'},
+    {'id': 'vpn', 'name': "VPN", 'path': "vpn.sh", 'category': "Software"},
+    {'id': 'dock', 'name': "Dock", 'path': "dock.sh", 'category': "Configuration"},
+    {'id': 'office_remove', 'name': "Remove Office", 'path': "office_remove.sh", 'category': "Uninstall"},
+]
+
+
+def edited(edit):
+    scripts = copy.deepcopy(SCRIPTS)
+    edit(scripts)
+    return scripts
+
+
+def state(registry):
+    return (registry.ids(), {c: [s['id'] for s in registry.by_category(c)] for c in registry.categories()},
+            {s['id']: registry.uninstaller_for(s['id']) for s in registry}, registry.installers_for('office_remove'),
+            registry.script_files(), list(registry))
+
+
+EDITS = {
+    'unchanged': (lambda scripts: None, set()),
+    'changed': (lambda scripts: scripts[1].update(description="Connects"), {'vpn'}),
+    'added_in_the_middle': (lambda scripts: scripts.insert(1, {'id': 'zoom', 'name': "Zoom", 'path': "zoom.sh",
+                                                                'category': "Software"}), {'zoom'}),
+    'removed': (lambda scripts: scripts.pop(0), {'office'}),
+    'reordered': (lambda scripts: scripts.reverse(), set()),
+    'moved_category': (lambda scripts: scripts[2].update(category="Software"), {'dock'}),
+    'unlinked': (lambda scripts: scripts[0].pop('uninstall_id'), {'office'}),
+}
+
+
+@pytest.mark.parametrize("name", sorted(EDITS))
+def test_sync_matches_a_rebuild(name):
+    edit, expected_changes = EDITS[name]
+    new_scripts = edited(edit)
+    registry = ScriptRegistry(copy.deepcopy(SCRIPTS))
+    assert registry.sync(new_scripts) == expected_changes
+    assert state(registry) == state(ScriptRegistry(new_scripts))
@@ -0,0 +1,42 @@
+# tests/test_shell_pool.py
+
+import pytest
+
+from app.utils.execution_engine import run_command
+from app.utils.shell_pool import ShellPool
+
+SCRIPTS = {
+    'exit_code': "echo ok\nexit 3\n",
+    'exit_signal_status': "exit 143\n",
+    'kill_self': "echo before\nkill -TERM $$\necho after\n",
+    'kill_bashpid': "kill -TERM $BASHPID\n",
+    'script_name': 'echo "$0 ${BASH_SOURCE[0]} $#"\n',
+}
+
+
+@pytest.fixture
+def pool():
+    pool = ShellPool(1)
+    yield pool
+    pool.close()
+
+
+def run_both(pool, tmp_path, body):
+    script = tmp_path / "script.sh"
+    script.write_text(body)
+    pool_output, engine_output = [], []
+    pooled = pool.run(script, pool_output.append, timeout=10)
+    normal = run_command(["/bin/bash", str(script)], engine_output.append, timeout=10)
+    return (pooled.exit_code, "".join(pool_output)), (normal.exit_code, "".join(engine_output))
+
+
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_pool_run_matches_normal_run(pool, tmp_path, name):
+    pooled, normal = run_both(pool, tmp_path, SCRIPTS[name])
+    assert pooled == normal
+
+
+def test_kill_self_does_not_stop_the_worker(pool, tmp_path):
+    pooled, normal = run_both(pool, tmp_path, SCRIPTS['kill_self'])
+    assert pooled == normal == (-15, "before\n")
+    assert run_both(pool, tmp_path, "echo still here\n")[0] == (0, "still here\n")
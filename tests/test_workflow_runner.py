@@ -0,0 +1,76 @@
+# tests/test_workflow_runner.py
+
+import os
+import time
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from app.utils.workflow_graph import build_steps
+from app.utils.workflow_runner import WorkflowRunner
+
+
+class CachedSteps:
+    """A result cache in which the given script IDs already succeeded."""
+    def __init__(self, script_ids):
+        self.script_ids = set(script_ids)
+
+    def key(self, script_info):
+        return script_info['id']
+
+    def cached_success(self, key):
+        return time.time() if key in self.script_ids else None
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def run_workflow(app, tmp_path, workflow, scripts, cache):
+    for script in scripts.values():
+        if 'body' in script:
+            (tmp_path / script['path']).write_text(script['body'])
+    runner = WorkflowRunner(build_steps(workflow), scripts.get, tmp_path, None, workflow.get('max_parallel', 1),
+                            cache=cache)
+    started, results = [], []
+    runner.step_started.connect(lambda index, name: started.append(index))
+    runner.step_failed.connect(lambda index, name: runner.resume(False))  # The user declines to continue
+    loop = QEventLoop()
+    runner.finished.connect(results.append)
+    runner.finished.connect(lambda _: loop.quit())
+    QTimer.singleShot(10000, loop.quit)
+    runner.start()
+    if not results:
+        loop.exec()
+    return started, results
+
+
+def script(script_id, body=None):
+    info = {'id': script_id, 'name': script_id, 'path': f"{script_id}.sh"}
+    if body is not None:
+        info['body'] = body
+    return info
+
+
+def test_declining_after_a_cached_step_and_a_failed_one_stops_the_workflow(app, tmp_path):
+    scripts = {'cached': script('cached', "exit 0\n"), 'failing': script('failing', "exit 1\n"),
+               'last': script('last', "exit 0\n")}
+    workflow = {'name': "Test", 'scripts': ['cached', 'failing', 'last']}
+    started, results = run_workflow(app, tmp_path, workflow, scripts, CachedSteps(['cached']))
+    assert started == [0, 1]
+    assert results == [False]
+
+
+def test_declining_after_steps_that_finish_without_running_starts_nothing_else(app, tmp_path):
+    # 'missing' has no file, so it fails without running, right after the cached step
+    scripts = {'cached': script('cached', "exit 0\n"), 'missing': script('missing'),
+               'after_cached': script('after_cached', "exit 0\n")}
+    workflow = {'name': "Test", 'scripts': ['cached', 'missing', 'after_cached'],
+                'after': {'after_cached': ['cached']}, 'max_parallel': 2}
+    started, results = run_workflow(app, tmp_path, workflow, scripts, CachedSteps(['cached']))
+    assert started == [0, 1]
+    assert results == [False]